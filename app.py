@@ -1,30 +1,96 @@
-from flask import Flask, request, jsonify, render_template, send_from_directory
+from flask import (
+    Flask,
+    request,
+    jsonify,
+    render_template,
+    send_from_directory,
+    g,
+    has_request_context,
+    stream_with_context,
+)
 from flask_cors import CORS
-import pg8000
 import os
 from datetime import datetime, date
+from decimal import Decimal
 import json
-import urllib.parse
+import base64
+import uuid
 import threading
 import time
+import queue
 from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.triggers.cron import CronTrigger
 from dateutil.relativedelta import relativedelta
 
+from db_pool import ConnectionPool, connect
+import migrations
+from data_versions import (
+    ACCOUNTS,
+    BUDGET_CATEGORIES,
+    BUDGET_PERIODS,
+    bump_data_version,
+    get_data_version,
+)
+from change_feed import (
+    TABLES as CHANGE_FEED_TABLES,
+    current_watermark,
+    fetch_changes,
+    prune_change_log,
+)
+from period_calendar import (
+    PERIOD_FOR_PURCHASE_SQL,
+    PeriodCalendar,
+    assign_purchase_periods,
+    backfill_purchase_periods,
+)
+from balance_events import (
+    BalanceBroadcaster,
+    TABLES as BALANCE_EVENT_TABLES,
+)
+from ledger import balance_as_of, take_balance_snapshots
+from hot_queries import (
+    CATEGORY_IDS_BY_NAME_SQL,
+    DETACH_PERIOD_CATEGORIES_SQL,
+    PERIOD_CATEGORIES_SQL,
+    PURCHASE_PAGE_SQL,
+    RECENT_PURCHASES_SQL,
+)
+from job_scheduler import LeaderScheduler, schedule_job
+import metrics
+from read_cache import ReadCache, default_directory
+from json_provider import OrjsonProvider, Rows
+import exports
+import statement_import
+import query_stats
+from query_stats import track_queries
+
 
 app = Flask(__name__)
-CORS(app, origins=["*"], supports_credentials=False)
+app.json = OrjsonProvider(app)
+CORS(
+    app,
+    origins=["*"],
+    supports_credentials=False,
+    expose_headers=["X-Next-Cursor", "ETag"],
+)
+query_stats.instrument(app)
+metrics.instrument(app)
 
 
 # Load settings from config file
+# A generated household (benchmarks/generate_household.py) can stand in
+SETTINGS_FILE = os.environ.get("SETTINGS_FILE", "config/settings.json")
+
+
 def load_settings():
     try:
-        with open("config/settings.json", "r") as f:
+        with open(SETTINGS_FILE, "r") as f:
             return json.load(f)
     except FileNotFoundError:
-        print("Warning: config/settings.json not found, using defaults")
+        print(f"Warning: {SETTINGS_FILE} not found, using defaults")
         return {"bank_accounts": {}, "budget_categories": {}}
     except json.JSONDecodeError:
-        print("Error: config/settings.json is not valid JSON")
+        print(f"Error: {SETTINGS_FILE} is not valid JSON")
         return {"bank_accounts": {}, "budget_categories": {}}
 
 
@@ -64,8 +130,13 @@ def migrate_bank_zero_names():
         """
         )
 
+        if rows_updated > 0:
+            bump_data_version(cur, ACCOUNTS)
+
         conn.commit()
         conn.close()
+        if rows_updated > 0:
+            read_cache.invalidate(ACCOUNTS)
 
         if rows_updated > 0:
             print(
@@ -77,102 +148,83 @@ def migrate_bank_zero_names():
         return -1
 
 
-# Database connection helper
-def get_db_connection():
-    database_url = os.environ.get("DATABASE_URL")
-    if not database_url:
-        raise ValueError("DATABASE_URL environment variable not set")
-
-    # Parse DATABASE_URL for pg8000
-    import urllib.parse
-
-    parsed = urllib.parse.urlparse(database_url)
-    return pg8000.connect(
-        host=parsed.hostname,
-        database=parsed.path[1:],  # Remove leading slash
-        user=parsed.username,
-        password=parsed.password,
-        port=parsed.port or 5432,
-    )
+# Request threads per gunicorn worker (set in gunicorn.conf.py)
+WORKER_THREADS = int(os.environ.get("GUNICORN_THREADS", 8))
+
+# Database connection pool (one per gunicorn worker process). Every request
+# thread may hold a connection at once (an /export/* stream keeps its own
+# for the whole download), plus the /events listener's reads and a
+# scheduled job, so no request ever waits for one
+DB_POOL_MAX_SIZE = int(os.environ.get("DB_POOL_MAX_SIZE", WORKER_THREADS + 2))
+_db_pool = None
+_db_pool_lock = threading.Lock()
+
+
+def get_db_pool():
+    """Return this process's connection pool, creating it on first use"""
+    global _db_pool
+    with _db_pool_lock:
+        # A pool inherited across fork() holds the parent's sockets
+        if _db_pool is None or _db_pool.pid != os.getpid():
+            _db_pool = ConnectionPool(
+                connect,
+                max_size=DB_POOL_MAX_SIZE,
+                timeout=float(os.environ.get("DB_POOL_TIMEOUT", 10)),
+                max_age=float(os.environ.get("DB_POOL_MAX_AGE", 1800)),
+                ping_after=float(os.environ.get("DB_POOL_PING_AFTER", 30)),
+                on_query=query_stats.record,
+            )
+        return _db_pool
 
 
-# Initialize database
-def init_db():
-    conn = get_db_connection()
-    cur = conn.cursor()
+# JSON bodies of the list endpoints, shared by all workers; writes in this
+# file invalidate after their commit, other writers age out with the TTL.
+# Identical concurrent misses in a worker share one query (single flight).
+read_cache = ReadCache(
+    default_directory(),
+    ttl=float(os.environ.get("READ_CACHE_TTL", 30)),
+    max_entries=int(os.environ.get("READ_CACHE_MAX_ENTRIES", 256)),
+    max_bytes=int(os.environ.get("READ_CACHE_MAX_BYTES", 32 * 1024 * 1024)),
+    on_event=metrics.record_cache_event,
+)
 
-    # Bank accounts table
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS accounts (
-            id SERIAL PRIMARY KEY,
-            name VARCHAR(255) NOT NULL UNIQUE,
-            account_type VARCHAR(50) NOT NULL,
-            balance DECIMAL(10,2) NOT NULL DEFAULT 0,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    """
-    )
 
-    # Budget categories table
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS budget_categories (
-            id SERIAL PRIMARY KEY,
-            name VARCHAR(255) NOT NULL UNIQUE,
-            budgeted_amount DECIMAL(10,2) NOT NULL DEFAULT 0,
-            current_balance DECIMAL(10,2) NOT NULL DEFAULT 0,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    """
-    )
+# Database connection helper
+def get_db_connection():
+    """Borrow a pooled connection; conn.close() returns it to the pool"""
+    started = time.perf_counter()
+    conn = get_db_pool().get_connection()
+    metrics.record_acquire(time.perf_counter() - started)
 
-    # Updated purchases table with account linking
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS purchases (
-            id SERIAL PRIMARY KEY,
-            user_name VARCHAR(255) NOT NULL,
-            amount DECIMAL(10,2) NOT NULL,
-            account_id INTEGER,
-            budget_category_id INTEGER,
-            description TEXT,
-            date TIMESTAMP NOT NULL,
-            FOREIGN KEY (account_id) REFERENCES accounts (id),
-            FOREIGN KEY (budget_category_id) REFERENCES budget_categories (id)
-        )
-    """
-    )
+    # Routes that raise before conn.close() get cleaned up on teardown
+    if has_request_context():
+        g.setdefault("db_connections", []).append(conn)
+    return conn
 
-    # Load accounts and categories from config file
-    settings = load_settings()
 
-    # Insert bank accounts from config
-    for user, accounts in settings.get("bank_accounts", {}).items():
-        for account_type in accounts:
-            account_name = f"{user} - {account_type}"
-            cur.execute(
-                """
-                INSERT INTO accounts (name, account_type, balance) 
-                VALUES (%s, %s, 0) ON CONFLICT (name) DO NOTHING
-            """,
-                (account_name, "bank"),
-            )
+@app.teardown_request
+def release_db_connections(exc):
+    for conn in g.pop("db_connections", []):
+        conn.close()
 
-    # Insert budget categories from config
-    for user, categories in settings.get("budget_categories", {}).items():
-        for category in categories:
-            category_name = f"{user} - {category}"
-            cur.execute(
-                """
-                INSERT INTO budget_categories (name, budgeted_amount, current_balance) 
-                VALUES (%s, 0, 0) ON CONFLICT (name) DO NOTHING
-            """,
-                (category_name,),
-            )
 
-    conn.commit()
-    conn.close()
+# Initialize database
+def init_db():
+    """Apply pending schema migrations and seed accounts/categories"""
+    conn = get_db_connection()
+    try:
+        migrations.upgrade(conn)
+        cur = conn.cursor()
+        migrations.seed(cur, load_settings())
+        conn.commit()
+        read_cache.invalidate(ACCOUNTS, BUDGET_CATEGORIES)
+        backfill_purchase_periods(conn)
+    finally:
+        conn.close()
+
+
+# Budget period of a purchase date, for purchases.period_id on insert
+period_calendar = PeriodCalendar()
 
 
 # Database initialization moved to lazy loading
@@ -191,13 +243,15 @@ def ensure_database():
             print("DATABASE_URL not set - database features unavailable")
             return False
 
-        init_db()
-
-        # Run the Bank Zero migration only once
-        migrate_bank_zero_names()
+        # One version lookup per worker; DDL and seeding only when behind
+        conn = get_db_connection()
+        version = migrations.current_version(conn.cursor())
+        conn.close()
+        if version < migrations.latest_version():
+            init_db()
+            print("Database migrated successfully")
 
         _db_initialized = True
-        print("Database initialized successfully")
         return True
     except Exception as e:
         print(f"Database initialization failed: {e}")
@@ -209,6 +263,84 @@ def mobile_form():
     return render_template("index.html")
 
 
+# Rows per multi-row INSERT (keeps bind parameters well under 65535)
+SYNC_INSERT_CHUNK = 1000
+
+
+def insert_purchases_batch(cur, purchases):
+    """Insert synced purchases set-based.
+
+    Resolves every category name in one query and inserts rows with
+    multi-row INSERTs; the purchases balance trigger applies each
+    statement's per-account and per-category totals in one UPDATE per
+    table. Runs inside the caller's transaction.
+
+    Purchases carrying a client_id (UUID) are idempotent: ones the server
+    already has are skipped and do not touch any balance again. Returns
+    {"synced": n, "accepted": [client ids], "duplicates": [client ids]}.
+    """
+    # Resolve all category names at once; when a name exists in several
+    # periods, the newest category (the current rollover) wins
+    names = sorted({p["category"] for p in purchases if p.get("category")})
+    category_ids = {}
+    if names:
+        cur.execute(CATEGORY_IDS_BY_NAME_SQL, (names,))
+        category_ids = dict(cur.fetchall())
+
+    period_calendar.refresh(cur)
+
+    rows = []
+    seen_client_ids = set()
+    for purchase in purchases:
+        client_id = purchase.get("client_id")
+        if client_id:
+            client_id = uuid.UUID(str(client_id))
+            if client_id in seen_client_ids:
+                continue
+            seen_client_ids.add(client_id)
+
+        rows.append(
+            (
+                purchase.get("user_name", "Unknown"),
+                Decimal(str(purchase["amount"])),
+                purchase.get("account_id"),
+                category_ids.get(purchase.get("category") or ""),
+                purchase.get("description", ""),
+                purchase["timestamp"],
+                period_calendar.period_for(purchase["timestamp"]),
+                client_id,
+            )
+        )
+
+    # Already-synced client ids are skipped by the unique index; the
+    # balance triggers see only the rows actually inserted
+    inserted = []
+    for i in range(0, len(rows), SYNC_INSERT_CHUNK):
+        chunk = rows[i : i + SYNC_INSERT_CHUNK]
+        cur.execute(
+            """
+            INSERT INTO purchases (user_name, amount, account_id, budget_category_id, description, date, period_id, client_id)
+            VALUES """
+            + ", ".join(["(%s, %s, %s, %s, %s, %s, %s, %s)"] * len(chunk))
+            + """
+            ON CONFLICT (client_id) DO NOTHING
+            RETURNING client_id
+        """,
+            [value for row in chunk for value in row],
+        )
+        inserted.extend(cur.fetchall())
+
+    accepted = [str(row[0]) for row in inserted if row[0]]
+    duplicates = sorted(
+        {str(client_id) for client_id in seen_client_ids} - set(accepted)
+    )
+    return {
+        "synced": len(inserted),
+        "accepted": accepted,
+        "duplicates": duplicates,
+    }
+
+
 @app.route("/sync_purchases", methods=["POST"])
 def sync_purchases():
     try:
@@ -223,169 +355,483 @@ def sync_purchases():
 
         conn = get_db_connection()
         cur = conn.cursor()
-        synced_count = 0
+        result = insert_purchases_batch(cur, purchases)
+        if result["synced"]:
+            bump_data_version(cur, ACCOUNTS, BUDGET_CATEGORIES)
+        conn.commit()
+        conn.close()
+        if result["synced"]:
+            read_cache.invalidate(ACCOUNTS, BUDGET_CATEGORIES)
 
-        for purchase in purchases:
-            account_id = purchase.get("account_id")
-            budget_category_name = purchase.get("category", "")
-            amount = float(purchase["amount"])
+        return jsonify({"status": "success", **result})
 
-            # Get budget category ID
-            budget_category_id = None
-            if budget_category_name:
-                cur.execute(
-                    "SELECT id FROM budget_categories WHERE name = %s",
-                    (budget_category_name,),
-                )
-                result = cur.fetchone()
-                if result:
-                    budget_category_id = result[0]
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)})
 
-            # Insert purchase
-            cur.execute(
-                """
-                INSERT INTO purchases (user_name, amount, account_id, budget_category_id, description, date)
-                VALUES (%s, %s, %s, %s, %s, %s)
-            """,
-                (
-                    purchase.get("user_name", "Unknown"),
-                    amount,
-                    account_id,
-                    budget_category_id,
-                    purchase.get("description", ""),
-                    purchase["timestamp"],
-                ),
-            )
 
-            # Update account balance (withdraw)
-            if account_id:
-                cur.execute(
-                    """
-                    UPDATE accounts SET balance = balance - %s WHERE id = %s
-                """,
-                    (amount, account_id),
-                )
+@app.route("/import_statement", methods=["POST"])
+def import_bank_statement():
+    """Import a bank statement export into an account's purchases.
 
-            # Update budget category balance (withdraw)
-            if budget_category_id:
-                cur.execute(
-                    """
-                    UPDATE budget_categories SET current_balance = current_balance - %s WHERE id = %s
-                """,
-                    (amount, budget_category_id),
-                )
+    Multipart form: file (CSV or OFX), account_id, and optionally user,
+    format (csv or ofx, detected when omitted) and dry_run=1 to only count
+    the new and duplicate lines. See statement_import.py.
+    """
+    try:
+        upload = request.files.get("file")
+        if upload is None:
+            raise ValueError("missing file")
+        account_id = int(request.form["account_id"])
+        statement_format = request.form.get("format") or None
+        if statement_format not in (None, *statement_import.FORMATS):
+            raise ValueError(f"unknown format {statement_format}")
+        dry_run = request.form.get("dry_run") in ("1", "true")
+    except (KeyError, ValueError) as e:
+        return jsonify({"error": f"Invalid request: {e}"}), 400
 
-            synced_count += 1
+    try:
+        ensure_database()
+        lines = statement_import.parse_statement(
+            statement_import.open_text(upload.stream), statement_format
+        )
+        conn = get_db_connection()
+        cur = conn.cursor()
+        try:
+            result = statement_import.import_statement(
+                cur,
+                account_id,
+                lines,
+                user_name=request.form.get("user"),
+                source=upload.filename,
+            )
+        except ValueError as e:
+            conn.close()
+            return jsonify({"error": f"Invalid statement: {e}"}), 400
 
-        conn.commit()
+        if dry_run:
+            conn.rollback()
+        else:
+            if result["imported"]:
+                bump_data_version(cur, ACCOUNTS)
+            conn.commit()
         conn.close()
+        if result["imported"] and not dry_run:
+            read_cache.invalidate(ACCOUNTS)
 
-        return jsonify({"status": "success", "synced": synced_count})
+        return jsonify({"status": "success", "dry_run": dry_run, **result})
 
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)})
 
 
+# Row to JSON conversions shared by the list endpoints and /bootstrap
+
+# Keys of (id, user_name, amount, description, date, account, category)
+# rows, serialized as they come from the database (json_provider.Rows)
+PURCHASE_COLUMNS = (
+    "id",
+    "user",
+    "amount",
+    "description",
+    "date",
+    "account_name",
+    "category",
+)
+
+
+def account_to_dict(a):
+    """(id, name, balance)"""
+    return {
+        "id": a[0],
+        "name": a[1],
+        "balance": float(a[2]),  # Ensure balance is a number
+    }
+
+
+def category_to_dict(c):
+    """(id, name, budgeted_amount, current_balance)"""
+    budgeted = float(c[2])
+    current = float(c[3])
+    return {
+        "id": c[0],
+        "name": c[1],
+        "budgeted_amount": budgeted,
+        "current_balance": current,
+        "remaining": budgeted - abs(current),  # remaining budget
+    }
+
+
+def period_to_dict(p):
+    """(id, period_name, start_date, end_date, is_active)"""
+    return {
+        "id": p[0],
+        "period_name": p[1],
+        "start_date": p[2].isoformat() if p[2] else None,
+        "end_date": p[3].isoformat() if p[3] else None,
+        "is_active": p[4],
+    }
+
+
+# Purchase listing pagination
+PURCHASES_PAGE_SIZE = 50
+PURCHASES_MAX_PAGE_SIZE = 500
+
+
+def encode_purchase_cursor(purchase_date, purchase_id):
+    """Opaque cursor token for the (date, id) keyset position"""
+    raw = f"{purchase_date.isoformat()}|{purchase_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_purchase_cursor(token):
+    padded = token + "=" * (-len(token) % 4)
+    raw = base64.urlsafe_b64decode(padded.encode()).decode()
+    purchase_date, purchase_id = raw.rsplit("|", 1)
+    return datetime.fromisoformat(purchase_date), int(purchase_id)
+
+
+def build_purchase_filters(args):
+    """Build the WHERE clause for purchase listings from query args.
+
+    Supports user, period_id, start_date, end_date (inclusive dates),
+    account_id and category_id. Returns (sql, params).
+    """
+    conditions = []
+    params = []
+
+    if args.get("user"):
+        conditions.append("p.user_name = %s")
+        params.append(args["user"])
+
+    if args.get("period_id"):
+        conditions.append("p.period_id = %s")
+        params.append(int(args["period_id"]))
+
+    if args.get("start_date"):
+        conditions.append("p.date >= %s")
+        params.append(date.fromisoformat(args["start_date"]))
+
+    if args.get("end_date"):
+        conditions.append("p.date < %s")
+        params.append(
+            date.fromisoformat(args["end_date"]) + relativedelta(days=1)
+        )
+
+    if args.get("account_id"):
+        conditions.append("p.account_id = %s")
+        params.append(int(args["account_id"]))
+
+    if args.get("category_id"):
+        conditions.append("p.budget_category_id = %s")
+        params.append(int(args["category_id"]))
+
+    where = " AND ".join(conditions) if conditions else "TRUE"
+    return where, params
+
+
 @app.route("/get_purchases")
 def get_purchases():
+    """List purchases newest first, one page at a time.
+
+    Pass the X-Next-Cursor response header back as ?cursor= to fetch the
+    next page; the header is absent on the last page. ?limit= is clamped
+    to 1..PURCHASES_MAX_PAGE_SIZE.
+    """
+    try:
+        where, params = build_purchase_filters(request.args)
+        try:
+            limit = int(request.args.get("limit", PURCHASES_PAGE_SIZE))
+        except ValueError:
+            raise ValueError(
+                f"limit must be an integer, got {request.args['limit']!r}"
+            )
+        # Below 1 there would be no last row to take the cursor from
+        limit = max(1, min(limit, PURCHASES_MAX_PAGE_SIZE))
+
+        if request.args.get("cursor"):
+            cursor_date, cursor_id = decode_purchase_cursor(
+                request.args["cursor"]
+            )
+            where += " AND (p.date, p.id) < (%s, %s)"
+            params.extend([cursor_date, cursor_id])
+    except (ValueError, TypeError) as e:
+        return jsonify({"error": f"Invalid filter: {e}"}), 400
+
     try:
         conn = get_db_connection()
         cur = conn.cursor()
+        # Fetch one extra row to know whether another page exists
         cur.execute(
-            """
-            SELECT p.id, p.user_name, p.amount, p.description, p.date,
-                   a.name as account_name, bc.name as category_name
-            FROM purchases p 
-            LEFT JOIN accounts a ON p.account_id = a.id
-            LEFT JOIN budget_categories bc ON p.budget_category_id = bc.id
-            ORDER BY p.date DESC
-        """
+            PURCHASE_PAGE_SQL.format(where=where), params + [limit + 1]
         )
         purchases = cur.fetchall()
         conn.close()
 
-        # Convert to list of dictionaries for JSON response
-        purchase_list = []
-        for p in purchases:
-            purchase_list.append(
-                {
-                    "id": p[0],
-                    "user": p[1],
-                    "amount": p[2],
-                    "description": p[3],
-                    "date": p[4],
-                    "account_name": p[5],
-                    "category": p[6],
-                }
+        next_cursor = None
+        if len(purchases) > limit:
+            purchases = purchases[:limit]
+            next_cursor = encode_purchase_cursor(
+                purchases[-1][4], purchases[-1][0]
             )
 
-        return jsonify(purchase_list)
+        response = jsonify(Rows(PURCHASE_COLUMNS, purchases))
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
+        return response
 
     except Exception as e:
         return jsonify({"error": str(e)})
 
 
-@app.route("/get_accounts")
-def get_accounts():
+# Streamed exports (exports.py)
+LEDGER_COLUMNS = (
+    "id",
+    "posted_at",
+    "ledger",
+    "ledger_id",
+    "ledger_name",
+    "amount",
+    "source",
+    "source_id",
+)
+
+
+def build_ledger_filters(args):
+    """WHERE clause for ledger exports from the purchase listing's args.
+
+    start_date/end_date bound posted_at; account_id and category_id select
+    those ledgers (either one when both are given); user and period_id
+    keep the entries posted by matching purchases. Returns (sql, params).
+    """
+    conditions = []
+    params = []
+
+    if args.get("start_date"):
+        conditions.append("e.posted_at >= %s")
+        params.append(date.fromisoformat(args["start_date"]))
+
+    if args.get("end_date"):
+        conditions.append("e.posted_at < %s")
+        params.append(
+            date.fromisoformat(args["end_date"]) + relativedelta(days=1)
+        )
+
+    ledgers = []
+    if args.get("account_id"):
+        ledgers.append("(e.ledger = 'account' AND e.ledger_id = %s)")
+        params.append(int(args["account_id"]))
+    if args.get("category_id"):
+        ledgers.append("(e.ledger = 'category' AND e.ledger_id = %s)")
+        params.append(int(args["category_id"]))
+    if ledgers:
+        conditions.append(f"({' OR '.join(ledgers)})")
+
+    purchase_args = {
+        key: args[key] for key in ("user", "period_id") if args.get(key)
+    }
+    if purchase_args:
+        purchase_where, purchase_params = build_purchase_filters(purchase_args)
+        conditions.append(
+            f"""e.source = 'purchase' AND e.source_id IN (
+                SELECT p.id FROM purchases p WHERE {purchase_where})"""
+        )
+        params.extend(purchase_params)
+
+    where = " AND ".join(conditions) if conditions else "TRUE"
+    return where, params
+
+
+def stream_export(name, columns, sql, params):
+    """Response streaming sql's rows in the ?format= (ndjson or csv)"""
+    export_format = request.args.get("format", "ndjson")
+    if export_format not in exports.FORMATS:
+        return (
+            jsonify(
+                {"error": f"Invalid request: unknown format {export_format}"}
+            ),
+            400,
+        )
+
+    conn = get_db_connection()
     try:
-        conn = get_db_connection()
-        cur = conn.cursor()
-        cur.execute("SELECT id, name, balance FROM accounts ORDER BY name")
-        accounts = cur.fetchall()
+        batches = exports.fetch_batches(conn.cursor(), sql, params)
+    except Exception:
         conn.close()
+        raise
 
-        account_list = []
-        for a in accounts:
-            account_list.append(
-                {
-                    "id": a[0],
-                    "name": a[1],
-                    "balance": float(a[2]),  # Ensure balance is a number
-                }
-            )
+    def stream():
+        try:
+            yield from exports.encode(export_format, columns, batches)
+        finally:
+            conn.close()
 
-        return jsonify(account_list)
+    response = app.response_class(
+        stream_with_context(stream()),
+        mimetype=exports.FORMATS[export_format],
+    )
+    filename = f"{name}-{date.today().isoformat()}.{export_format}"
+    response.headers["Content-Disposition"] = (
+        f'attachment; filename="{filename}"'
+    )
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
+
+
+@app.route("/export/purchases")
+def export_purchases():
+    """Every purchase matching the /get_purchases filters, oldest first.
+
+    ?format=ndjson (default) or csv; rows are streamed, not paginated.
+    """
+    try:
+        where, params = build_purchase_filters(request.args)
+    except (ValueError, TypeError) as e:
+        return jsonify({"error": f"Invalid filter: {e}"}), 400
+
+    try:
+        return stream_export(
+            "purchases",
+            PURCHASE_COLUMNS,
+            f"""
+            SELECT p.id, p.user_name, p.amount, p.description, p.date,
+                   a.name as account_name, bc.name as category_name
+            FROM purchases p
+            LEFT JOIN accounts a ON p.account_id = a.id
+            LEFT JOIN budget_categories bc ON p.budget_category_id = bc.id
+            WHERE {where}
+            ORDER BY p.date, p.id
+        """,
+            params,
+        )
 
     except Exception as e:
         return jsonify({"error": str(e)})
 
 
-@app.route("/get_budget_categories")
-def get_budget_categories():
+@app.route("/export/ledger")
+def export_ledger():
+    """Ledger entries (balance movements) in posting order.
+
+    Takes the /get_purchases filters (see build_ledger_filters) and
+    ?format=ndjson (default) or csv.
+    """
     try:
-        # Ensure database is initialized
-        ensure_database()
+        where, params = build_ledger_filters(request.args)
+    except (ValueError, TypeError) as e:
+        return jsonify({"error": f"Invalid filter: {e}"}), 400
+
+    try:
+        return stream_export(
+            "ledger",
+            LEDGER_COLUMNS,
+            f"""
+            SELECT e.id, e.posted_at, e.ledger, e.ledger_id,
+                   COALESCE(a.name, bc.name) as ledger_name,
+                   e.amount, e.source, e.source_id
+            FROM ledger_entries e
+            LEFT JOIN accounts a
+                ON e.ledger = 'account' AND a.id = e.ledger_id
+            LEFT JOIN budget_categories bc
+                ON e.ledger = 'category' AND bc.id = e.ledger_id
+            WHERE {where}
+            ORDER BY e.id
+        """,
+            params,
+        )
+
+    except Exception as e:
+        return jsonify({"error": str(e)})
+
+
+# Conditional GET helpers (ETags from data_versions counters)
+def data_version_etag(cur, resource):
+    """ETag for a resource; read it before the data it describes.
 
+    A write landing between the two reads then only makes the ETag older
+    than the body (one extra refetch), never newer (a missed change).
+    """
+    return f"{resource}-{get_data_version(cur, resource)}"
+
+
+def not_modified(etag):
+    """304 response if the client already has this version, else None"""
+    if request.if_none_match.contains(etag):
+        return with_etag(app.response_class(status=304), etag)
+    return None
+
+
+def with_etag(response, etag):
+    response.set_etag(etag)
+    # Let browsers keep the body but revalidate on every request
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
+
+def cached_json(resource, key, query):
+    """Conditional GET of a list endpoint through the shared read cache.
+
+    query(cur) returns the payload; it and the ETag are only read from the
+    database on a cache miss, once per worker however many requests for the
+    same key arrive while it runs. key must normalize the parameters.
+    """
+
+    def load():
         conn = get_db_connection()
-        cur = conn.cursor()
+        try:
+            cur = conn.cursor()
+            etag = data_version_etag(cur, resource)
+            payload = query(cur)
+        finally:
+            conn.close()
+        return etag, app.json.response(payload).get_data()
+
+    etag, body = read_cache.fetch(resource, key, load)
+    unchanged = not_modified(etag)
+    if unchanged:
+        return unchanged
+    return with_etag(
+        app.response_class(body, mimetype="application/json"), etag
+    )
 
-        # Get all budget categories (the original table design doesn't have period_id)
-        cur.execute(
-            """
-            SELECT id, name, budgeted_amount, current_balance 
-            FROM budget_categories 
-            ORDER BY name
-        """
-        )
 
-        categories = cur.fetchall()
-        conn.close()
+@app.route("/get_accounts")
+def get_accounts():
+    def query(cur):
+        cur.execute("SELECT id, name, balance FROM accounts ORDER BY name")
+        return [account_to_dict(a) for a in cur.fetchall()]
 
-        category_list = []
-        for c in categories:
-            budgeted = float(c[2])
-            current = float(c[3])
-            category_list.append(
-                {
-                    "id": c[0],
-                    "name": c[1],
-                    "budgeted_amount": budgeted,
-                    "current_balance": current,
-                    "remaining": budgeted - abs(current),  # remaining budget
-                }
+    try:
+        return cached_json(ACCOUNTS, "all", query)
+
+    except Exception as e:
+        return jsonify({"error": str(e)})
+
+
+@app.route("/get_budget_categories")
+def get_budget_categories():
+    period_id = request.args.get("period_id")
+
+    def query(cur):
+        if period_id:
+            # One period's categories (what /bootstrap returns)
+            cur.execute(PERIOD_CATEGORIES_SQL, (int(period_id),))
+        else:
+            # Get all budget categories across periods
+            cur.execute(
+                """
+                SELECT id, name, budgeted_amount, current_balance 
+                FROM budget_categories 
+                ORDER BY name
+            """
             )
+        return [category_to_dict(c) for c in cur.fetchall()]
+
+    try:
+        # Ensure database is initialized
+        ensure_database()
 
-        return jsonify(category_list)
+        key = f"period:{int(period_id)}" if period_id else "all"
+        return cached_json(BUDGET_CATEGORIES, key, query)
 
     except Exception as e:
         return jsonify({"error": str(e)})
@@ -409,8 +855,10 @@ def update_account_balance():
             "UPDATE accounts SET balance = %s WHERE id = %s",
             (float(new_balance), account_id),
         )
+        bump_data_version(cur, ACCOUNTS)
         conn.commit()
         conn.close()
+        read_cache.invalidate(ACCOUNTS)
 
         return jsonify(
             {"status": "success", "message": "Account balance updated"}
@@ -438,54 +886,290 @@ def update_budget_amount():
         conn = get_db_connection()
         cur = conn.cursor()
         cur.execute(
-            "UPDATE budget_categories SET budgeted_amount = %s WHERE id = %s",
-            (float(budget_amount), category_id),
+            "UPDATE budget_categories SET budgeted_amount = %s WHERE id = %s",
+            (float(budget_amount), category_id),
+        )
+        bump_data_version(cur, BUDGET_CATEGORIES)
+        conn.commit()
+        conn.close()
+        read_cache.invalidate(BUDGET_CATEGORIES)
+
+        return jsonify(
+            {"status": "success", "message": "Budget amount updated"}
+        )
+
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)})
+
+
+@app.route("/balance_as_of")
+def get_balance_as_of():
+    """Account or category balance at a past moment, from the ledger.
+
+    ?account_id=<id> or ?category_id=<id>
+    ?at=<ISO timestamp> (default: now)
+    """
+    try:
+        ensure_database()
+        if request.args.get("account_id"):
+            ledger, key = "account", "account_id"
+        elif request.args.get("category_id"):
+            ledger, key = "category", "category_id"
+        else:
+            raise ValueError("account_id or category_id is required")
+        ledger_id = int(request.args[key])
+        at = request.args.get("at")
+        at = datetime.fromisoformat(at) if at else datetime.now()
+    except ValueError as e:
+        return jsonify({"error": f"Invalid request: {e}"}), 400
+
+    try:
+        conn = get_db_connection()
+        cur = conn.cursor()
+        balance = balance_as_of(cur, ledger, ledger_id, at)
+        conn.close()
+        return jsonify(
+            {key: ledger_id, "at": at.isoformat(), "balance": float(balance)}
+        )
+
+    except Exception as e:
+        return jsonify({"error": str(e)})
+
+
+# Budget Period Management Endpoints
+@app.route("/get_budget_periods")
+def get_budget_periods():
+    """Get all budget periods with their details."""
+
+    def query(cur):
+        cur.execute(
+            """
+            SELECT id, period_name, start_date, end_date, is_active 
+            FROM budget_periods 
+            ORDER BY start_date
+        """
+        )
+        return [period_to_dict(p) for p in cur.fetchall()]
+
+    try:
+        return cached_json(BUDGET_PERIODS, "all", query)
+
+    except Exception as e:
+        return jsonify({"error": str(e)})
+
+
+# Purchases per user returned by /bootstrap
+BOOTSTRAP_RECENT_PURCHASES = 10
+
+
+@app.route("/bootstrap")
+def bootstrap():
+    """Everything the mobile page needs on cold start, from one connection.
+
+    Returns accounts, the active period, that period's budget categories
+    and the latest purchases of each configured user.
+    """
+    try:
+        ensure_database()
+        users = list(load_settings().get("bank_accounts", {}).keys())
+
+        conn = get_db_connection()
+        cur = conn.cursor()
+
+        # Starting point for /changes; read before the data it covers
+        changes_since = current_watermark(cur)
+
+        cur.execute("SELECT id, name, balance FROM accounts ORDER BY name")
+        accounts = cur.fetchall()
+
+        cur.execute(
+            """
+            SELECT id, period_name, start_date, end_date, is_active 
+            FROM budget_periods 
+            WHERE is_active = TRUE
+            ORDER BY start_date DESC
+            LIMIT 1
+        """
         )
-        conn.commit()
+        active_period = cur.fetchone()
+
+        if active_period:
+            cur.execute(PERIOD_CATEGORIES_SQL, (active_period[0],))
+        else:
+            cur.execute(
+                """
+                SELECT id, name, budgeted_amount, current_balance 
+                FROM budget_categories 
+                ORDER BY name
+            """
+            )
+        categories = cur.fetchall()
+
+        cur.execute(RECENT_PURCHASES_SQL, (users, BOOTSTRAP_RECENT_PURCHASES))
+        purchases = cur.fetchall()
         conn.close()
 
+        recent_purchases = {user: [] for user in users}
+        for p in purchases:
+            recent_purchases[p[1]].append(p)
+
         return jsonify(
-            {"status": "success", "message": "Budget amount updated"}
+            {
+                "accounts": [account_to_dict(a) for a in accounts],
+                "active_period": (
+                    period_to_dict(active_period) if active_period else None
+                ),
+                "budget_categories": [category_to_dict(c) for c in categories],
+                "recent_purchases": {
+                    user: Rows(PURCHASE_COLUMNS, rows)
+                    for user, rows in recent_purchases.items()
+                },
+                "changes_since": changes_since,
+            }
         )
 
     except Exception as e:
-        return jsonify({"status": "error", "message": str(e)})
+        return jsonify({"error": str(e)})
 
 
-# Budget Period Management Endpoints
-@app.route("/get_budget_periods")
-def get_budget_periods():
-    """Get all budget periods with their details."""
+@app.route("/changes")
+def get_changes():
+    """Rows upserted or deleted since a watermark from /changes or /bootstrap.
+
+    ?since=<watermark> (omit for a full snapshot)
+    ?tables=accounts,budget_categories (default: all tracked tables)
+    """
+    try:
+        ensure_database()
+        since = request.args.get("since")
+        since = int(since) if since else None
+        tables = request.args.get("tables")
+        tables = tables.split(",") if tables else list(CHANGE_FEED_TABLES)
+        unknown = [t for t in tables if t not in CHANGE_FEED_TABLES]
+        if unknown:
+            raise ValueError(f"unknown table {unknown[0]}")
+    except ValueError as e:
+        return jsonify({"error": f"Invalid request: {e}"}), 400
+
     try:
         conn = get_db_connection()
         cur = conn.cursor()
-        cur.execute(
-            """
-            SELECT id, period_name, start_date, end_date, is_active 
-            FROM budget_periods 
-            ORDER BY start_date
-        """
-        )
-        periods = cur.fetchall()
+        changes = fetch_changes(cur, since, tables)
         conn.close()
+        return jsonify(changes)
 
-        period_list = []
-        for p in periods:
-            period_list.append(
-                {
-                    "id": p[0],
-                    "period_name": p[1],
-                    "start_date": p[2].isoformat() if p[2] else None,
-                    "end_date": p[3].isoformat() if p[3] else None,
-                    "is_active": p[4],
-                }
+    except Exception as e:
+        return jsonify({"error": str(e)})
+
+
+# /events streams send a comment this often so proxies keep them open, and
+# end after EVENTS_MAX_AGE seconds; EventSource reconnects with its
+# Last-Event-ID, so a vanished phone never pins a worker thread for long
+EVENTS_HEARTBEAT = 15
+EVENTS_MAX_AGE = 300
+# Each open stream holds one of the worker's threads, so streams may take
+# at most this many and the rest stay free for every other route. Phones
+# turned away get a 503 and keep polling /changes every 30 s until a
+# stream slot frees up
+EVENTS_MAX_STREAMS = int(
+    os.environ.get("EVENTS_MAX_STREAMS", WORKER_THREADS // 2)
+)
+EVENTS_FULL_RETRY = 30
+
+_balance_broadcaster = None
+_balance_broadcaster_lock = threading.Lock()
+
+
+def get_balance_broadcaster():
+    """Return this process's broadcaster, creating it on first use"""
+    global _balance_broadcaster
+    with _balance_broadcaster_lock:
+        if (
+            _balance_broadcaster is None
+            or _balance_broadcaster.pid != os.getpid()
+        ):
+            _balance_broadcaster = BalanceBroadcaster(
+                connect,
+                lambda: get_db_pool().get_connection(),
+                max_subscribers=EVENTS_MAX_STREAMS,
             )
+        return _balance_broadcaster
+
+
+def sse_event(event_id, data=None):
+    """One server-sent event; without data it only moves Last-Event-ID"""
+    message = f"id: {event_id}\n"
+    if data is not None:
+        message += f"data: {json.dumps(data)}\n"
+    return message + "\n"
+
 
-        return jsonify(period_list)
+@app.route("/events")
+def balance_events():
+    """Server-sent stream of account and budget category changes.
 
+    Each event is a /changes delta for accounts and budget_categories with
+    its watermark as the event id. Resumes from the Last-Event-ID header
+    (sent by EventSource on reconnect) or ?since=. Answers 503 when the
+    worker already has EVENTS_MAX_STREAMS streams open.
+    """
+    since = request.headers.get("Last-Event-ID") or request.args.get("since")
+    try:
+        since = int(since) if since else None
+    except ValueError:
+        return jsonify({"error": "Invalid request: bad event id"}), 400
+
+    try:
+        ensure_database()
+        conn = get_db_connection()
+        cur = conn.cursor()
+        if since is None:
+            watermark = current_watermark(cur)
+            first = sse_event(watermark)
+        else:
+            changes = fetch_changes(cur, since, BALANCE_EVENT_TABLES)
+            watermark = changes["since"]
+            first = sse_event(watermark, changes)
+        conn.close()
     except Exception as e:
         return jsonify({"error": str(e)})
 
+    broadcaster = get_balance_broadcaster()
+    # The listener pushes everything from where the catch-up ended, so no
+    # change falls in between
+    events = broadcaster.subscribe(watermark)
+    if events is None:
+        response = app.response_class(
+            f"retry: {EVENTS_FULL_RETRY * 1000}\n\n",
+            status=503,
+            mimetype="text/event-stream",
+        )
+        response.headers["Retry-After"] = str(EVENTS_FULL_RETRY)
+        return response
+
+    def stream():
+        try:
+            yield "retry: 5000\n\n"
+            yield first
+            deadline = time.monotonic() + EVENTS_MAX_AGE
+            while time.monotonic() < deadline:
+                try:
+                    event_id, changes = events.get(timeout=EVENTS_HEARTBEAT)
+                except queue.Empty:
+                    yield ": heartbeat\n\n"
+                    continue
+                if changes is None:
+                    break  # Dropped for falling behind
+                yield sse_event(event_id, changes)
+        finally:
+            broadcaster.unsubscribe(events)
+
+    response = app.response_class(stream(), mimetype="text/event-stream")
+    response.headers["Cache-Control"] = "no-cache"
+    # Stop reverse proxies from buffering the stream
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
+
 
 @app.route("/set_active_period", methods=["POST"])
 def set_active_period():
@@ -508,9 +1192,11 @@ def set_active_period():
             "UPDATE budget_periods SET is_active = TRUE WHERE id = %s",
             (period_id,),
         )
+        bump_data_version(cur, BUDGET_PERIODS)
 
         conn.commit()
         conn.close()
+        read_cache.invalidate(BUDGET_PERIODS)
 
         return jsonify(
             {"status": "success", "message": "Active period updated"}
@@ -664,19 +1350,15 @@ def add_income():
         conn = get_db_connection()
         cur = conn.cursor()
 
-        # Add income to target account
-        cur.execute(
-            "UPDATE accounts SET balance = balance + %s WHERE id = %s",
-            (amount, target_account_id),
-        )
-
-        # Record the income as a special transaction (negative amount indicates income)
+        # Record the income as a special transaction (negative amount
+        # indicates income); the balance trigger credits the account
         income_description = f"Income: {description} (received by {username})"
 
+        period_calendar.refresh(cur)
         cur.execute(
             """
-            INSERT INTO purchases (user_name, amount, account_id, budget_category_id, description, date)
-            VALUES (%s, %s, %s, NULL, %s, %s)
+            INSERT INTO purchases (user_name, amount, account_id, budget_category_id, description, date, period_id)
+            VALUES (%s, %s, %s, NULL, %s, %s, %s)
         """,
             (
                 username,
@@ -684,11 +1366,14 @@ def add_income():
                 target_account_id,
                 income_description,
                 income_date,
+                period_calendar.period_for(income_date),
             ),
         )
+        bump_data_version(cur, ACCOUNTS)
 
         conn.commit()
         conn.close()
+        read_cache.invalidate(ACCOUNTS)
 
         return jsonify(
             {"status": "success", "message": "Income added successfully"}
@@ -811,21 +1496,12 @@ def populate_monthly_budget():
             if result:
                 account_id = result[0]
 
-                # Add salary to account
-                cur.execute(
-                    """
-                    UPDATE accounts 
-                    SET balance = balance + %s 
-                    WHERE id = %s
-                """,
-                    (robert_salary, account_id),
-                )
-
-                # Record as income transaction
+                # Record as income transaction (credits the account)
+                period_calendar.refresh(cur)
                 cur.execute(
                     """
-                    INSERT INTO purchases (user_name, amount, account_id, budget_category_id, description, date)
-                    VALUES (%s, %s, %s, NULL, %s, %s)
+                    INSERT INTO purchases (user_name, amount, account_id, budget_category_id, description, date, period_id)
+                    VALUES (%s, %s, %s, NULL, %s, %s, %s)
                 """,
                     (
                         "Robert",
@@ -833,6 +1509,7 @@ def populate_monthly_budget():
                         account_id,
                         f"Monthly salary - {month_year}",
                         current_date,
+                        period_calendar.period_for(current_date),
                     ),
                 )
 
@@ -842,8 +1519,10 @@ def populate_monthly_budget():
             else:
                 print("Error: Robert - Bank Zero Cheque account not found")
 
+        bump_data_version(cur, ACCOUNTS, BUDGET_CATEGORIES)
         conn.commit()
         conn.close()
+        read_cache.invalidate(ACCOUNTS, BUDGET_CATEGORIES)
 
         print(
             f"Monthly budget population completed: {categories_updated} categories updated, salary added"
@@ -874,10 +1553,11 @@ def get_next_month_info():
 
 
 def check_or_create_period(conn, period_name, start_date, end_date):
-    """Check if next month's period exists, create if not"""
-    cur = conn.cursor()
+    """Check if next month's period exists, create if not.
 
-    print(f"Checking for period: {period_name}")
+    Runs inside the caller's transaction.
+    """
+    cur = conn.cursor()
 
     # Check if period already exists
     cur.execute(
@@ -890,34 +1570,92 @@ def check_or_create_period(conn, period_name, start_date, end_date):
         print(f"✓ Period '{period_name}' already exists (ID: {period_id})")
         return period_id
 
-    # Create new period
-    try:
-        cur.execute(
-            """
-            INSERT INTO budget_periods (period_name, start_date, end_date, is_active)
-            VALUES (%s, %s, %s, %s)
-        """,
-            (period_name, start_date, end_date, False),
-        )  # Start inactive
-
-        # Get the ID of the newly created period
-        cur.execute(
-            "SELECT currval(pg_get_serial_sequence('budget_periods', 'id'))"
-        )
-        period_id = cur.fetchone()[0]
+    # Create new period, inactive until the rollover activates it
+    cur.execute(
+        """
+        INSERT INTO budget_periods (period_name, start_date, end_date, is_active)
+        VALUES (%s, %s, %s, FALSE)
+        RETURNING id
+    """,
+        (period_name, start_date, end_date),
+    )
+    period_id = cur.fetchone()[0]
+    # Purchases already dated in the new period move into it
+    assign_purchase_periods(cur, start_date, end_date)
+    bump_data_version(cur, BUDGET_PERIODS)
+
+    print(f"✓ Created new period '{period_name}' (ID: {period_id})")
+    return period_id
+
+
+# Account names tried, in order, for a user's salary
+SALARY_ACCOUNT_PATTERNS = (
+    "{user} - Bank Zero Cheque",
+    "{user} - Cheque",
+    "{user} - Primary",
+    "{user} - Main",
+)
+
+
+def rollover_categories(settings):
+    """{category name: budgeted amount} for a new period, from the config"""
+    categories = {}
+    for user, user_categories in settings.get("budget_categories", {}).items():
+        for category, amount in user_categories.items():
+            if isinstance(amount, dict):
+                # Handle nested categories like Town Council
+                for sub_category, sub_amount in amount.items():
+                    name = f"{user} - {category} - {sub_category}"
+                    categories[name] = Decimal(str(sub_amount))
+            else:
+                categories[f"{user} - {category}"] = Decimal(str(amount))
+    return categories
 
-        conn.commit()
-        print(f"✓ Created new period '{period_name}' (ID: {period_id})")
-        return period_id
 
-    except Exception as e:
-        print(f"❌ Failed to create period '{period_name}': {e}")
-        conn.rollback()
-        return None
+def salary_accounts(cur, users):
+    """{user: (account id, name)} of each user's salary account"""
+    candidates = [
+        (user, rank, pattern.format(user=user))
+        for user in users
+        for rank, pattern in enumerate(SALARY_ACCOUNT_PATTERNS)
+    ]
+    cur.execute(
+        """
+        SELECT DISTINCT ON (c.user_name) c.user_name, a.id, a.name
+        FROM unnest(%s::text[], %s::int[], %s::text[])
+             AS c(user_name, rank, account_name)
+        JOIN accounts a ON a.name = c.account_name
+        ORDER BY c.user_name, c.rank
+    """,
+        (
+            [c[0] for c in candidates],
+            [c[1] for c in candidates],
+            [c[2] for c in candidates],
+        ),
+    )
+    return {
+        user: (account_id, name) for user, account_id, name in cur.fetchall()
+    }
 
 
+@track_queries
 def populate_monthly_budget_with_periods():
-    """Enhanced monthly budget population with proper period management"""
+    """Enhanced monthly budget population with proper period management.
+
+    Creates next month's period, its categories from the config and the
+    salary postings set-based, in one transaction: a failure leaves the
+    database as it was and the next run starts over.
+    """
+    conn = None
+    timings = {}
+    phase_started = time.perf_counter()
+
+    def end_phase(name):
+        nonlocal phase_started
+        now = time.perf_counter()
+        timings[name] = now - phase_started
+        phase_started = now
+
     try:
         ensure_database()
         settings = load_settings()
@@ -936,216 +1674,104 @@ def populate_monthly_budget_with_periods():
         period_name, start_date, end_date = get_next_month_info()
         print(f"Target period: {period_name} ({start_date} to {end_date})")
 
-        # Check/create period
         period_id = check_or_create_period(
             conn, period_name, start_date, end_date
         )
-        if not period_id:
-            print("❌ Could not create/find period - aborting")
-            return False
+        end_phase("period")
 
-        # Clear existing categories for this period (if any)
+        # Replace any categories an earlier run created for this period;
+        # purchases that reference them are detached first. The ledger
+        # triggers post both steps, so ledger sums still match the balances
+        cur.execute(DETACH_PERIOD_CATEGORIES_SQL, (period_id,))
         cur.execute(
-            "SELECT COUNT(*) FROM budget_categories WHERE period_id = %s",
+            "DELETE FROM budget_categories WHERE period_id = %s",
             (period_id,),
         )
-        existing_count = cur.fetchone()[0]
+        if cur.rowcount:
+            print(f"✓ Cleared {cur.rowcount} existing categories")
 
-        if existing_count > 0:
+        categories = rollover_categories(settings)
+        cur.execute(
+            """
+            INSERT INTO budget_categories (name, budgeted_amount, current_balance, period_id)
+            SELECT name, amount, amount, %s
+            FROM unnest(%s::text[], %s::numeric[]) AS c(name, amount)
+        """,
+            (period_id, list(categories), list(categories.values())),
+        )
+        categories_created = cur.rowcount
+        print(f"✓ Created {categories_created} budget categories")
+        end_phase("categories")
+
+        # Salaries (negative amount = income); the balance trigger credits
+        # the accounts
+        income = {
+            user: Decimal(str(salary))
+            for user, salary in settings.get("Income", {}).items()
+            if salary > 0
+        }
+        accounts = salary_accounts(cur, list(income))
+        for user in income.keys() - accounts.keys():
             print(
-                f"Clearing {existing_count} existing categories for {period_name}"
+                f"  ⚠ Warning: No suitable account found for {user}'s salary"
             )
-            # Clear purchases that reference these categories first
+        paid = [user for user in income if user in accounts]
+        total_income_added = sum(income[user] for user in paid)
+        if paid:
+            # Period of the salary date in SQL: the calendar cache must not
+            # pick up the period this uncommitted transaction created
             cur.execute(
-                """
-                UPDATE purchases 
-                SET budget_category_id = NULL 
-                WHERE budget_category_id IN (
-                    SELECT id FROM budget_categories WHERE period_id = %s
-                )
+                f"""
+                INSERT INTO purchases (user_name, amount, account_id, budget_category_id, description, date, period_id)
+                SELECT s.user_name, -s.salary, s.account_id, NULL, %s,
+                       p.date, {PERIOD_FOR_PURCHASE_SQL}
+                FROM unnest(%s::text[], %s::numeric[], %s::int[])
+                     AS s(user_name, salary, account_id)
+                CROSS JOIN (SELECT %s::timestamp AS date) p
             """,
-                (period_id,),
-            )
-
-            # Delete the categories
-            cur.execute(
-                "DELETE FROM budget_categories WHERE period_id = %s",
-                (period_id,),
+                (
+                    f"Monthly salary - {period_name}",
+                    paid,
+                    [income[user] for user in paid],
+                    [accounts[user][0] for user in paid],
+                    datetime.now(),
+                ),
             )
-            print(f"✓ Cleared {existing_count} existing categories")
-
-        # Populate budget categories for the new period
-        budget_categories = settings.get("budget_categories", {})
-        categories_created = 0
-
-        print(f"Populating budget categories for {period_name}...")
-
-        for user, categories in budget_categories.items():
-            print(f"  Processing {user}'s categories...")
-
-            for category, amount in categories.items():
-                if isinstance(amount, dict):
-                    # Handle nested categories like Town Council
-                    for sub_category, sub_amount in amount.items():
-                        category_name = f"{user} - {category} - {sub_category}"
-
-                        try:
-                            cur.execute(
-                                """
-                                INSERT INTO budget_categories (name, budgeted_amount, current_balance, period_id)
-                                VALUES (%s, %s, %s, %s)
-                            """,
-                                (
-                                    category_name,
-                                    float(sub_amount),
-                                    float(sub_amount),
-                                    period_id,
-                                ),
-                            )
-                            categories_created += 1
-                        except Exception as e:
-                            print(f"    ❌ Failed: {category_name} - {e}")
-                else:
-                    category_name = f"{user} - {category}"
-
-                    try:
-                        cur.execute(
-                            """
-                            INSERT INTO budget_categories (name, budgeted_amount, current_balance, period_id)
-                            VALUES (%s, %s, %s, %s)
-                        """,
-                            (
-                                category_name,
-                                float(amount),
-                                float(amount),
-                                period_id,
-                            ),
-                        )
-                        categories_created += 1
-                    except Exception as e:
-                        print(f"    ❌ Failed: {category_name} - {e}")
-
-        print(f"✓ Created {categories_created} budget categories")
-
-        # Add monthly income
-        income_data = settings.get("Income", {})
-        total_income_added = 0
-
-        print(f"Adding monthly income for {period_name}...")
-
-        for user, salary in income_data.items():
-            if salary > 0:
-                # Find user's primary account
-                account_patterns = [
-                    f"{user} - Bank Zero Cheque",
-                    f"{user} - Cheque",
-                    f"{user} - Primary",
-                    f"{user} - Main",
-                ]
-
-                account_found = False
-                for pattern in account_patterns:
-                    cur.execute(
-                        "SELECT id, balance, name FROM accounts WHERE name = %s",
-                        (pattern,),
-                    )
-                    result = cur.fetchone()
-                    if result:
-                        account_id, current_balance, account_name = result
-
-                        # Convert current_balance to float if needed
-                        if hasattr(current_balance, "__float__"):
-                            current_balance = float(current_balance)
-
-                        # Add salary to account
-                        cur.execute(
-                            "UPDATE accounts SET balance = balance + %s WHERE id = %s",
-                            (float(salary), account_id),
-                        )
-
-                        # Record salary transaction (negative amount = income)
-                        description = f"Monthly salary - {period_name}"
-                        cur.execute(
-                            """
-                            INSERT INTO purchases (user_name, amount, account_id, budget_category_id, description, date)
-                            VALUES (%s, %s, %s, NULL, %s, %s)
-                        """,
-                            (
-                                user,
-                                -float(salary),
-                                account_id,
-                                description,
-                                datetime.now(),
-                            ),
-                        )
-
-                        new_balance = current_balance + float(salary)
-                        total_income_added += float(salary)
-                        print(
-                            f"  ✓ Added R{salary} salary to {account_name} for {user}"
-                        )
-                        account_found = True
-                        break
-
-                if not account_found:
-                    print(
-                        f"  ⚠ Warning: No suitable account found for {user}'s salary"
-                    )
-
-        # Activate the new period
-        print(f"Activating period: {period_name}")
-
-        # Deactivate all periods
-        cur.execute("UPDATE budget_periods SET is_active = FALSE")
+            for user in paid:
+                print(
+                    f"  ✓ Added R{income[user]} salary to {accounts[user][1]} for {user}"
+                )
+        end_phase("salaries")
 
-        # Activate the new period
+        # Make the new period the only active one
         cur.execute(
-            "UPDATE budget_periods SET is_active = TRUE WHERE id = %s",
-            (period_id,),
+            "UPDATE budget_periods SET is_active = (id = %s)", (period_id,)
         )
-
         print(f"✓ Period '{period_name}' is now active")
 
         # Log execution for audit
-        try:
-            # Create execution log table if it doesn't exist
-            cur.execute(
-                """
-                CREATE TABLE IF NOT EXISTS budget_automation_log (
-                    id SERIAL PRIMARY KEY,
-                    execution_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    period_name TEXT NOT NULL,
-                    categories_created INTEGER DEFAULT 0,
-                    income_added DECIMAL(10,2) DEFAULT 0,
-                    success BOOLEAN DEFAULT FALSE,
-                    notes TEXT
-                )
+        phase_notes = ", ".join(
+            f"{name} {seconds * 1000:.0f} ms"
+            for name, seconds in timings.items()
+        )
+        cur.execute(
             """
-            )
-
-            # Insert log entry
-            notes = f"Automated budget population for {period_name}"
-            cur.execute(
-                """
-                INSERT INTO budget_automation_log (period_name, categories_created, income_added, success, notes)
-                VALUES (%s, %s, %s, %s, %s)
-            """,
-                (
-                    period_name,
-                    categories_created,
-                    float(total_income_added),
-                    True,
-                    notes,
-                ),
-            )
-
-            print(f"✓ Logged execution for {period_name}")
-
-        except Exception as e:
-            print(f"⚠ Failed to log execution: {e}")
+            INSERT INTO budget_automation_log (period_name, categories_created, income_added, success, notes)
+            VALUES (%s, %s, %s, %s, %s)
+        """,
+            (
+                period_name,
+                categories_created,
+                total_income_added,
+                True,
+                f"Automated budget population for {period_name} ({phase_notes})",
+            ),
+        )
 
+        bump_data_version(cur, ACCOUNTS, BUDGET_CATEGORIES, BUDGET_PERIODS)
         conn.commit()
-        conn.close()
+        read_cache.invalidate(ACCOUNTS, BUDGET_CATEGORIES, BUDGET_PERIODS)
+        end_phase("activate and commit")
 
         # Final summary
         print("\n" + "=" * 60)
@@ -1154,7 +1780,8 @@ def populate_monthly_budget_with_periods():
         print(f"Period: {period_name}")
         print(f"Categories created: {categories_created}")
         print(f"Income added: R{total_income_added:.2f}")
-        print(f"Period activated: ✓")
+        for name, seconds in timings.items():
+            print(f"⏱ {name}: {seconds * 1000:.1f} ms")
         print(f"Overall success: ✓")
 
         print(f"\n🎉 Successfully prepared {period_name} budget!")
@@ -1166,6 +1793,48 @@ def populate_monthly_budget_with_periods():
 
         traceback.print_exc()
         return False
+    finally:
+        # Rolls back whatever was not committed
+        if conn is not None:
+            conn.close()
+
+
+# Days of change_log history kept for /changes clients
+CHANGE_LOG_RETENTION_DAYS = 30
+
+
+@track_queries
+def prune_change_log_job():
+    """Drop change_log entries older than the retention window"""
+    conn = None
+    try:
+        conn = get_db_connection()
+        cur = conn.cursor()
+        deleted = prune_change_log(cur, CHANGE_LOG_RETENTION_DAYS)
+        conn.commit()
+        print(f"🧹 Pruned {deleted} change_log entries")
+    except Exception as e:
+        print(f"❌ Error pruning change_log: {e}")
+    finally:
+        if conn is not None:
+            conn.close()
+
+
+@track_queries
+def snapshot_balances_job():
+    """Checkpoint balances so as-of lookups replay a short ledger tail"""
+    conn = None
+    try:
+        conn = get_db_connection()
+        cur = conn.cursor()
+        taken = take_balance_snapshots(cur)
+        conn.commit()
+        print(f"📸 Took {taken} balance snapshots")
+    except Exception as e:
+        print(f"❌ Error taking balance snapshots: {e}")
+    finally:
+        if conn is not None:
+            conn.close()
 
 
 def setup_enhanced_monthly_scheduler():
@@ -1195,27 +1864,44 @@ def setup_enhanced_monthly_scheduler():
         return None
 
 
-def setup_enhanced_monthly_scheduler():
-    """Set up the enhanced monthly budget scheduler"""
-    try:
-        scheduler = BackgroundScheduler()
+def add_scheduled_jobs(scheduler):
+    """Jobs of the one elected scheduler (see job_scheduler)"""
+    # The job store table comes from the migrations
+    ensure_database()
 
-        # Schedule for 24th of each month at midnight SAST (22:00 UTC)
-        scheduler.add_job(
-            func=populate_monthly_budget_with_periods,
-            trigger="cron",
-            day=24,
-            hour=22,  # 22:00 UTC = 00:00 SAST
-            minute=0,
-            id="monthly_budget_population_enhanced",
-            replace_existing=True,
-        )
+    # 24th of each month at midnight SAST (22:00 UTC)
+    schedule_job(
+        scheduler,
+        "monthly_budget_population_enhanced",
+        populate_monthly_budget_with_periods,
+        CronTrigger(day=24, hour=22, minute=0),
+    )
+    schedule_job(
+        scheduler,
+        "change_log_prune",
+        prune_change_log_job,
+        CronTrigger(hour=1, minute=30),
+    )
+    schedule_job(
+        scheduler,
+        "balance_snapshots",
+        snapshot_balances_job,
+        CronTrigger(hour=1, minute=45),
+    )
 
-        scheduler.start()
+
+def setup_enhanced_monthly_scheduler():
+    """Start this worker's candidate for running the scheduled jobs"""
+    if not os.environ.get("DATABASE_URL"):
+        print("DATABASE_URL not set - scheduler disabled")
+        return None
+
+    try:
+        leader = LeaderScheduler(connect, add_scheduled_jobs).start()
         print(
-            "Enhanced monthly budget scheduler started - will run on 24th of each month at midnight SAST"
+            "Enhanced monthly budget scheduler candidate started - the elected worker runs it on 24th of each month at midnight SAST"
         )
-        return scheduler
+        return leader
 
     except Exception as e:
         print(f"Error setting up enhanced scheduler: {e}")
@@ -1313,6 +1999,49 @@ def admin_populate_budget():
         return jsonify({"status": "error", "message": str(e)})
 
 
+@app.route("/admin/db_pool_stats")
+def admin_db_pool_stats():
+    """Connection pool counters for this worker process"""
+    return jsonify(get_db_pool().stats())
+
+
+@app.route("/admin/read_cache_stats")
+def admin_read_cache_stats():
+    """Read cache counters for this worker process (all workers: /metrics)"""
+    return jsonify(read_cache.stats())
+
+
+@app.route("/metrics")
+def prometheus_metrics():
+    """Request, database and payload metrics of all workers"""
+    body, content_type = metrics.render()
+    return app.response_class(body, content_type=content_type)
+
+
+@app.route("/admin/scheduler")
+def admin_scheduler():
+    """Whether this worker is the elected scheduler, and its jobs"""
+    leader = scheduler.scheduler if scheduler is not None else None
+    jobs = leader.get_jobs() if leader is not None else []
+    return jsonify(
+        {
+            "pid": os.getpid(),
+            "leader": leader is not None,
+            "jobs": [
+                {
+                    "id": job.id,
+                    "next_run_time": (
+                        job.next_run_time.isoformat()
+                        if job.next_run_time
+                        else None
+                    ),
+                }
+                for job in jobs
+            ],
+        }
+    )
+
+
 # Migration endpoint removed for security
 
 
@@ -1351,7 +2080,7 @@ scheduler = None
 
 
 def initialize_enhanced_scheduler():
-    """Initialize the enhanced monthly budget scheduler"""
+    """Start the scheduler leader election for this worker"""
     global scheduler
     if scheduler is None:
         scheduler = setup_enhanced_monthly_scheduler()
@@ -0,0 +1,188 @@
+"""
+Balance Event Broadcaster
+=========================
+
+Pushes account and budget category changes to /events (server-sent events)
+subscribers. The change_log trigger calls pg_notify('balance_changes') on
+every account or category write; one listener thread per worker process
+LISTENs on a dedicated connection, turns each burst of notifications into a
+/changes-style delta and hands it to every connected stream.
+
+Event ids are change-feed watermarks, so a reconnecting EventSource resumes
+from its Last-Event-ID through change_feed.fetch_changes. A new stream
+subscribes with the watermark its catch-up ended at; the listener moves
+back to the oldest such watermark and reads from there, so a change
+committed between the catch-up and the subscription is still pushed (other
+streams may get it twice, which is harmless).
+
+The listener only runs while streams are connected. When the last one
+leaves, it closes its connection, which ends the LISTEN. Notifications
+therefore never queue up unread in PostgreSQL's notify queue, and the next
+subscriber never gets a stale burst. The next subscribe() starts a fresh
+listener from its subscriber's watermark.
+"""
+
+import os
+import queue
+import threading
+import time
+
+from change_feed import fetch_changes
+
+CHANNEL = "balance_changes"
+TABLES = ("accounts", "budget_categories")
+
+
+class BalanceBroadcaster:
+    def __init__(
+        self,
+        connect_func,
+        get_connection,
+        poll_interval=1.0,
+        max_subscribers=None,
+    ):
+        """
+        connect_func: opens the dedicated LISTEN connection
+        get_connection: borrows a pooled connection for reading changes
+        poll_interval: seconds between checks for notifications while
+            at least one stream is connected
+        max_subscribers: streams allowed at once (None for no limit)
+        """
+        self.connect_func = connect_func
+        self.get_connection = get_connection
+        self.poll_interval = poll_interval
+        self.max_subscribers = max_subscribers
+        self.pid = os.getpid()
+
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._watermark = None
+        # Set when a subscriber moved the watermark back; forces a read
+        self._rewound = False
+
+    def subscribe(self, since):
+        """Queue receiving (event id, delta) tuples for changes from the
+        watermark since onwards; starts the listener. None when
+        max_subscribers streams are already connected"""
+        q = queue.Queue(maxsize=100)
+        with self._lock:
+            if (
+                self.max_subscribers is not None
+                and len(self._subscribers) >= self.max_subscribers
+            ):
+                return None
+            self._subscribers.add(q)
+            if self._watermark is None or since < self._watermark:
+                self._watermark = since
+                self._rewound = True
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="balance-events", daemon=True
+                )
+                self._thread.start()
+        return q
+
+    def unsubscribe(self, q):
+        with self._lock:
+            self._subscribers.discard(q)
+
+    def subscriber_count(self):
+        with self._lock:
+            return len(self._subscribers)
+
+    def _publish(self, event_id, delta):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for q in subscribers:
+            try:
+                q.put_nowait((event_id, delta))
+            except queue.Full:
+                # Stalled client: drop it, EventSource reconnects and
+                # catches up from its Last-Event-ID
+                self.unsubscribe(q)
+                while not q.empty():
+                    try:
+                        q.get_nowait()
+                    except queue.Empty:
+                        break
+                q.put_nowait((None, None))
+
+    def _read_changes(self):
+        """Delta since the last broadcast; None when nothing changed"""
+        with self._lock:
+            since = self._watermark
+            self._rewound = False
+        conn = self.get_connection()
+        try:
+            changes = fetch_changes(conn.cursor(), since, TABLES)
+        finally:
+            conn.close()
+
+        with self._lock:
+            # A subscriber that moved it back meanwhile is read next time
+            if not self._rewound:
+                self._watermark = changes["since"]
+        if not any(
+            changes[t]["upserted"] or changes[t]["deleted"] for t in TABLES
+        ):
+            return None
+        return changes
+
+    def _stop_if_idle(self):
+        """Whether the listener should exit; decided under the lock so a
+        concurrent subscribe() either sees it running or starts a new one"""
+        with self._lock:
+            if self._subscribers:
+                return False
+            self._thread = None
+            # The next listener starts from its subscriber's watermark
+            self._watermark = None
+            return True
+
+    def _run(self):
+        listen_conn = None
+        backoff = 1
+        while not self._stop_if_idle():
+            try:
+                if listen_conn is None:
+                    listen_conn = self.connect_func()
+                    # execute_simple runs outside a transaction, so LISTEN
+                    # takes effect immediately
+                    listen_conn.execute_simple(f"LISTEN {CHANNEL}")
+                    print(f"📡 Listening for {CHANNEL} (pid {self.pid})")
+                    backoff = 1
+                    # Notifications may have been missed while disconnected
+                    notified = True
+                else:
+                    time.sleep(self.poll_interval)
+                    if not self.subscriber_count():
+                        continue  # Stops at the top of the loop
+                    # pg8000 collects notifications while reading any reply
+                    listen_conn.execute_simple("SELECT 1")
+                    notified = bool(listen_conn.notifications) or self._rewound
+                    listen_conn.notifications.clear()
+
+                if notified:
+                    changes = self._read_changes()
+                    if changes is not None:
+                        self._publish(changes["since"], changes)
+
+            except Exception as e:
+                print(f"❌ Balance listener error: {e}")
+                if listen_conn is not None:
+                    try:
+                        listen_conn.close()
+                    except Exception:
+                        pass
+                    listen_conn = None
+                time.sleep(backoff)
+                backoff = min(backoff * 2, 60)
+
+        # Closing the connection ends the LISTEN
+        if listen_conn is not None:
+            try:
+                listen_conn.close()
+            except Exception:
+                pass
+        print(f"📡 Stopped listening for {CHANNEL} (pid {self.pid})")
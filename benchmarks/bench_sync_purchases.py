@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Benchmark /sync_purchases Ingestion
+===================================
+
+Posts offline-queue sized batches to /sync_purchases through the Flask test
+client and reports rows/sec for each batch size.
+
+Usage:
+    BENCHMARK_DATABASE_URL=postgresql://... python benchmarks/bench_sync_purchases.py
+
+Requirements:
+    - BENCHMARK_DATABASE_URL pointing at a scratch database (never the live
+      one: rows are inserted and balances changed, then cleaned up)
+"""
+
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+BATCH_SIZES = [1, 50, 500, 5000]
+MIN_ROWS_PER_SIZE = 5000  # Repeat small batches until this many rows
+MARKER = "benchmark-sync-purchases"
+
+
+def main():
+    database_url = os.environ.get("BENCHMARK_DATABASE_URL")
+    if not database_url:
+        print("BENCHMARK_DATABASE_URL not set - refusing to run")
+        sys.exit(1)
+
+    # app.py reads DATABASE_URL when it connects
+    os.environ["DATABASE_URL"] = database_url
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+    import app as budget_app
+
+    budget_app.init_db()
+    client = budget_app.app.test_client()
+
+    conn = budget_app.get_db_connection()
+    cur = conn.cursor()
+    cur.execute(
+        "INSERT INTO accounts (name, account_type, balance) VALUES (%s, 'bank', 0) "
+        "ON CONFLICT (name) DO UPDATE SET name = EXCLUDED.name RETURNING id",
+        (f"Benchmark - {MARKER}",),
+    )
+    account_id = cur.fetchone()[0]
+    cur.execute(
+        "SELECT id, name FROM budget_categories ORDER BY id DESC LIMIT 1"
+    )
+    category = cur.fetchone()
+    conn.commit()
+    conn.close()
+    category_name = category[1] if category else ""
+
+    print(
+        f"{'batch':>6} {'batches':>8} {'rows':>7} {'seconds':>9} {'rows/sec':>10}"
+    )
+
+    now = datetime.now()
+    try:
+        for batch_size in BATCH_SIZES:
+            batches = max(1, MIN_ROWS_PER_SIZE // batch_size)
+            payloads = [
+                [
+                    {
+                        "account_id": account_id,
+                        "amount": 1.25,
+                        "category": category_name,
+                        "description": MARKER,
+                        "timestamp": (now - timedelta(seconds=i)).isoformat(),
+                        "user_name": "Benchmark",
+                    }
+                    for i in range(batch_size)
+                ]
+                for _ in range(batches)
+            ]
+
+            started = time.perf_counter()
+            for payload in payloads:
+                result = client.post("/sync_purchases", json=payload).json
+                if result.get("status") != "success":
+                    raise RuntimeError(f"Sync failed: {result}")
+            elapsed = time.perf_counter() - started
+
+            rows = batch_size * batches
+            print(
+                f"{batch_size:>6} {batches:>8} {rows:>7} {elapsed:>9.3f} "
+                f"{rows / elapsed:>10.0f}"
+            )
+    finally:
+        cleanup(budget_app, account_id)
+
+
+def cleanup(budget_app, account_id):
+    """Remove benchmark rows; the balance trigger refunds the category"""
+    conn = budget_app.get_db_connection()
+    cur = conn.cursor()
+    cur.execute("DELETE FROM purchases WHERE description = %s", (MARKER,))
+    cur.execute("DELETE FROM accounts WHERE id = %s", (account_id,))
+    conn.commit()
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
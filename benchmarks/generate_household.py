@@ -0,0 +1,571 @@
+#!/usr/bin/env python3
+"""
+Synthetic Household Generator
+=============================
+
+Generates a household of any size: a settings.json variant (users, bank
+accounts, budget categories including nested ones like "Town Council",
+salaries) and, with --load, matching database contents: monthly budget
+periods with their categories, purchases with seasonal spend, transfers
+and salary income.
+
+The same --seed always produces the same household. Purchases and
+transfers are streamed to the database with COPY, so multi-million-row
+households load without per-row round trips. The balance, ledger and
+change_log triggers stay enabled, so balances and history are exactly what
+the app would have produced.
+
+Run the app against the household with SETTINGS_FILE=<settings file>.
+
+Usage:
+    python benchmarks/generate_household.py --users 4 --settings-out s.json
+    BENCHMARK_DATABASE_URL=postgresql://... python \\
+        benchmarks/generate_household.py --users 6 --purchases-per-month \\
+        50000 --periods 36 --load --reset
+
+Requirements:
+    - BENCHMARK_DATABASE_URL pointing at a scratch database (never the live
+      one) for --load
+"""
+
+import argparse
+import csv
+import io
+import json
+import math
+import os
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+from dateutil.relativedelta import relativedelta
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+USER_NAMES = [
+    "Robert",
+    "Peanut",
+    "Anele",
+    "Thandi",
+    "Pieter",
+    "Naledi",
+    "Johan",
+    "Lerato",
+]
+ACCOUNT_TYPES = [
+    "Bank Zero Cheque",  # First: where salaries are paid
+    "Bank Zero Savings",
+    "Cash",
+    "Tyme Cheque",
+    "Tyme Savings",
+    "Tyme Business",
+    "Credit Card",
+    "Investment",
+]
+
+# Monthly spend multiplier by calendar month (1-12)
+SEASONS = {
+    "flat": {},
+    "fixed": {},  # One debit order a month for the budgeted amount
+    "winter": {5: 1.3, 6: 1.6, 7: 1.7, 8: 1.4, 12: 0.7, 1: 0.7},
+    "festive": {11: 1.4, 12: 2.5, 1: 1.2, 2: 0.7},
+    "school": {1: 2.0, 7: 1.3},
+}
+
+# (name, typical monthly budget, season)
+CATEGORY_TEMPLATES = [
+    ("Rent", 15000, "fixed"),
+    ("Household Allowance", 8000, "flat"),
+    ("Groceries", 6000, "festive"),
+    ("Transport", 4200, "flat"),
+    ("Electricity", 1500, "winter"),
+    ("Medical Aid", 3200, "fixed"),
+    ("King Price", 918.43, "fixed"),
+    ("Rain Internet", 1125, "fixed"),
+    ("Rain SIM card recharge", 50, "flat"),
+    ("School Fees", 2500, "school"),
+    ("Gifts", 500, "festive"),
+    ("Holiday", 1500, "festive"),
+    ("Eating Out", 1200, "festive"),
+    ("Clothing", 800, "winter"),
+    ("Software", 838, "fixed"),
+    ("Uber", 400, "flat"),
+    ("Tithing", 150, "fixed"),
+    ("Bank Charges", 100, "fixed"),
+    ("Savings", 500, "fixed"),
+    ("Pets", 600, "flat"),
+    ("Garden", 350, "flat"),
+    ("Heating", 700, "winter"),
+    ("Fuel", 2500, "festive"),
+    ("Books", 300, "school"),
+]
+NESTED_TEMPLATES = [
+    ("Town Council", "Account no {}", (262.6, 2064.36), "winter"),
+    ("Insurance", "Policy {}", (180, 950), "fixed"),
+    ("Loans", "Loan {}", (500, 3000), "fixed"),
+]
+
+COPY_CHUNK = 250_000  # Rows per COPY statement (and commit)
+COPY_BUFFER = 1 << 16  # Bytes per CopyData message
+
+
+def season_factor(season, month):
+    return SEASONS[season].get(month, 1.0)
+
+
+def generate_settings(rng, users, accounts_per_user, categories, nested):
+    """settings.json variant: bank_accounts, budget_categories and Income"""
+    names = [
+        USER_NAMES[i] if i < len(USER_NAMES) else f"User {i + 1}"
+        for i in range(users)
+    ]
+    bank_accounts = {}
+    budget_categories = {}
+    income = {}
+    for name in names:
+        bank_accounts[name] = ACCOUNT_TYPES[:accounts_per_user] + [
+            f"Account {i + 1}"
+            for i in range(max(0, accounts_per_user - len(ACCOUNT_TYPES)))
+        ]
+
+        user_categories = {}
+        for i in range(categories):
+            template, base, _ = CATEGORY_TEMPLATES[i % len(CATEGORY_TEMPLATES)]
+            label = (
+                template if i < len(CATEGORY_TEMPLATES) else f"{template} {i}"
+            )
+            user_categories[label] = round(base * rng.uniform(0.6, 1.4), 2)
+        for i in range(nested):
+            group, sub_label, (low, high), _ = NESTED_TEMPLATES[
+                i % len(NESTED_TEMPLATES)
+            ]
+            group = group if i < len(NESTED_TEMPLATES) else f"{group} {i}"
+            user_categories[group] = {
+                sub_label.format(
+                    rng.randrange(5_000_000_000, 5_099_999_999)
+                ): (round(rng.uniform(low, high), 2))
+                for _ in range(rng.randint(2, 3))
+            }
+        budget_categories[name] = user_categories
+
+        total = sum(
+            sum(v.values()) if isinstance(v, dict) else v
+            for v in user_categories.values()
+        )
+        # Like the live household, not everyone earns a salary
+        income[name] = round(total * 1.05, 2) if rng.random() < 0.8 else 0.0
+    # At least one salary so the rollover has income to post
+    if not any(income.values()):
+        income[names[0]] = 50000.0
+
+    return {
+        "app_title": "Synthetic household budget",
+        "copyright_text": "Generated test data",
+        "app_version": "0.1",
+        "bank_accounts": bank_accounts,
+        "budget_categories": budget_categories,
+        "Income": income,
+    }
+
+
+def category_seasons(settings):
+    """{category name as stored: season} for the flattened categories"""
+    seasons = {}
+    templates = {name: season for name, _, season in CATEGORY_TEMPLATES}
+    nested = {group: season for group, _, _, season in NESTED_TEMPLATES}
+    for user, categories in settings["budget_categories"].items():
+        for category, amount in categories.items():
+            base = category.rstrip("0123456789 ")
+            if isinstance(amount, dict):
+                for sub_category in amount:
+                    name = f"{user} - {category} - {sub_category}"
+                    seasons[name] = nested.get(base, "fixed")
+            else:
+                seasons[f"{user} - {category}"] = templates.get(base, "flat")
+    return seasons
+
+
+def period_dates(periods):
+    """(name, start, end) of the last `periods` months, oldest first.
+
+    24th-to-23rd like get_next_month_info(), ending before the period the
+    next rollover creates.
+    """
+    this_start = date.today().replace(day=24)
+    result = []
+    for back in range(periods, 0, -1):
+        start = this_start - relativedelta(months=back)
+        end = start + relativedelta(months=1, days=-1)
+        name = (start + relativedelta(months=1)).strftime("%B %Y")
+        result.append((name, start, end))
+    return result
+
+
+def random_moment(rng, start, end):
+    days = (end - start).days + 1
+    return datetime.combine(start, datetime.min.time()) + timedelta(
+        days=rng.randrange(days),
+        seconds=rng.randrange(7 * 3600, 22 * 3600),  # Shops open
+    )
+
+
+def generate_purchases(rng, settings, ctx, purchases_per_month):
+    """Purchase rows for every period: spend, debit orders and salaries.
+
+    Each purchase picks a category weighted by the square root of its
+    seasonal budget, so big categories get fewer, larger purchases, and
+    takes an amount around that category's budget share. Rows are
+    (user_name, amount, account_id, budget_category_id, description, date,
+    period_id).
+    """
+    seasons = category_seasons(settings)
+    budgets = budget_amounts(settings)
+    user_accounts = ctx["user_accounts"]
+
+    for period_name, start, end in ctx["periods"]:
+        period_id = ctx["period_ids"][period_name]
+        month = (start + relativedelta(months=1)).month
+        category_ids = ctx["category_ids"][period_id]
+
+        variable = []
+        for name, budget in budgets.items():
+            user = name.split(" - ", 1)[0]
+            accounts = user_accounts[user]
+            season = seasons[name]
+            spend = budget * season_factor(season, month)
+            if season == "fixed" or budget <= 0:
+                if budget > 0:
+                    yield (
+                        user,
+                        round(budget, 2),
+                        accounts[0],
+                        category_ids[name],
+                        f"Debit order - {name.split(' - ', 1)[1]}",
+                        random_moment(rng, start, start + timedelta(days=4)),
+                        period_id,
+                    )
+                continue
+            variable.append((name, user, accounts, spend))
+
+        if variable:
+            weights = [math.sqrt(spend) for _, _, _, spend in variable]
+            total_weight = sum(weights)
+            for (name, user, accounts, spend), weight in zip(
+                variable, weights
+            ):
+                count = max(
+                    1, round(purchases_per_month * weight / total_weight)
+                )
+                mean = spend / count
+                for _ in range(count):
+                    # Lognormal with the category's mean purchase amount
+                    amount = rng.lognormvariate(math.log(mean) - 0.18, 0.6)
+                    yield (
+                        user,
+                        round(max(amount, 1), 2),
+                        # Mostly the cheque account, sometimes any other
+                        (
+                            accounts[0]
+                            if rng.random() < 0.7
+                            else rng.choice(accounts)
+                        ),
+                        category_ids[name],
+                        f"{name.split(' - ', 1)[1]} purchase",
+                        random_moment(rng, start, end),
+                        period_id,
+                    )
+
+        for user, salary in settings["Income"].items():
+            if salary > 0:
+                yield (
+                    user,
+                    -round(salary, 2),
+                    user_accounts[user][0],
+                    None,
+                    f"Monthly salary - {period_name}",
+                    datetime.combine(start, datetime.min.time()),
+                    period_id,
+                )
+
+
+def generate_transfers(rng, ctx, transfers_per_month):
+    """(from, to, amount, description, originator_user, transfer_date)"""
+    users = list(ctx["user_accounts"])
+    for _, start, end in ctx["periods"]:
+        for _ in range(transfers_per_month):
+            user = rng.choice(users)
+            accounts = ctx["user_accounts"][user]
+            if len(accounts) > 1 and rng.random() < 0.85:
+                from_id, to_id = rng.sample(accounts, 2)
+            else:
+                # Between household members
+                other = rng.choice(users)
+                from_id = accounts[0]
+                to_id = ctx["user_accounts"][other][0]
+                if from_id == to_id:
+                    continue
+            yield (
+                from_id,
+                to_id,
+                round(rng.uniform(100, 5000), 2),
+                "Synthetic transfer",
+                user,
+                random_moment(rng, start, end),
+            )
+
+
+def budget_amounts(settings):
+    """{category name as stored: budgeted amount}, nested ones flattened"""
+    amounts = {}
+    for user, categories in settings["budget_categories"].items():
+        for category, amount in categories.items():
+            if isinstance(amount, dict):
+                for sub_category, sub_amount in amount.items():
+                    name = f"{user} - {category} - {sub_category}"
+                    amounts[name] = float(sub_amount)
+            else:
+                amounts[f"{user} - {category}"] = float(amount)
+    return amounts
+
+
+def csv_chunks(rows):
+    """Rows as CSV text in COPY_BUFFER sized pieces (None becomes NULL)"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    for row in rows:
+        writer.writerow(row)
+        if buffer.tell() >= COPY_BUFFER:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def copy_rows(conn, table, columns, rows):
+    """COPY rows into table, COPY_CHUNK rows per statement; rows copied"""
+    cur = conn.cursor()
+    sql = f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)"
+    copied = 0
+    rows = iter(rows)
+    while True:
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= COPY_CHUNK:
+                break
+        if not chunk:
+            return copied
+        cur.execute(sql, stream=csv_chunks(chunk))
+        conn.commit()
+        copied += len(chunk)
+        print(f"  {table}: {copied} rows")
+
+
+def load(conn, rng, settings, args):
+    """Accounts, periods and categories, then COPY the purchases/transfers"""
+    from data_versions import RESOURCES, bump_data_version
+
+    cur = conn.cursor()
+    accounts = [
+        (f"{user} - {account_type}", user)
+        for user, types in settings["bank_accounts"].items()
+        for account_type in types
+    ]
+    # Opening balances are posted to the ledger as adjustments
+    cur.execute(
+        """
+        INSERT INTO accounts (name, account_type, balance)
+        SELECT name, 'bank', balance
+        FROM unnest(%s::text[], %s::numeric[]) AS a(name, balance)
+        RETURNING id, name
+    """,
+        (
+            [name for name, _ in accounts],
+            [round(rng.uniform(0, 20000), 2) for _ in accounts],
+        ),
+    )
+    account_ids = {name: id_ for id_, name in cur.fetchall()}
+    user_accounts = {}
+    for name, user in accounts:
+        user_accounts.setdefault(user, []).append(account_ids[name])
+
+    periods = period_dates(args.periods)
+    cur.execute(
+        """
+        INSERT INTO budget_periods (period_name, start_date, end_date, is_active)
+        SELECT name, start_date, end_date, start_date = %s
+        FROM unnest(%s::text[], %s::date[], %s::date[])
+             AS p(name, start_date, end_date)
+        RETURNING id, period_name
+    """,
+        (
+            periods[-1][1],
+            [p[0] for p in periods],
+            [p[1] for p in periods],
+            [p[2] for p in periods],
+        ),
+    )
+    period_ids = {name: id_ for id_, name in cur.fetchall()}
+
+    # Like the rollover: current_balance starts at the budgeted amount
+    budgets = budget_amounts(settings)
+    cur.execute(
+        """
+        INSERT INTO budget_categories (name, budgeted_amount, current_balance,
+                                       period_id)
+        SELECT c.name, c.amount, c.amount, p.id
+        FROM unnest(%s::text[], %s::numeric[]) AS c(name, amount)
+        CROSS JOIN unnest(%s::int[]) AS p(id)
+        RETURNING id, name, period_id
+    """,
+        (list(budgets), list(budgets.values()), list(period_ids.values())),
+    )
+    category_ids = {}
+    for id_, name, period_id in cur.fetchall():
+        category_ids.setdefault(period_id, {})[name] = id_
+    conn.commit()
+
+    ctx = {
+        "periods": periods,
+        "period_ids": period_ids,
+        "category_ids": category_ids,
+        "user_accounts": user_accounts,
+    }
+    purchases = copy_rows(
+        conn,
+        "purchases",
+        (
+            "user_name",
+            "amount",
+            "account_id",
+            "budget_category_id",
+            "description",
+            "date",
+            "period_id",
+        ),
+        generate_purchases(rng, settings, ctx, args.purchases_per_month),
+    )
+    transfers = copy_rows(
+        conn,
+        "transfers",
+        (
+            "from_account_id",
+            "to_account_id",
+            "amount",
+            "description",
+            "originator_user",
+            "transfer_date",
+        ),
+        generate_transfers(rng, ctx, args.transfers_per_month),
+    )
+
+    bump_data_version(cur, *RESOURCES)
+    for table in (
+        "accounts",
+        "budget_periods",
+        "budget_categories",
+        "purchases",
+        "transfers",
+        "ledger_entries",
+        "change_log",
+    ):
+        cur.execute(f"ANALYZE {table}")
+    conn.commit()
+    return purchases, transfers
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--users", type=int, default=2)
+    parser.add_argument("--accounts-per-user", type=int, default=5)
+    parser.add_argument(
+        "--categories",
+        type=int,
+        default=18,
+        help="flat categories per user",
+    )
+    parser.add_argument(
+        "--nested", type=int, default=1, help="nested categories per user"
+    )
+    parser.add_argument("--periods", type=int, default=12)
+    parser.add_argument(
+        "--purchases-per-month",
+        type=int,
+        default=400,
+        help="household total before seasonal variation and debit orders",
+    )
+    parser.add_argument("--transfers-per-month", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument(
+        "--settings-out",
+        type=Path,
+        help="settings file (default benchmarks/results/"
+        "settings-<users>u-seed<seed>.json)",
+    )
+    parser.add_argument(
+        "--load",
+        action="store_true",
+        help="load the household into BENCHMARK_DATABASE_URL",
+    )
+    parser.add_argument(
+        "--reset",
+        action="store_true",
+        help="empty the budget tables first (required if they hold data)",
+    )
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    settings = generate_settings(
+        rng, args.users, args.accounts_per_user, args.categories, args.nested
+    )
+    settings_out = args.settings_out or (
+        Path(__file__).resolve().parent
+        / "results"
+        / f"settings-{args.users}u-seed{args.seed}.json"
+    )
+    settings_out.parent.mkdir(parents=True, exist_ok=True)
+    settings_out.write_text(json.dumps(settings, indent=2))
+    print(f"Settings written to {settings_out}")
+
+    if not args.load:
+        return
+
+    database_url = os.environ.get("BENCHMARK_DATABASE_URL")
+    if not database_url:
+        print("BENCHMARK_DATABASE_URL not set - refusing to run")
+        sys.exit(1)
+
+    sys.path.insert(0, str(REPO_ROOT))
+    import migrations
+    from db_pool import connect
+    from run_suite import reset
+
+    conn = connect(database_url)
+    try:
+        migrations.upgrade(conn)
+        cur = conn.cursor()
+        cur.execute("SELECT EXISTS (SELECT 1 FROM purchases)")
+        if cur.fetchone()[0] and not args.reset:
+            print(
+                "Database already holds purchases - pass --reset to empty it"
+            )
+            sys.exit(1)
+        conn.commit()
+        if args.reset:
+            reset(conn)
+
+        started = time.perf_counter()
+        purchases, transfers = load(conn, rng, settings, args)
+        print(
+            f"Loaded {purchases} purchases and {transfers} transfers in "
+            f"{time.perf_counter() - started:.1f}s"
+        )
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
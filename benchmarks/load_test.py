@@ -0,0 +1,656 @@
+#!/usr/bin/env python3
+"""
+Mobile Client Load Test
+=======================
+
+Replays the mobile page's traffic against a locally running app.py with N
+simulated phones. Each phone starts with /bootstrap, then every --interval
+seconds syncs each user's pending purchases (/sync_purchases, as
+syncPurchases('peanut') / syncPurchases('robert') do) and pulls balance
+changes (/changes, as pullChanges() does while the event stream is down).
+With --events each phone also holds an /events stream open while online,
+as the page's EventSource does, and only polls /changes while it has none;
+streams the server turns away (503 once a worker's stream slots are taken)
+show up as /events errors.
+
+Phones queue new purchases as they go and now and then drop offline for a
+few ticks, queueing purchases without syncing; on reconnecting they
+bootstrap again and send the whole backlog at once. Failed syncs are
+retried with the same client ids, like the page.
+
+At the end every phone drains its queue, and the run reports throughput,
+error rate and latency percentiles per endpoint, then checks balance
+consistency:
+    - every purchase was accepted exactly once (retries only as duplicates)
+    - each account and category moved by exactly the synced amounts
+    - each phone's balances, kept current from /changes, match the server
+
+Nothing else may write to the database during the run. Purchases are
+written with the description "load-test" and are not removed.
+
+Usage:
+    python app.py  # or gunicorn app:app ...
+    python benchmarks/load_test.py --clients 50 --duration 120 \\
+        --interval 2 --offline-chance 0.05 --backlog 200
+    python benchmarks/load_test.py --clients 20 --events
+"""
+
+import argparse
+import http.client
+import json
+import random
+import socket
+import statistics
+import sys
+import threading
+import time
+import urllib.parse
+import uuid
+from collections import defaultdict
+from datetime import datetime
+from decimal import Decimal
+from pathlib import Path
+
+from run_suite import percentile
+
+DESCRIPTION = "load-test"
+LOCAL_HOSTS = {"localhost", "127.0.0.1", "::1"}
+# Longer than the server's heartbeat interval on /events
+EVENTS_READ_TIMEOUT = 30
+# The retry: the server sends at the start of a stream, in seconds
+EVENTS_RECONNECT = 5
+
+
+class Stats:
+    """Latencies and errors per endpoint, shared by all phones"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.error_examples = {}
+
+    def record(self, endpoint, seconds, error=None):
+        with self.lock:
+            self.latencies[endpoint].append(seconds)
+            if error is not None:
+                self.errors[endpoint] += 1
+                self.error_examples.setdefault(endpoint, error)
+
+
+class Ledger:
+    """What the server acknowledged, to check balances against at the end"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.queued = {}  # client id -> purchase
+        self.accepted = defaultdict(int)  # client id -> times accepted
+
+    def queue(self, purchase):
+        with self.lock:
+            self.queued[purchase["client_id"]] = purchase
+
+    def acknowledge(self, result):
+        with self.lock:
+            for client_id in result.get("accepted", []):
+                self.accepted[client_id] += 1
+            # Stored by an attempt whose response never arrived
+            for client_id in result.get("duplicates", []):
+                if client_id not in self.accepted:
+                    self.accepted[client_id] = 1
+
+    def expected_deltas(self):
+        """({account id: delta}, {category name: delta}) of accepted rows"""
+        accounts = defaultdict(Decimal)
+        categories = defaultdict(Decimal)
+        with self.lock:
+            for client_id in self.accepted:
+                purchase = self.queued[client_id]
+                amount = Decimal(str(purchase["amount"]))
+                accounts[purchase["account_id"]] -= amount
+                categories[purchase["category"]] -= amount
+        return accounts, categories
+
+
+class Api:
+    """One keep-alive connection, like a phone's browser"""
+
+    def __init__(self, base_url, stats):
+        parsed = urllib.parse.urlsplit(base_url)
+        self.host = parsed.hostname
+        self.port = parsed.port or 80
+        self.stats = stats
+        self.conn = None
+
+    def call(self, method, path, body=None):
+        """Decoded JSON body, or None after recording an error"""
+        endpoint = path.split("?", 1)[0]
+        started = time.perf_counter()
+        error = None
+        payload = None
+        try:
+            if self.conn is None:
+                self.conn = http.client.HTTPConnection(
+                    self.host, self.port, timeout=30
+                )
+            headers = {}
+            data = None
+            if body is not None:
+                data = json.dumps(body)
+                headers["Content-Type"] = "application/json"
+            self.conn.request(method, path, body=data, headers=headers)
+            response = self.conn.getresponse()
+            raw = response.read()
+            payload = json.loads(raw) if raw else None
+            if response.status >= 400:
+                error = f"HTTP {response.status}"
+            elif isinstance(payload, dict) and (
+                payload.get("error") or payload.get("status") == "error"
+            ):
+                error = payload.get("error") or payload.get("message")
+        except (OSError, http.client.HTTPException, ValueError) as e:
+            error = f"{type(e).__name__}: {e}"
+            self.close()
+        self.stats.record(endpoint, time.perf_counter() - started, error)
+        return None if error else payload
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+
+class EventStream(threading.Thread):
+    """The page's EventSource: /events held open while the phone is online.
+
+    A stream the server ends is reopened after its retry: delay; one it
+    turns away is retried on the phone's next tick, like the page does.
+    """
+
+    def __init__(self, phone, stats):
+        super().__init__(name=f"{phone.name}-events", daemon=True)
+        self.phone = phone
+        self.stats = stats
+        self.connected = False
+        self.stopped = threading.Event()
+        self.conn = None
+
+    def run(self):
+        phone = self.phone
+        while not self.stopped.is_set():
+            if phone.offline_ticks or phone.changes_since is None:
+                self.stopped.wait(1)
+                continue
+            started = time.perf_counter()
+            error = None
+            try:
+                self.conn = http.client.HTTPConnection(
+                    phone.api.host, phone.api.port, timeout=EVENTS_READ_TIMEOUT
+                )
+                self.conn.request(
+                    "GET", f"/events?since={phone.changes_since}"
+                )
+                response = self.conn.getresponse()
+                if response.status != 200:
+                    error = f"HTTP {response.status}"
+            except (OSError, http.client.HTTPException) as e:
+                error = f"{type(e).__name__}: {e}"
+            self.stats.record("/events", time.perf_counter() - started, error)
+
+            if error is None:
+                self.connected = True
+                try:
+                    self.read(response)
+                except (OSError, http.client.HTTPException, ValueError):
+                    pass
+                self.connected = False
+                wait = EVENTS_RECONNECT
+            else:
+                wait = phone.args.interval
+            self.conn.close()
+            self.stopped.wait(wait)
+
+    def read(self, response):
+        """Apply pushed deltas until the stream ends or the phone is gone"""
+        data = []
+        while not self.stopped.is_set() and not self.phone.offline_ticks:
+            line = response.readline()
+            if not line:
+                return
+            line = line.decode().rstrip("\r\n")
+            if line.startswith("data:"):
+                data.append(line[5:].removeprefix(" "))
+            elif not line and data:
+                changes = json.loads("\n".join(data))
+                data = []
+                with self.phone.state_lock:
+                    if not self.phone.apply_changes(changes):
+                        # The next tick bootstraps
+                        self.phone.changes_since = None
+
+    def stop(self):
+        self.stopped.set()
+        conn = self.conn
+        if conn is not None and conn.sock is not None:
+            try:
+                conn.sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+
+class Phone(threading.Thread):
+    def __init__(self, index, args, stats, ledger, stop_at):
+        super().__init__(name=f"phone-{index}", daemon=True)
+        self.args = args
+        self.api = Api(args.url, stats)
+        self.ledger = ledger
+        self.stop_at = stop_at
+        self.rng = random.Random(args.seed * 10_000 + index)
+
+        self.pending = {}  # user -> [purchase]
+        self.offline_ticks = 0
+        self.reconnecting = False
+        self.accounts = {}  # id -> balance, as the page keeps them
+        self.categories = {}  # id -> current_balance
+        self.account_names = {}
+        self.category_names = {}
+        self.active_period_id = None
+        self.changes_since = None
+        self.synced = 0
+        # Balances are also updated by the event stream's thread
+        self.state_lock = threading.Lock()
+        self.events = EventStream(self, stats) if args.events else None
+
+    # What the page does
+    def bootstrap(self):
+        data = self.api.call("GET", "/bootstrap")
+        if data is None:
+            return False
+        with self.state_lock:
+            self.load_bootstrap(data)
+        return True
+
+    def load_bootstrap(self, data):
+        self.accounts = {a["id"]: a["balance"] for a in data["accounts"]}
+        self.account_names = {a["id"]: a["name"] for a in data["accounts"]}
+        self.categories = {
+            c["id"]: c["current_balance"] for c in data["budget_categories"]
+        }
+        self.category_names = {
+            c["id"]: c["name"] for c in data["budget_categories"]
+        }
+        period = data["active_period"]
+        self.active_period_id = period["id"] if period else None
+        self.changes_since = data["changes_since"]
+        for user in data["recent_purchases"]:
+            self.pending.setdefault(user, [])
+
+    def pull_changes(self):
+        if self.changes_since is None:
+            return self.bootstrap()
+        data = self.api.call(
+            "GET",
+            f"/changes?since={self.changes_since}"
+            "&tables=accounts,budget_categories",
+        )
+        if data is None:
+            return False
+        with self.state_lock:
+            if self.apply_changes(data):
+                return True
+        return self.bootstrap()
+
+    def apply_changes(self, data):
+        """Merge a /changes delta (pulled or pushed); False when the page
+        would reload instead"""
+        categories = data["budget_categories"]
+        if data["reset"] or any(
+            self.active_period_id is not None
+            and c["period_id"] > self.active_period_id
+            for c in categories["upserted"]
+        ):
+            return False
+        self.changes_since = data["since"]
+        for account in data["accounts"]["upserted"]:
+            self.accounts[account["id"]] = account["balance"]
+            self.account_names[account["id"]] = account["name"]
+        for category in categories["upserted"]:
+            if (
+                self.active_period_id is None
+                or category["period_id"] == self.active_period_id
+            ):
+                self.categories[category["id"]] = category["current_balance"]
+                self.category_names[category["id"]] = category["name"]
+        for account_id in data["accounts"]["deleted"]:
+            self.accounts.pop(account_id, None)
+        for category_id in categories["deleted"]:
+            self.categories.pop(category_id, None)
+        return True
+
+    def sync(self, user):
+        pending = self.pending[user]
+        if not pending:
+            return
+        sent = list(pending)
+        result = self.api.call("POST", "/sync_purchases", sent)
+        if result is None:
+            return  # Retried next tick with the same client ids
+        self.ledger.acknowledge(result)
+        acknowledged = set(result.get("accepted", [])) | set(
+            result.get("duplicates", [])
+        )
+        self.pending[user] = [
+            p for p in self.pending[user] if p["client_id"] not in acknowledged
+        ]
+        self.synced += result.get("synced", 0)
+
+    # The person holding the phone
+    def add_purchase(self, user):
+        prefix = f"{user} - "
+        accounts = [
+            id_
+            for id_, name in self.account_names.items()
+            if name.startswith(prefix)
+        ] or list(self.account_names)
+        categories = [
+            name
+            for name in self.category_names.values()
+            if name.startswith(prefix)
+        ] or list(self.category_names.values())
+        if not accounts:
+            return
+        purchase = {
+            "client_id": str(uuid.uuid4()),
+            "account_id": self.rng.choice(accounts),
+            "amount": round(self.rng.uniform(5, 500), 2),
+            "category": self.rng.choice(categories) if categories else "",
+            "description": DESCRIPTION,
+            "timestamp": datetime.now().isoformat(),
+            "user_name": user,
+        }
+        self.ledger.queue(purchase)
+        self.pending[user].append(purchase)
+
+    def tick(self):
+        args = self.args
+        if not self.offline_ticks and self.rng.random() < args.offline_chance:
+            self.offline_ticks = self.rng.randint(*args.offline_ticks)
+
+        for user in self.pending:
+            if self.rng.random() < args.purchase_chance:
+                self.add_purchase(user)
+
+        if self.offline_ticks > 0:
+            self.offline_ticks -= 1
+            self.reconnecting = True
+            return
+        if self.reconnecting:
+            # Back online: the page reloads, then sends the backlog
+            self.reconnecting = False
+            self.bootstrap()
+        for user in self.pending:
+            self.sync(user)
+        if self.events is None or not self.events.connected:
+            self.pull_changes()
+
+    def run(self):
+        # Phones do not all open the app in the same second
+        time.sleep(self.rng.uniform(0, self.args.interval))
+        while not self.bootstrap():
+            if time.monotonic() >= self.stop_at:
+                return
+            time.sleep(self.args.interval)
+        for user in self.pending:
+            for _ in range(self.args.backlog):
+                self.add_purchase(user)
+        if self.events is not None:
+            self.events.start()
+
+        while time.monotonic() < self.stop_at:
+            self.tick()
+            time.sleep(self.args.interval * self.rng.uniform(0.9, 1.1))
+
+    def drain(self, attempts=10):
+        """Sync what is still queued"""
+        for _ in range(attempts):
+            for user in self.pending:
+                self.sync(user)
+            if not any(self.pending.values()):
+                break
+            time.sleep(1)
+
+
+def server_balances(api):
+    """({account id: balance}, {category name: balance}) as sync sees them.
+
+    /sync_purchases files a purchase under the newest category of its name,
+    so that is the one compared.
+    """
+    accounts = api.call("GET", "/get_accounts")
+    categories = api.call("GET", "/get_budget_categories")
+    if accounts is None or categories is None:
+        raise RuntimeError("Could not read balances from the server")
+    newest = {}
+    for c in categories:
+        if c["name"] not in newest or c["id"] > newest[c["name"]]["id"]:
+            newest[c["name"]] = c
+    return (
+        {a["id"]: Decimal(str(a["balance"])) for a in accounts},
+        {
+            name: Decimal(str(c["current_balance"]))
+            for name, c in newest.items()
+        },
+    )
+
+
+def check_consistency(phones, ledger, before, after):
+    """[(ok, message)] for the end-of-run balance checks"""
+    checks = []
+    unsynced = sum(len(q) for p in phones for q in p.pending.values())
+    twice = [cid for cid, n in ledger.accepted.items() if n > 1]
+    lost = len(ledger.queued) - len(ledger.accepted) - unsynced
+    checks.append(
+        (
+            not twice and lost == 0,
+            f"{len(ledger.accepted)} purchases accepted once, "
+            f"{len(twice)} accepted twice, {lost} lost, {unsynced} unsynced",
+        )
+    )
+
+    expected_accounts, expected_categories = ledger.expected_deltas()
+    cent = Decimal("0.005")
+    wrong_accounts = [
+        id_
+        for id_, balance in after[0].items()
+        if abs(balance - before[0].get(id_, 0) - expected_accounts[id_]) > cent
+    ]
+    checks.append(
+        (
+            not wrong_accounts,
+            f"{len(after[0]) - len(wrong_accounts)}/{len(after[0])} account "
+            "balances moved by exactly the synced amounts",
+        )
+    )
+    wrong_categories = [
+        name
+        for name, delta in expected_categories.items()
+        if name
+        and abs(after[1].get(name, 0) - before[1].get(name, 0) - delta) > cent
+    ]
+    checks.append(
+        (
+            not wrong_categories,
+            f"{len(expected_categories) - len(wrong_categories)}/"
+            f"{len(expected_categories)} categories moved by exactly the "
+            "synced amounts",
+        )
+    )
+
+    diverged = [
+        phone.name
+        for phone in phones
+        if any(
+            abs(Decimal(str(balance)) - after[0].get(id_, 0)) > cent
+            for id_, balance in phone.accounts.items()
+        )
+    ]
+    checks.append(
+        (
+            not diverged,
+            f"{len(phones) - len(diverged)}/{len(phones)} phones' /changes "
+            "balances match the server",
+        )
+    )
+    return checks
+
+
+def report(stats, phones, elapsed, checks):
+    total = sum(len(v) for v in stats.latencies.values())
+    errors = sum(stats.errors.values())
+    synced = sum(p.synced for p in phones)
+    results = {
+        "seconds": elapsed,
+        "requests": total,
+        "requests_per_sec": total / elapsed,
+        "error_rate": errors / total if total else 0.0,
+        "purchases_synced": synced,
+        "purchases_per_sec": synced / elapsed,
+        "endpoints": {},
+        "checks": [{"ok": ok, "message": m} for ok, m in checks],
+    }
+
+    print(
+        f"\n{total} requests in {elapsed:.1f}s ({total / elapsed:.1f}/s), "
+        f"{errors} errors ({results['error_rate']:.2%}), "
+        f"{synced} purchases synced ({synced / elapsed:.1f}/s)\n"
+    )
+    print(
+        f"{'endpoint':<18} {'requests':>9} {'errors':>7} {'p50 ms':>8} "
+        f"{'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}"
+    )
+    for endpoint, samples in sorted(stats.latencies.items()):
+        ordered = sorted(samples)
+        row = {
+            "requests": len(samples),
+            "errors": stats.errors[endpoint],
+            "p50_ms": percentile(ordered, 0.50) * 1000,
+            "p95_ms": percentile(ordered, 0.95) * 1000,
+            "p99_ms": percentile(ordered, 0.99) * 1000,
+            "max_ms": ordered[-1] * 1000,
+            "mean_ms": statistics.fmean(samples) * 1000,
+        }
+        results["endpoints"][endpoint] = row
+        print(
+            f"{endpoint:<18} {row['requests']:>9} {row['errors']:>7} "
+            f"{row['p50_ms']:>8.1f} {row['p95_ms']:>8.1f} "
+            f"{row['p99_ms']:>8.1f} {row['max_ms']:>8.1f}"
+        )
+    for endpoint, example in stats.error_examples.items():
+        print(f"  {endpoint} error: {str(example)[:200]}")
+
+    print()
+    for ok, message in checks:
+        print(f"{'✅' if ok else '❌'} {message}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--url", default="http://127.0.0.1:5000")
+    parser.add_argument("--clients", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=60)
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=30,
+        help="seconds between sync/poll ticks (the page uses 30)",
+    )
+    parser.add_argument(
+        "--purchase-chance",
+        type=float,
+        default=0.3,
+        help="chance per tick and user of a new purchase",
+    )
+    parser.add_argument(
+        "--offline-chance",
+        type=float,
+        default=0.02,
+        help="chance per tick of dropping offline",
+    )
+    parser.add_argument(
+        "--offline-ticks",
+        type=int,
+        nargs=2,
+        default=(3, 20),
+        metavar=("MIN", "MAX"),
+        help="how long an offline spell lasts",
+    )
+    parser.add_argument(
+        "--backlog",
+        type=int,
+        default=0,
+        help="purchases per user each phone has queued when it starts",
+    )
+    parser.add_argument(
+        "--events",
+        action="store_true",
+        help="hold an /events stream open per phone, as the page does",
+    )
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", type=Path, help="write results as JSON")
+    args = parser.parse_args()
+
+    host = urllib.parse.urlsplit(args.url).hostname
+    if host not in LOCAL_HOSTS:
+        print(f"{host} is not local - refusing to load-test it")
+        sys.exit(1)
+
+    stats = Stats()
+    ledger = Ledger()
+    checker = Api(args.url, Stats())
+    before = server_balances(checker)
+    # Idle for the whole run; the server's keep-alive would drop it
+    checker.close()
+
+    stop_at = time.monotonic() + args.duration
+    phones = [
+        Phone(i, args, stats, ledger, stop_at) for i in range(args.clients)
+    ]
+    print(f"{args.clients} phones for {args.duration:.0f}s against {args.url}")
+    started = time.perf_counter()
+    for phone in phones:
+        phone.start()
+    for phone in phones:
+        phone.join()
+    elapsed = time.perf_counter() - started
+    for phone in phones:
+        if phone.events is not None and phone.events.is_alive():
+            phone.events.stop()
+            phone.events.join()
+
+    drainers = [threading.Thread(target=phone.drain) for phone in phones]
+    for thread in drainers:
+        thread.start()
+    for thread in drainers:
+        thread.join()
+    # Only once every phone has drained is there nothing left to pull. A
+    # phone that had a stream never polled, so its keep-alive went stale
+    for phone in phones:
+        phone.api.close()
+        phone.pull_changes()
+        phone.api.close()
+
+    after = server_balances(checker)
+    checker.close()
+    checks = check_consistency(phones, ledger, before, after)
+    results = report(stats, phones, elapsed, checks)
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+        print(f"\nResults written to {args.output}")
+    if not all(ok for ok, _ in checks):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,554 @@
+#!/usr/bin/env python3
+"""
+API Hot Path Benchmark Suite
+============================
+
+Seeds a scratch database with a synthetic household at 10k, 100k and 1M
+purchases and, at each scale, measures p50/p95/p99 latency, throughput and
+SQL statements per call of the hot paths of app.py: /get_purchases,
+/get_accounts, /get_budget_categories, /sync_purchases (batches of 1 to
+5000), /add_income and populate_monthly_budget_with_periods.
+
+First the query plan check (check_query_plans.py) runs on the scratch
+database; a hot query that lost its index scan fails the run before any
+timing is taken, unless --skip-plan-check. Calls go through the Flask test
+client, so timings cover the app and the database but not HTTP. Results
+are written as JSON; compare two runs with --compare.
+
+Usage:
+    BENCHMARK_DATABASE_URL=postgresql://... python benchmarks/run_suite.py
+    BENCHMARK_DATABASE_URL=... python benchmarks/run_suite.py \\
+        --scales 10000 100000 --iterations 20 --compare baseline.json
+    python benchmarks/run_suite.py --compare old.json new.json
+
+Requirements:
+    - BENCHMARK_DATABASE_URL pointing at a scratch database (never the live
+      one: every budget table is emptied before and after the run)
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import date, datetime
+from pathlib import Path
+
+from dateutil.relativedelta import relativedelta
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+SCALES = [10_000, 100_000, 1_000_000]
+SYNC_BATCH_SIZES = [1, 10, 100, 1000, 5000]
+SYNC_ROWS_PER_SIZE = 10_000  # Fewer iterations for big batches
+ROLLOVER_ITERATIONS = 5
+WARMUP = 3
+SEED_CHUNK = 100_000  # Purchases per INSERT (and commit) while seeding
+MONTHS = 24
+MARKER = "bench-suite"
+
+# Emptied before seeding and after the run; RESTART IDENTITY keeps ids
+# (and so the benchmarked queries) the same from run to run
+TABLES = (
+    "purchases",
+    "transfers",
+    "ledger_entries",
+    "balance_snapshots",
+    "budget_categories",
+    "budget_periods",
+    "budget_automation_log",
+    "change_log",
+    "accounts",
+)
+
+
+def percentile(ordered, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    index = max(0, min(len(ordered) - 1, round(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(samples, statements, elapsed, rows_per_call=None):
+    ordered = sorted(samples)
+    result = {
+        "calls": len(samples),
+        "p50_ms": percentile(ordered, 0.50) * 1000,
+        "p95_ms": percentile(ordered, 0.95) * 1000,
+        "p99_ms": percentile(ordered, 0.99) * 1000,
+        "mean_ms": statistics.fmean(samples) * 1000,
+        "calls_per_sec": len(samples) / elapsed,
+        "statements_per_call": statistics.fmean(statements),
+    }
+    if rows_per_call:
+        result["rows_per_sec"] = len(samples) * rows_per_call / elapsed
+    return result
+
+
+def measure(call, iterations, rows_per_call=None, warmup=WARMUP):
+    """Time `iterations` sequential calls after `warmup` untimed ones"""
+    from query_stats import capture_queries
+
+    for _ in range(warmup):
+        call()
+
+    samples = []
+    statements = []
+    started = time.perf_counter()
+    for _ in range(iterations):
+        with capture_queries() as stats:
+            call_started = time.perf_counter()
+            call()
+            samples.append(time.perf_counter() - call_started)
+        statements.append(stats.statements)
+    elapsed = time.perf_counter() - started
+    return summarize(samples, statements, elapsed, rows_per_call)
+
+
+def check(response):
+    """Fail the benchmark on any error response instead of timing it"""
+    body = response.get_json(silent=True)
+    failed = isinstance(body, dict) and (
+        "error" in body or body.get("status") == "error"
+    )
+    if response.status_code >= 400 or failed:
+        raise RuntimeError(f"{response.status_code}: {body}")
+    return body
+
+
+def period_dates(months):
+    """(name, start, end) of the last `months` budget periods, oldest first.
+
+    Same 24th-to-23rd boundaries as get_next_month_info(), ending before
+    the period the rollover creates, so they never overlap it.
+    """
+    this_start = date.today().replace(day=24)
+    periods = []
+    for back in range(months, 0, -1):
+        start = this_start - relativedelta(months=back)
+        end = start + relativedelta(months=1, days=-1)
+        periods.append((f"{MARKER} {start:%Y-%m}", start, end))
+    return periods
+
+
+def reset(conn):
+    cur = conn.cursor()
+    cur.execute(f"TRUNCATE {', '.join(TABLES)} RESTART IDENTITY CASCADE")
+    conn.commit()
+
+
+def seed_household(budget_app, conn):
+    """Accounts and categories of config/settings.json, over MONTHS periods"""
+    import migrations
+    from data_versions import RESOURCES, bump_data_version
+
+    settings = budget_app.load_settings()
+    cur = conn.cursor()
+    migrations.seed(cur, settings)
+
+    periods = period_dates(MONTHS)
+    cur.execute(
+        """
+        INSERT INTO budget_periods (period_name, start_date, end_date, is_active)
+        SELECT name, start_date, end_date, start_date = %s
+        FROM unnest(%s::text[], %s::date[], %s::date[])
+             AS p(name, start_date, end_date)
+    """,
+        (
+            periods[-1][1],
+            [p[0] for p in periods],
+            [p[1] for p in periods],
+            [p[2] for p in periods],
+        ),
+    )
+
+    categories = budget_app.rollover_categories(settings)
+    cur.execute(
+        """
+        INSERT INTO budget_categories (name, budgeted_amount, current_balance,
+                                       period_id)
+        SELECT c.name, c.amount, c.amount, bp.id
+        FROM unnest(%s::text[], %s::numeric[]) AS c(name, amount)
+        CROSS JOIN budget_periods bp
+    """,
+        (list(categories), list(categories.values())),
+    )
+    bump_data_version(cur, *RESOURCES)
+    conn.commit()
+    return {
+        "users": list(settings.get("bank_accounts", {})),
+        "categories": list(categories),
+        "first_day": periods[0][1],
+        "last_day": periods[-1][2],
+    }
+
+
+def seed_purchases(conn, household, start, stop):
+    """Purchases start+1..stop, spread over the seeded periods"""
+    from period_calendar import PERIOD_FOR_PURCHASE_SQL
+
+    cur = conn.cursor()
+    cur.execute("SELECT array_agg(id ORDER BY id) FROM accounts")
+    account_ids = cur.fetchone()[0]
+    users = household["users"]
+    categories = household["categories"]
+
+    for chunk_start in range(start, stop, SEED_CHUNK):
+        chunk_stop = min(chunk_start + SEED_CHUNK, stop)
+        cur.execute(
+            f"""
+            INSERT INTO purchases (user_name, amount, account_id,
+                                   budget_category_id, description, date,
+                                   period_id)
+            SELECT x.user_name, x.amount, x.account_id, bc.id, %s, x.date,
+                   x.period_id
+            FROM (
+                SELECT p.*, {PERIOD_FOR_PURCHASE_SQL} AS period_id
+                FROM (
+                    SELECT (%s::text[])[1 + g %% %s] AS user_name,
+                           round((1 + random() * 499)::numeric, 2) AS amount,
+                           (%s::int[])[1 + g %% %s] AS account_id,
+                           (%s::text[])[1 + (g * 7) %% %s] AS category_name,
+                           %s::timestamp
+                               + random() * (%s::timestamp - %s::timestamp)
+                               AS date
+                    FROM generate_series(%s::int, %s::int) g
+                ) p
+            ) x
+            LEFT JOIN budget_categories bc
+                ON bc.period_id = x.period_id AND bc.name = x.category_name
+        """,
+            (
+                f"{MARKER} purchase",
+                users,
+                len(users),
+                account_ids,
+                len(account_ids),
+                categories,
+                len(categories),
+                household["first_day"],
+                household["last_day"] + relativedelta(days=1),
+                household["first_day"],
+                chunk_start + 1,
+                chunk_stop,
+            ),
+        )
+        conn.commit()
+
+    for table in ("purchases", "ledger_entries", "change_log"):
+        cur.execute(f"ANALYZE {table}")
+    conn.commit()
+
+
+def benchmark_reads(client, ctx, iterations):
+    results = {}
+    reads = {
+        "get_purchases": "/get_purchases",
+        "get_purchases?user": f"/get_purchases?user={ctx['user']}",
+        "get_purchases?period_id": (
+            f"/get_purchases?period_id={ctx['period_id']}"
+        ),
+        "get_purchases?limit=500": "/get_purchases?limit=500",
+        "get_accounts": "/get_accounts",
+        "get_budget_categories": "/get_budget_categories",
+        "get_budget_categories?period_id": (
+            f"/get_budget_categories?period_id={ctx['period_id']}"
+        ),
+    }
+    for name, url in reads.items():
+        results[name] = measure(lambda: check(client.get(url)), iterations)
+
+    # A poll that finds nothing new
+    for name in ("get_accounts", "get_budget_categories"):
+        etag = client.get(f"/{name}").headers["ETag"]
+        results[f"{name} (304)"] = measure(
+            lambda: client.get(f"/{name}", headers={"If-None-Match": etag}),
+            iterations,
+        )
+    return results
+
+
+def benchmark_writes(budget_app, client, ctx, iterations):
+    results = {}
+    now = datetime.now()
+    for batch_size in SYNC_BATCH_SIZES:
+        batch = [
+            {
+                "account_id": ctx["account_id"],
+                "amount": 1.25,
+                "category": ctx["category"],
+                "description": f"{MARKER} sync",
+                "timestamp": (now - relativedelta(seconds=i)).isoformat(),
+                "user_name": ctx["user"],
+            }
+            for i in range(batch_size)
+        ]
+        calls = max(3, min(iterations, SYNC_ROWS_PER_SIZE // batch_size))
+        results[f"sync_purchases x{batch_size}"] = measure(
+            lambda: check(client.post("/sync_purchases", json=batch)),
+            calls,
+            rows_per_call=batch_size,
+            warmup=1,
+        )
+
+    income = {
+        "username": ctx["user"],
+        "amount": 100,
+        "target_account_id": ctx["account_id"],
+        "description": MARKER,
+    }
+    results["add_income"] = measure(
+        lambda: check(client.post("/add_income", json=income)), iterations
+    )
+
+    def rollover():
+        # Its progress output would drown the results
+        with contextlib.redirect_stdout(io.StringIO()):
+            if not budget_app.populate_monthly_budget_with_periods():
+                raise RuntimeError("populate_monthly_budget_with_periods")
+
+    results["populate_monthly_budget_with_periods"] = measure(
+        rollover, ROLLOVER_ITERATIONS, warmup=1
+    )
+    return results
+
+
+def remove_written_rows(conn):
+    """Undo the write benchmarks so every scale starts from its seed.
+
+    Synced, income and salary purchases are deleted (the balance triggers
+    refund them) and the rollover's period is dropped with its categories.
+    """
+    cur = conn.cursor()
+    cur.execute(
+        "DELETE FROM purchases WHERE description <> %s",
+        (f"{MARKER} purchase",),
+    )
+    cur.execute(
+        """
+        DELETE FROM budget_categories WHERE period_id IN (
+            SELECT id FROM budget_periods WHERE period_name NOT LIKE %s
+        )
+    """,
+        (f"{MARKER}%",),
+    )
+    cur.execute(
+        "DELETE FROM budget_periods WHERE period_name NOT LIKE %s",
+        (f"{MARKER}%",),
+    )
+    cur.execute(
+        """
+        UPDATE budget_periods SET is_active = (
+            id = (SELECT MAX(id) FROM budget_periods)
+        )
+    """
+    )
+    conn.commit()
+
+
+def invalidate_read_cache(budget_app):
+    """The suite writes with plain SQL, which the app's cache cannot see"""
+    from data_versions import RESOURCES
+
+    budget_app.read_cache.invalidate(*RESOURCES)
+
+
+def benchmark_context(conn, household):
+    cur = conn.cursor()
+    cur.execute(
+        """
+        SELECT bp.id, bc.name FROM budget_periods bp
+        JOIN budget_categories bc ON bc.period_id = bp.id
+        WHERE bp.is_active
+        ORDER BY bc.id
+        LIMIT 1
+    """
+    )
+    period_id, category = cur.fetchone()
+    cur.execute("SELECT MIN(id) FROM accounts")
+    return {
+        "user": household["users"][0],
+        "period_id": period_id,
+        "category": category,
+        "account_id": cur.fetchone()[0],
+    }
+
+
+def run_metadata(conn, args):
+    cur = conn.cursor()
+    cur.execute("SHOW server_version")
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=REPO_ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "started_at": datetime.now().isoformat(timespec="seconds"),
+        "git_commit": commit,
+        "python": platform.python_version(),
+        "postgres": cur.fetchone()[0],
+        "iterations": args.iterations,
+    }
+
+
+def run(args):
+    database_url = os.environ.get("BENCHMARK_DATABASE_URL")
+    if not database_url:
+        print("BENCHMARK_DATABASE_URL not set - refusing to run")
+        sys.exit(1)
+
+    # app.py reads DATABASE_URL when it connects
+    os.environ["DATABASE_URL"] = database_url
+    sys.path.insert(0, str(REPO_ROOT))
+    import app as budget_app
+
+    import check_query_plans
+
+    budget_app.init_db()
+    budget_app._db_initialized = True
+    client = budget_app.app.test_client()
+
+    conn = budget_app.get_db_connection()
+    if not args.skip_plan_check:
+        try:
+            failures = check_query_plans.check_all(conn)
+        finally:
+            conn.close()
+        if failures:
+            print("Query plan check failed - not benchmarking")
+            sys.exit(1)
+        conn = budget_app.get_db_connection()
+
+    results = run_metadata(conn, args)
+    results["scales"] = {}
+    try:
+        reset(conn)
+        household = seed_household(budget_app, conn)
+        seeded = 0
+        for scale in sorted(args.scales):
+            print(f"Seeding {scale} purchases...")
+            started = time.perf_counter()
+            seed_purchases(conn, household, seeded, scale)
+            invalidate_read_cache(budget_app)
+            seeded = scale
+            seed_seconds = time.perf_counter() - started
+
+            ctx = benchmark_context(conn, household)
+            benchmarks = benchmark_reads(client, ctx, args.iterations)
+            try:
+                benchmarks.update(
+                    benchmark_writes(budget_app, client, ctx, args.iterations)
+                )
+            finally:
+                remove_written_rows(conn)
+                invalidate_read_cache(budget_app)
+
+            results["scales"][str(scale)] = {
+                "seed_seconds": seed_seconds,
+                "benchmarks": benchmarks,
+            }
+            print_scale(scale, benchmarks)
+    finally:
+        conn.rollback()
+        reset(conn)
+        conn.close()
+    return results
+
+
+def print_scale(scale, benchmarks):
+    print(f"\n{scale} purchases")
+    print(
+        f"{'benchmark':<40} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} "
+        f"{'calls/s':>9} {'stmts':>6}"
+    )
+    for name, r in benchmarks.items():
+        print(
+            f"{name:<40} {r['p50_ms']:>9.2f} {r['p95_ms']:>9.2f} "
+            f"{r['p99_ms']:>9.2f} {r['calls_per_sec']:>9.1f} "
+            f"{r['statements_per_call']:>6.1f}"
+        )
+
+
+def compare(old, new):
+    """Print p50/p95 changes of every benchmark the two runs share"""
+    print(
+        f"Comparing {(old.get('git_commit') or '?')[:10]} "
+        f"({old.get('started_at')}) -> {(new.get('git_commit') or '?')[:10]} "
+        f"({new.get('started_at')})"
+    )
+    for scale, new_scale in new["scales"].items():
+        old_scale = old["scales"].get(scale)
+        if old_scale is None:
+            continue
+        print(f"\n{scale} purchases")
+        print(f"{'benchmark':<40} {'p50 ms':>20} {'p95 ms':>20}")
+        for name, r in new_scale["benchmarks"].items():
+            before = old_scale["benchmarks"].get(name)
+            if before is None:
+                continue
+            cells = []
+            for key in ("p50_ms", "p95_ms"):
+                change = (r[key] - before[key]) / before[key] * 100
+                cells.append(f"{before[key]:.1f}->{r[key]:.1f} {change:+.0f}%")
+            print(f"{name:<40} {cells[0]:>20} {cells[1]:>20}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument(
+        "--scales", type=int, nargs="+", default=SCALES, metavar="N"
+    )
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument(
+        "--skip-plan-check",
+        action="store_true",
+        help="benchmark even if check_query_plans.py would fail",
+    )
+    parser.add_argument(
+        "--output",
+        type=Path,
+        help="results file (default benchmarks/results/<timestamp>.json)",
+    )
+    parser.add_argument(
+        "--compare",
+        nargs="+",
+        type=Path,
+        metavar="RESULTS",
+        help="BASELINE to compare this run against, or OLD NEW to compare "
+        "two earlier runs without running",
+    )
+    args = parser.parse_args()
+
+    if args.compare and len(args.compare) > 2:
+        parser.error("--compare takes one or two results files")
+    if args.compare and len(args.compare) == 2:
+        old, new = (json.loads(path.read_text()) for path in args.compare)
+        compare(old, new)
+        return
+
+    results = run(args)
+
+    output = args.output or (
+        RESULTS_DIR / f"suite-{datetime.now():%Y%m%d-%H%M%S}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2))
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        print()
+        compare(json.loads(args.compare[0].read_text()), results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""
+Change Feed
+===========
+
+Row-level triggers on accounts, budget_categories, purchases and transfers
+(migrations/0006_change_log.py) append (table, row id, upsert/delete)
+entries to change_log. Clients keep a local copy and ask for what changed
+since their last watermark, so a refresh costs in proportion to what
+changed rather than to the size of the data.
+
+Watermarks are transaction ids, not log sequence numbers: a sequence value
+is drawn before its transaction commits, so reading "seq > N" can skip a
+row that commits later with a smaller seq. Every transaction with an id
+below txid_snapshot_xmin() has finished, so the log below that point is
+final and a client that resumes from it never misses an entry. Committed
+entries above it are returned as well (and again on the next pull), so a
+long-running transaction elsewhere does not hide a client's own writes.
+"""
+
+TABLES = ("accounts", "budget_categories", "purchases", "transfers")
+
+# Logged rows of some tables from a watermark (since, tables); the latest
+# operation per row wins
+CHANGES_SINCE_SQL = """
+    SELECT DISTINCT ON (table_name, row_id) table_name, row_id, op
+    FROM change_log
+    WHERE txid >= %s AND table_name = ANY(%s)
+    ORDER BY table_name, row_id, seq DESC
+"""
+
+# Current row state per table: (select, row -> dict)
+ROW_QUERIES = {
+    "accounts": (
+        "SELECT id, name, balance FROM accounts",
+        lambda r: {"id": r[0], "name": r[1], "balance": float(r[2])},
+    ),
+    "budget_categories": (
+        """
+        SELECT id, name, budgeted_amount, current_balance, period_id
+        FROM budget_categories
+        """,
+        lambda r: {
+            "id": r[0],
+            "name": r[1],
+            "budgeted_amount": float(r[2]),
+            "current_balance": float(r[3]),
+            "remaining": float(r[2]) - abs(float(r[3])),
+            "period_id": r[4],
+        },
+    ),
+    "purchases": (
+        """
+        SELECT id, user_name, amount, account_id, budget_category_id,
+               description, date
+        FROM purchases
+        """,
+        lambda r: {
+            "id": r[0],
+            "user": r[1],
+            "amount": float(r[2]),
+            "account_id": r[3],
+            "budget_category_id": r[4],
+            "description": r[5],
+            "date": r[6],  # json_provider: naive timestamps are UTC
+        },
+    ),
+    "transfers": (
+        """
+        SELECT id, from_account_id, to_account_id, amount, description,
+               originator_user, transfer_date
+        FROM transfers
+        """,
+        lambda r: {
+            "id": r[0],
+            "from_account_id": r[1],
+            "to_account_id": r[2],
+            "amount": float(r[3]),
+            "description": r[4],
+            "originator": r[5],
+            "date": r[6],
+        },
+    ),
+}
+
+
+def current_watermark(cur):
+    """Transaction id below which the change log can no longer change"""
+    cur.execute("SELECT txid_snapshot_xmin(txid_current_snapshot())")
+    return cur.fetchone()[0]
+
+
+def changed_tables(cur, since):
+    """Names of tables with log entries at or after a watermark"""
+    cur.execute(
+        "SELECT DISTINCT table_name FROM change_log WHERE txid >= %s",
+        (since,),
+    )
+    return {row[0] for row in cur.fetchall()}
+
+
+def fetch_changes(cur, since=None, tables=TABLES):
+    """Changes since a watermark, or a full snapshot when since is None.
+
+    Returns {"since": next watermark, "reset": bool, "<table>":
+    {"upserted": [rows], "deleted": [ids]}}. With reset true the client
+    replaces its copy of each table instead of merging. Rows carry their
+    current state, so applying a change twice is harmless.
+    """
+    # Read the watermark first: rows fetched afterwards are at least as
+    # new as everything below it
+    watermark = current_watermark(cur)
+
+    reset = since is None
+    if not reset:
+        cur.execute("SELECT txid FROM change_log_horizon WHERE id = 1")
+        horizon = cur.fetchone()
+        # Entries older than the horizon were pruned; start over
+        reset = horizon is not None and since < horizon[0]
+
+    result = {"since": watermark, "reset": reset}
+
+    if reset:
+        for table in tables:
+            select, to_dict = ROW_QUERIES[table]
+            cur.execute(select + " ORDER BY id")
+            result[table] = {
+                "upserted": [to_dict(r) for r in cur.fetchall()],
+                "deleted": [],
+            }
+        return result
+
+    cur.execute(CHANGES_SINCE_SQL, (since, list(tables)))
+    entries = cur.fetchall()
+
+    for table in tables:
+        upsert_ids = [r[1] for r in entries if r[0] == table and r[2] == "U"]
+        deleted = [r[1] for r in entries if r[0] == table and r[2] == "D"]
+        upserted = []
+        if upsert_ids:
+            select, to_dict = ROW_QUERIES[table]
+            cur.execute(select + " WHERE id = ANY(%s)", (upsert_ids,))
+            upserted = [to_dict(r) for r in cur.fetchall()]
+            # Deleted by a transaction the next window will report
+            found = {row["id"] for row in upserted}
+            deleted += [i for i in upsert_ids if i not in found]
+        result[table] = {"upserted": upserted, "deleted": deleted}
+
+    return result
+
+
+def prune_change_log(cur, keep_days=30):
+    """Drop old entries; clients behind the new horizon get a full reset"""
+    cur.execute(
+        """
+        SELECT MAX(txid) FROM change_log
+        WHERE changed_at < CURRENT_TIMESTAMP - %s * INTERVAL '1 day'
+    """,
+        (keep_days,),
+    )
+    cutoff = cur.fetchone()[0]
+    if cutoff is None:
+        return 0
+
+    cur.execute("DELETE FROM change_log WHERE txid <= %s", (cutoff,))
+    deleted = cur.rowcount
+    cur.execute(
+        "UPDATE change_log_horizon SET txid = GREATEST(txid, %s) WHERE id = 1",
+        (cutoff + 1,),
+    )
+    return deleted
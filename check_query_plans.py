@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+Check Query Plans of Hot Queries
+================================
+
+Loads a synthetic dataset, runs EXPLAIN (FORMAT JSON) on the hot queries of
+app.py and desktop_app.py and fails if any of them reads its main table
+with a sequential scan instead of an index. Everything happens inside one
+transaction that is rolled back, so the database is left unchanged.
+
+The statements come from hot_queries.py and the modules that own them, so
+a changed query is checked as the apps send it. test_query_plans.py runs
+the check under pytest (skipped without a database), and
+benchmarks/run_suite.py runs it (check_all) before it benchmarks anything.
+
+Usage:
+    BENCHMARK_DATABASE_URL=postgresql://... \\
+        python -m pytest test_query_plans.py
+    BENCHMARK_DATABASE_URL=postgresql://... python check_query_plans.py
+
+Requirements:
+    - BENCHMARK_DATABASE_URL pointing at a scratch database (never the live
+      one: migrations are applied to it)
+"""
+
+import json
+import os
+import sys
+from datetime import datetime
+
+import migrations
+from change_feed import CHANGES_SINCE_SQL
+from db_pool import connect
+from hot_queries import (
+    CATEGORY_IDS_BY_NAME_SQL,
+    DETACH_CATEGORY_SQL,
+    DETACH_PERIOD_CATEGORIES_SQL,
+    PERIOD_CATEGORIES_SQL,
+    PERIOD_PURCHASES_SQL,
+    PURCHASE_PAGE_SQL,
+    RECENT_PURCHASES_SQL,
+)
+from ledger import BALANCE_AS_OF_SQL
+from period_calendar import PERIOD_FOR_PURCHASE_SQL
+
+PURCHASES = 200_000
+ACCOUNTS = 20
+PERIODS = 120  # Ten years of monthly budgets
+CATEGORIES_PER_PERIOD = 60
+USERS = ["Robert", "Peanut"]
+
+INDEX_SCANS = {"Index Scan", "Index Only Scan", "Bitmap Heap Scan"}
+
+PAGE = 51  # /get_purchases fetches a page of 50 plus one
+RECENT = 10  # app.BOOTSTRAP_RECENT_PURCHASES
+
+
+def purchase_page(where):
+    return PURCHASE_PAGE_SQL.format(where=where)
+
+
+# (name, table that must be read through an index, sql, params(ctx)); the
+# statements are the ones app.py and desktop_app.py send
+HOT_QUERIES = [
+    (
+        "app /get_purchases newest page",
+        "purchases",
+        purchase_page("TRUE"),
+        lambda ctx: (PAGE,),
+    ),
+    (
+        "app /get_purchases?user=",
+        "purchases",
+        purchase_page("p.user_name = %s"),
+        lambda ctx: ("Robert", PAGE),
+    ),
+    (
+        "app /get_purchases?period_id=",
+        "purchases",
+        purchase_page("p.period_id = %s"),
+        lambda ctx: (ctx["period_id"], PAGE),
+    ),
+    (
+        "app /get_purchases?account_id=",
+        "purchases",
+        purchase_page("p.account_id = %s"),
+        lambda ctx: (ctx["account_id"], PAGE),
+    ),
+    (
+        "app /get_purchases?category_id=",
+        "purchases",
+        purchase_page("p.budget_category_id = %s"),
+        lambda ctx: (ctx["category_id"], PAGE),
+    ),
+    (
+        "app /bootstrap recent purchases per user",
+        "purchases",
+        RECENT_PURCHASES_SQL,
+        lambda ctx: (USERS, RECENT),
+    ),
+    (
+        "app/desktop categories of a period",
+        "budget_categories",
+        PERIOD_CATEGORIES_SQL,
+        lambda ctx: (ctx["period_id"],),
+    ),
+    (
+        "app /sync_purchases category lookup",
+        "budget_categories",
+        CATEGORY_IDS_BY_NAME_SQL,
+        lambda ctx: ([ctx["category_name"]],),
+    ),
+    (
+        "app rollover detach purchases from period categories",
+        "purchases",
+        DETACH_PERIOD_CATEGORIES_SQL,
+        lambda ctx: (ctx["period_id"],),
+    ),
+    (
+        "app /changes since watermark",
+        "change_log",
+        CHANGES_SINCE_SQL,
+        lambda ctx: (ctx["watermark"], ["accounts", "budget_categories"]),
+    ),
+    (
+        "app /balance_as_of ledger tail after a snapshot",
+        "ledger_entries",
+        BALANCE_AS_OF_SQL,
+        lambda ctx: ("account", ctx["account_id"], ctx["now"]) * 2,
+    ),
+    (
+        "desktop purchases of a period for one user",
+        "purchases",
+        PERIOD_PURCHASES_SQL.format(user_filter="AND p.user_name = %s"),
+        lambda ctx: (ctx["period_id"], "Robert"),
+    ),
+    (
+        "desktop delete category (detach purchases)",
+        "purchases",
+        DETACH_CATEGORY_SQL,
+        lambda ctx: (ctx["category_id"],),
+    ),
+]
+
+
+def load_synthetic_data(cur):
+    """Monthly periods with their categories, and purchases spread over them"""
+    # The same rows every run, so plans only change when the schema does
+    cur.execute("SELECT setseed(0.5)")
+    cur.execute(
+        """
+        INSERT INTO budget_periods (period_name, start_date, end_date, is_active)
+        SELECT 'plan-' || g,
+               (DATE '2020-01-25' + make_interval(months => g))::date,
+               (DATE '2020-02-24' + make_interval(months => g))::date,
+               g = %s
+        FROM generate_series(1, %s) g
+        RETURNING id
+    """,
+        (PERIODS, PERIODS),
+    )
+    period_ids = [r[0] for r in cur.fetchall()]
+
+    cur.execute(
+        """
+        INSERT INTO accounts (name, account_type, balance)
+        SELECT 'plan-account-' || g, 'bank', 0
+        FROM generate_series(1, %s) g
+        RETURNING id
+    """,
+        (ACCOUNTS,),
+    )
+    account_ids = [r[0] for r in cur.fetchall()]
+
+    cur.execute(
+        """
+        INSERT INTO budget_categories (name, budgeted_amount, current_balance,
+                                       period_id)
+        SELECT 'plan-category-' || c, 1000, 0, p.id
+        FROM unnest(%s::int[]) WITH ORDINALITY p(id, n),
+             generate_series(1, %s) c
+        ORDER BY p.n, c
+        RETURNING id, name, period_id
+    """,
+        (period_ids, CATEGORIES_PER_PERIOD),
+    )
+    categories = cur.fetchall()
+
+    # Purchases arrive in date order and are filed under a category of
+    # their own period, as synced ones are; the planner's choices depend on
+    # that ordering. period_id is what the calendar assigns on insert.
+    # Setting it here rather than with a follow-up UPDATE keeps the balance
+    # trigger from joining two 200k-row transition tables
+    cur.execute(
+        f"""
+        INSERT INTO purchases (user_name, amount, account_id,
+                               budget_category_id, description, date,
+                               period_id)
+        SELECT x.user_name, x.amount, x.account_id, bc.id, 'plan-check',
+               x.date, x.period_id
+        FROM (
+            SELECT p.*, {PERIOD_FOR_PURCHASE_SQL} AS period_id
+            FROM (
+                SELECT (%s::text[])[1 + g %% %s] AS user_name,
+                       round((random() * 500)::numeric, 2) AS amount,
+                       (%s::int[])[1 + g %% %s] AS account_id,
+                       'plan-category-' || (1 + (g * 7) %% %s)
+                           AS category_name,
+                       TIMESTAMP '2020-02-25'
+                           + (g + random()) / %s * %s * INTERVAL '1 month'
+                           AS date
+                FROM generate_series(1, %s) g
+            ) p
+        ) x
+        LEFT JOIN budget_categories bc
+            ON bc.period_id = x.period_id AND bc.name = x.category_name
+        ORDER BY x.date
+    """,
+        (
+            USERS,
+            len(USERS),
+            account_ids,
+            len(account_ids),
+            CATEGORIES_PER_PERIOD,
+            PURCHASES,
+            PERIODS,
+            PURCHASES,
+        ),
+    )
+    for table in (
+        "budget_periods",
+        "accounts",
+        "budget_categories",
+        "purchases",
+        "change_log",
+        "ledger_entries",
+    ):
+        cur.execute(f"ANALYZE {table}")
+
+    middle = categories[len(categories) // 2]
+    # A caught-up client: the synthetic rows all share this transaction's id
+    cur.execute("SELECT COALESCE(MAX(txid), 0) + 1 FROM change_log")
+    return {
+        "period_id": period_ids[len(period_ids) // 2],
+        "account_id": account_ids[0],
+        "category_id": middle[0],
+        "category_name": middle[1],
+        "watermark": cur.fetchone()[0],
+        "now": datetime.now(),
+    }
+
+
+def plan_nodes(node):
+    yield node
+    for child in node.get("Plans", []):
+        yield from plan_nodes(child)
+
+
+def check_plan(cur, table, sql, params):
+    """(ok, scan node types used on table)"""
+    cur.execute("EXPLAIN (FORMAT JSON) " + sql, params)
+    plan = cur.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    # Bitmap Index Scan nodes carry no relation; their Bitmap Heap Scan
+    # does. ModifyTable names the table an UPDATE writes, not how it reads
+    scans = [
+        node["Node Type"]
+        for node in plan_nodes(plan[0]["Plan"])
+        if node.get("Relation Name") == table
+        and node["Node Type"].endswith("Scan")
+    ]
+    ok = bool(scans) and all(s in INDEX_SCANS for s in scans)
+    return ok, scans
+
+
+def check_all(conn):
+    """Check every hot query on a migrated database; number of failures"""
+    cur = conn.cursor()
+    failures = 0
+    try:
+        print(f"Loading {PURCHASES} synthetic purchases...")
+        ctx = load_synthetic_data(cur)
+
+        for name, table, sql, params in HOT_QUERIES:
+            ok, scans = check_plan(cur, table, sql, params(ctx))
+            status = "✅" if ok else "❌"
+            print(f"{status} {name}: {table} via {', '.join(scans) or '-'}")
+            failures += not ok
+    finally:
+        # Synthetic rows, ANALYZE statistics and all
+        conn.rollback()
+
+    if failures:
+        print(f"\n{failures} of {len(HOT_QUERIES)} hot queries scan a table")
+    else:
+        print(f"\nAll {len(HOT_QUERIES)} hot queries use indexes")
+    return failures
+
+
+def main():
+    database_url = os.environ.get("BENCHMARK_DATABASE_URL")
+    if not database_url:
+        print("BENCHMARK_DATABASE_URL not set - refusing to run")
+        sys.exit(1)
+
+    conn = connect(database_url)
+    try:
+        migrations.upgrade(conn)
+        failures = check_all(conn)
+    finally:
+        conn.close()
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
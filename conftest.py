@@ -0,0 +1,32 @@
+"""
+Shared Test Fixtures
+====================
+
+Tests that need PostgreSQL take the scratch_database_url fixture: it
+points at BENCHMARK_DATABASE_URL with every migration applied, and skips
+the test when that variable is not set. Never point it at the live
+database.
+"""
+
+import os
+
+import pytest
+
+import migrations
+from db_pool import connect
+
+# Manual check of the desktop's Qt dialog, not a test module
+collect_ignore = ["test_dialog.py"]
+
+
+@pytest.fixture(scope="session")
+def scratch_database_url():
+    url = os.environ.get("BENCHMARK_DATABASE_URL")
+    if not url:
+        pytest.skip("BENCHMARK_DATABASE_URL not set")
+    conn = connect(url)
+    try:
+        migrations.upgrade(conn)
+    finally:
+        conn.close()
+    return url
@@ -0,0 +1,34 @@
+"""
+Data Version Counters
+=====================
+
+One counter per cached resource, bumped in the same transaction as every
+write that changes what the resource's endpoint returns. Read endpoints use
+the counter as their ETag, so a poll that finds nothing new costs a single
+primary-key lookup and no payload.
+
+Shared by app.py and desktop_app.py so both writers bump the same counters.
+The table is created by migrations/0005_data_versions.py.
+"""
+
+ACCOUNTS = "accounts"
+BUDGET_CATEGORIES = "budget_categories"
+BUDGET_PERIODS = "budget_periods"
+
+RESOURCES = (ACCOUNTS, BUDGET_CATEGORIES, BUDGET_PERIODS)
+
+
+def bump_data_version(cur, *resources):
+    """Mark resources as changed; call inside the writing transaction"""
+    cur.execute(
+        "UPDATE data_versions SET version = version + 1 WHERE resource = ANY(%s)",
+        (list(resources),),
+    )
+
+
+def get_data_version(cur, resource):
+    cur.execute(
+        "SELECT version FROM data_versions WHERE resource = %s", (resource,)
+    )
+    row = cur.fetchone()
+    return row[0] if row else 0
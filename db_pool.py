@@ -0,0 +1,277 @@
+"""
+Database Connection Pool
+========================
+
+A small, bounded, thread-safe pool of pg8000 connections. One pool lives in
+each gunicorn worker process so requests reuse an already authenticated
+connection instead of paying for TCP/auth/TLS on every call.
+
+Connections handed out by the pool behave like normal pg8000 connections,
+except that close() returns them to the pool instead of disconnecting.
+"""
+
+import os
+import threading
+import time
+import urllib.parse
+from collections import deque
+
+import pg8000
+
+
+class PoolTimeout(Exception):
+    """Raised when no connection becomes available within the timeout"""
+
+
+def connect(database_url=None):
+    """Open a new pg8000 connection from DATABASE_URL"""
+    database_url = database_url or os.environ.get("DATABASE_URL")
+    if not database_url:
+        raise ValueError("DATABASE_URL environment variable not set")
+
+    parsed = urllib.parse.urlparse(database_url)
+    return pg8000.connect(
+        host=parsed.hostname,
+        database=parsed.path[1:],  # Remove leading slash
+        user=parsed.username,
+        password=parsed.password,
+        port=parsed.port or 5432,
+    )
+
+
+class PooledConnection:
+    """Connection borrowed from a ConnectionPool; close() gives it back"""
+
+    def __init__(self, pool, raw, created_at):
+        self._pool = pool
+        self._raw = raw
+        self.created_at = created_at
+        self.returned = False
+
+    def cursor(self):
+        cur = self._raw.cursor()
+        if self._pool.on_query is not None:
+            return InstrumentedCursor(cur, self._pool.on_query)
+        return cur
+
+    def commit(self):
+        self._raw.commit()
+
+    def rollback(self):
+        self._raw.rollback()
+
+    def close(self):
+        """Return the connection to the pool (safe to call more than once)"""
+        if not self.returned:
+            self.returned = True
+            self._pool.release(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+
+class InstrumentedCursor:
+    """Cursor that reports each statement's time and row count to on_query"""
+
+    def __init__(self, raw, on_query):
+        self._raw = raw
+        self._on_query = on_query
+
+    def _report(self, operation, started):
+        # pg8000 buffers the whole result, so rowcount is the rows fetched
+        rows = self._raw.rowcount if self._raw.description else 0
+        self._on_query(operation, time.perf_counter() - started, max(rows, 0))
+
+    def execute(self, operation, args=(), stream=None):
+        started = time.perf_counter()
+        try:
+            self._raw.execute(operation, args, stream=stream)
+        finally:
+            self._report(operation, started)
+        return self
+
+    def executemany(self, operation, param_sets):
+        started = time.perf_counter()
+        try:
+            self._raw.executemany(operation, param_sets)
+        finally:
+            self._report(operation, started)
+        return self
+
+    def __iter__(self):
+        return iter(self._raw)
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+
+class ConnectionPool:
+    def __init__(
+        self,
+        connect_func=connect,
+        max_size=5,
+        timeout=10.0,
+        max_age=1800.0,
+        ping_after=30.0,
+        on_query=None,
+    ):
+        """
+        max_size: most connections open at once in this process
+        timeout: seconds a caller waits for a free connection
+        max_age: seconds after which a connection is closed and replaced
+        ping_after: idle seconds after which a borrowed connection is
+            health-checked with SELECT 1 before being handed out
+        on_query: optional callback(sql, seconds, rows) run after every
+            statement executed through a borrowed connection's cursors
+        """
+        self.connect_func = connect_func
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_age = max_age
+        self.ping_after = ping_after
+        self.on_query = on_query
+        self.pid = os.getpid()
+
+        self._idle = deque()  # (raw, created_at, last_used), LIFO
+        self._total = 0  # idle + in use + being opened
+        self._cond = threading.Condition(threading.Lock())
+
+        self._stats = {
+            "connections_created": 0,
+            "connections_closed": 0,
+            "connections_recycled": 0,
+            "health_checks": 0,
+            "health_check_failures": 0,
+            "borrows": 0,
+            "waits": 0,
+            "timeouts": 0,
+            "wait_time_total": 0.0,
+            "wait_time_max": 0.0,
+        }
+
+    def get_connection(self, timeout=None):
+        """Borrow a connection, waiting at most `timeout` seconds"""
+        timeout = self.timeout if timeout is None else timeout
+        started = time.monotonic()
+        deadline = started + timeout
+        waited = False
+
+        while True:
+            raw = None
+            create = False
+            with self._cond:
+                while not self._idle and self._total >= self.max_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._stats["timeouts"] += 1
+                        raise PoolTimeout(
+                            f"No database connection available after {timeout}s "
+                            f"(pool size {self.max_size})"
+                        )
+                    if not waited:
+                        waited = True
+                        self._stats["waits"] += 1
+                    self._cond.wait(remaining)
+
+                if self._idle:
+                    raw, created_at, last_used = self._idle.pop()
+                else:
+                    self._total += 1
+                    create = True
+
+            if create:
+                try:
+                    raw = self.connect_func()
+                except Exception:
+                    with self._cond:
+                        self._total -= 1
+                        self._cond.notify()
+                    raise
+                created_at = time.monotonic()
+                with self._cond:
+                    self._stats["connections_created"] += 1
+            else:
+                now = time.monotonic()
+                if now - created_at > self.max_age:
+                    self._discard(raw, recycled=True)
+                    continue
+                if now - last_used > self.ping_after and not self._ping(raw):
+                    self._discard(raw)
+                    continue
+
+            wait_time = time.monotonic() - started
+            with self._cond:
+                self._stats["borrows"] += 1
+                if waited:
+                    self._stats["wait_time_total"] += wait_time
+                    self._stats["wait_time_max"] = max(
+                        self._stats["wait_time_max"], wait_time
+                    )
+            return PooledConnection(self, raw, created_at)
+
+    def release(self, conn):
+        """Put a borrowed connection back, or close it if it is unusable"""
+        raw = conn._raw
+        if time.monotonic() - conn.created_at > self.max_age:
+            self._discard(raw, recycled=True)
+            return
+
+        try:
+            # End any transaction the borrower left open (no-op otherwise)
+            raw.rollback()
+        except Exception:
+            self._discard(raw)
+            return
+
+        with self._cond:
+            self._idle.append((raw, conn.created_at, time.monotonic()))
+            self._cond.notify()
+
+    def _ping(self, raw):
+        with self._cond:
+            self._stats["health_checks"] += 1
+        try:
+            # execute_simple does not open a transaction, unlike cursor()
+            raw.execute_simple("SELECT 1")
+            return True
+        except Exception:
+            with self._cond:
+                self._stats["health_check_failures"] += 1
+            return False
+
+    def _discard(self, raw, recycled=False):
+        try:
+            raw.close()
+        except Exception:
+            pass
+        with self._cond:
+            self._total -= 1
+            self._stats["connections_closed"] += 1
+            if recycled:
+                self._stats["connections_recycled"] += 1
+            self._cond.notify()
+
+    def stats(self):
+        """Snapshot of pool counters for monitoring"""
+        with self._cond:
+            stats = dict(self._stats)
+            stats["max_size"] = self.max_size
+            stats["open"] = self._total
+            stats["idle"] = len(self._idle)
+            stats["in_use"] = self._total - len(self._idle)
+            stats["pid"] = self.pid
+        return stats
+
+    def close_all(self):
+        """Close every idle connection (borrowed ones close on release)"""
+        with self._cond:
+            idle = list(self._idle)
+            self._idle.clear()
+        for raw, _, _ in idle:
+            self._discard(raw)
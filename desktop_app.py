@@ -32,6 +32,19 @@ from decimal import Decimal
 import requests
 import json
 
+from data_versions import ACCOUNTS, BUDGET_CATEGORIES, bump_data_version
+from period_calendar import PeriodCalendar
+from hot_queries import (
+    DETACH_CATEGORY_SQL,
+    PERIOD_CATEGORIES_SQL,
+    PERIOD_PURCHASES_SQL,
+)
+from change_feed import (
+    TABLES as CHANGE_FEED_TABLES,
+    changed_tables,
+    current_watermark,
+)
+
 # Load environment variables from .env file
 from pathlib import Path
 
@@ -151,6 +164,13 @@ class BudgetDesktopApp(QMainWindow):
         # User filter tracking
         self.current_user_filter = "Both"  # "Robert", "Peanut", or "Both"
 
+        # Change-log watermark and filters of the last load_data()
+        self.changes_since = None
+        self.loaded_view = None
+
+        # Budget period of a purchase date, for purchases.period_id
+        self.period_calendar = PeriodCalendar()
+
         self.setup_ui()
         self.load_periods()
         self.load_data()
@@ -451,6 +471,19 @@ class BudgetDesktopApp(QMainWindow):
             periods = cur.fetchall()
             conn.close()
 
+            # Follow the active period (a rollover or set_active_period
+            # moves it) unless the user picked another one that still exists
+            viewing_active = self.current_period_id is None or any(
+                p["id"] == self.current_period_id and p["is_active"]
+                for p in self.budget_periods
+            )
+            if viewing_active or self.current_period_id not in {
+                period[0] for period in periods
+            }:
+                self.current_period_id = next(
+                    (period[0] for period in periods if period[4]), None
+                )
+
             self.budget_periods = []
 
             # Clear existing tab buttons
@@ -479,10 +512,10 @@ class BudgetDesktopApp(QMainWindow):
                     )
                 )
 
+                tab_button.setChecked(period[0] == self.current_period_id)
+
                 # Style active tab differently
                 if period[4]:  # is_active
-                    self.current_period_id = period[0]
-                    tab_button.setChecked(True)
                     tab_button.setStyleSheet(
                         """
                         QPushButton:checked {
@@ -599,271 +632,305 @@ class BudgetDesktopApp(QMainWindow):
             conn = self.get_db_connection()
             cur = conn.cursor()
 
-            # Load accounts with timeout protection
+            # Only rebuild tables whose rows changed since the last load
+            view = (self.current_period_id, self.current_user_filter)
+            stale = set(CHANGE_FEED_TABLES)
+            watermark = None
             try:
-                cur.execute(
-                    "SELECT id, name, balance FROM accounts ORDER BY name"
-                )
-                accounts = cur.fetchall()
+                watermark = current_watermark(cur)
+                if self.changes_since is not None and view == self.loaded_view:
+                    stale = changed_tables(cur, self.changes_since)
+            except Exception:
+                # No change log yet (app.py has not initialized this database)
+                conn.rollback()
+
+            if "budget_periods" in stale:
+                # A new period or another active one: rebuild the period
+                # tabs (load_periods takes over the connection) and, as the
+                # viewed period may have moved, every table
+                conn.close()
+                self.load_periods()
+                conn = self.get_db_connection()
+                cur = conn.cursor()
+                view = (self.current_period_id, self.current_user_filter)
+                stale = set(CHANGE_FEED_TABLES)
 
-                # Populate accounts table
-                self.accounts_table.setRowCount(len(accounts))
-                total_balance = 0
-                for row, account in enumerate(accounts):
+            if "accounts" in stale:
+                # Load accounts with timeout protection
+                try:
+                    cur.execute(
+                        "SELECT id, name, balance FROM accounts ORDER BY name"
+                    )
+                    accounts = cur.fetchall()
+
+                    # Populate accounts table
+                    self.accounts_table.setRowCount(len(accounts))
+                    total_balance = 0
+                    for row, account in enumerate(accounts):
+                        self.accounts_table.setItem(
+                            row, 0, QTableWidgetItem(str(account[0]))
+                        )
+                        self.accounts_table.setItem(
+                            row, 1, QTableWidgetItem(str(account[1]))
+                        )
+                        balance_item = QTableWidgetItem(f"R{account[2]:.2f}")
+                        # Make negative balances red
+                        if account[2] < 0:
+                            balance_item.setForeground(Qt.red)
+                        self.accounts_table.setItem(row, 2, balance_item)
+                        total_balance += account[2]
+
+                    # Add total row
+                    total_row = self.accounts_table.rowCount()
+                    self.accounts_table.setRowCount(total_row + 1)
                     self.accounts_table.setItem(
-                        row, 0, QTableWidgetItem(str(account[0]))
+                        total_row, 0, QTableWidgetItem("")
+                    )
+                    total_label = QTableWidgetItem("Total")
+                    from PySide6.QtGui import QFont
+
+                    bold_font = QFont()
+                    bold_font.setBold(True)
+                    total_label.setFont(bold_font)
+                    self.accounts_table.setItem(total_row, 1, total_label)
+                    total_balance_item = QTableWidgetItem(
+                        f"R{total_balance:.2f}"
                     )
+                    total_balance_item.setFont(bold_font)
+                    if total_balance < 0:
+                        total_balance_item.setForeground(Qt.red)
                     self.accounts_table.setItem(
-                        row, 1, QTableWidgetItem(str(account[1]))
+                        total_row, 2, total_balance_item
                     )
-                    balance_item = QTableWidgetItem(f"R{account[2]:.2f}")
-                    # Make negative balances red
-                    if account[2] < 0:
-                        balance_item.setForeground(Qt.red)
-                    self.accounts_table.setItem(row, 2, balance_item)
-                    total_balance += account[2]
-
-                # Add total row
-                total_row = self.accounts_table.rowCount()
-                self.accounts_table.setRowCount(total_row + 1)
-                self.accounts_table.setItem(total_row, 0, QTableWidgetItem(""))
-                total_label = QTableWidgetItem("Total")
-                from PySide6.QtGui import QFont
-
-                bold_font = QFont()
-                bold_font.setBold(True)
-                total_label.setFont(bold_font)
-                self.accounts_table.setItem(total_row, 1, total_label)
-                total_balance_item = QTableWidgetItem(f"R{total_balance:.2f}")
-                total_balance_item.setFont(bold_font)
-                if total_balance < 0:
-                    total_balance_item.setForeground(Qt.red)
-                self.accounts_table.setItem(total_row, 2, total_balance_item)
-            except Exception as e:
-                QMessageBox.warning(
-                    self,
-                    "Data Load Warning",
-                    f"Failed to load accounts: {str(e)}",
-                )
-                self.accounts_table.setRowCount(0)
+                except Exception as e:
+                    QMessageBox.warning(
+                        self,
+                        "Data Load Warning",
+                        f"Failed to load accounts: {str(e)}",
+                    )
+                    self.accounts_table.setRowCount(0)
+                    watermark = None  # Reload everything next time
 
-            # Load budget categories with timeout protection
-            try:
-                if self.current_period_id:
-                    cur.execute(
+            if "budget_categories" in stale:
+                # Load budget categories with timeout protection
+                try:
+                    if self.current_period_id:
+                        cur.execute(
+                            PERIOD_CATEGORIES_SQL, (self.current_period_id,)
+                        )
+                    else:
+                        # Fallback to current active period if no period selected
+                        cur.execute(
+                            """
+                            SELECT bc.id, bc.name, bc.budgeted_amount, bc.current_balance 
+                            FROM budget_categories bc
+                            JOIN budget_periods bp ON bc.period_id = bp.id
+                            WHERE bp.is_active = TRUE 
+                            ORDER BY bc.name
                         """
-                        SELECT id, name, budgeted_amount, current_balance 
-                        FROM budget_categories 
-                        WHERE period_id = %s 
-                        ORDER BY name
-                    """,
-                        (self.current_period_id,),
+                        )
+                    categories = cur.fetchall()
+
+                    # Populate budget table
+                    self.budget_table.setRowCount(len(categories))
+                    total_budgeted = 0
+                    total_spent = 0
+                    total_remaining = 0
+                    for row, cat in enumerate(categories):
+                        budgeted = float(cat[2])
+                        spent = abs(
+                            float(cat[3])
+                        )  # current_balance is negative when money is spent
+                        remaining = budgeted - spent
+                        self.budget_table.setItem(
+                            row, 0, QTableWidgetItem(str(cat[0]))
+                        )
+                        self.budget_table.setItem(
+                            row, 1, QTableWidgetItem(str(cat[1]))
+                        )
+                        self.budget_table.setItem(
+                            row, 2, QTableWidgetItem(f"R{budgeted:.2f}")
+                        )
+                        self.budget_table.setItem(
+                            row, 3, QTableWidgetItem(f"R{spent:.2f}")
+                        )
+                        remaining_item = QTableWidgetItem(f"R{remaining:.2f}")
+                        # Make negative remaining amounts red
+                        if remaining < 0:
+                            remaining_item.setForeground(Qt.red)
+                        self.budget_table.setItem(row, 4, remaining_item)
+                        total_budgeted += budgeted
+                        total_spent += spent
+                        total_remaining += remaining
+
+                    # Add total row
+                    total_row = self.budget_table.rowCount()
+                    self.budget_table.setRowCount(total_row + 1)
+                    self.budget_table.setItem(
+                        total_row, 0, QTableWidgetItem("")
                     )
-                else:
-                    # Fallback to current active period if no period selected
-                    cur.execute(
-                        """
-                        SELECT bc.id, bc.name, bc.budgeted_amount, bc.current_balance 
-                        FROM budget_categories bc
-                        JOIN budget_periods bp ON bc.period_id = bp.id
-                        WHERE bp.is_active = TRUE 
-                        ORDER BY bc.name
-                    """
+                    total_label = QTableWidgetItem("Total")
+                    from PySide6.QtGui import QFont
+
+                    bold_font = QFont()
+                    bold_font.setBold(True)
+                    total_label.setFont(bold_font)
+                    self.budget_table.setItem(total_row, 1, total_label)
+                    total_budgeted_item = QTableWidgetItem(
+                        f"R{total_budgeted:.2f}"
                     )
-                categories = cur.fetchall()
-
-                # Populate budget table
-                self.budget_table.setRowCount(len(categories))
-                total_budgeted = 0
-                total_spent = 0
-                total_remaining = 0
-                for row, cat in enumerate(categories):
-                    budgeted = float(cat[2])
-                    spent = abs(
-                        float(cat[3])
-                    )  # current_balance is negative when money is spent
-                    remaining = budgeted - spent
+                    total_budgeted_item.setFont(bold_font)
                     self.budget_table.setItem(
-                        row, 0, QTableWidgetItem(str(cat[0]))
+                        total_row, 2, total_budgeted_item
                     )
-                    self.budget_table.setItem(
-                        row, 1, QTableWidgetItem(str(cat[1]))
+                    total_spent_item = QTableWidgetItem(f"R{total_spent:.2f}")
+                    total_spent_item.setFont(bold_font)
+                    self.budget_table.setItem(total_row, 3, total_spent_item)
+                    total_remaining_item = QTableWidgetItem(
+                        f"R{total_remaining:.2f}"
                     )
+                    total_remaining_item.setFont(bold_font)
+                    if total_remaining < 0:
+                        total_remaining_item.setForeground(Qt.red)
                     self.budget_table.setItem(
-                        row, 2, QTableWidgetItem(f"R{budgeted:.2f}")
+                        total_row, 4, total_remaining_item
                     )
-                    self.budget_table.setItem(
-                        row, 3, QTableWidgetItem(f"R{spent:.2f}")
+                except Exception as e:
+                    QMessageBox.warning(
+                        self,
+                        "Data Load Warning",
+                        f"Failed to load budget categories: {str(e)}",
                     )
-                    remaining_item = QTableWidgetItem(f"R{remaining:.2f}")
-                    # Make negative remaining amounts red
-                    if remaining < 0:
-                        remaining_item.setForeground(Qt.red)
-                    self.budget_table.setItem(row, 4, remaining_item)
-                    total_budgeted += budgeted
-                    total_spent += spent
-                    total_remaining += remaining
-
-                # Add total row
-                total_row = self.budget_table.rowCount()
-                self.budget_table.setRowCount(total_row + 1)
-                self.budget_table.setItem(total_row, 0, QTableWidgetItem(""))
-                total_label = QTableWidgetItem("Total")
-                from PySide6.QtGui import QFont
-
-                bold_font = QFont()
-                bold_font.setBold(True)
-                total_label.setFont(bold_font)
-                self.budget_table.setItem(total_row, 1, total_label)
-                total_budgeted_item = QTableWidgetItem(
-                    f"R{total_budgeted:.2f}"
-                )
-                total_budgeted_item.setFont(bold_font)
-                self.budget_table.setItem(total_row, 2, total_budgeted_item)
-                total_spent_item = QTableWidgetItem(f"R{total_spent:.2f}")
-                total_spent_item.setFont(bold_font)
-                self.budget_table.setItem(total_row, 3, total_spent_item)
-                total_remaining_item = QTableWidgetItem(
-                    f"R{total_remaining:.2f}"
-                )
-                total_remaining_item.setFont(bold_font)
-                if total_remaining < 0:
-                    total_remaining_item.setForeground(Qt.red)
-                self.budget_table.setItem(total_row, 4, total_remaining_item)
-            except Exception as e:
-                QMessageBox.warning(
-                    self,
-                    "Data Load Warning",
-                    f"Failed to load budget categories: {str(e)}",
-                )
-                self.budget_table.setRowCount(0)
+                    self.budget_table.setRowCount(0)
+                    watermark = None  # Reload everything next time
 
-            # Load purchases filtered by period date range and user
-            try:
-                # Build user filter condition
-                user_filter_condition = ""
-                params = []
-
-                if self.current_period_id:
-                    if self.current_user_filter != "Both":
-                        user_filter_condition = "AND p.user_name = %s"
-                        params = [
-                            self.current_period_id,
-                            self.current_user_filter,
-                        ]
+            if stale & {"purchases", "accounts", "budget_categories"}:
+                # Load purchases filtered by period date range and user
+                try:
+                    # Build user filter condition
+                    user_filter_condition = ""
+                    params = []
+
+                    if self.current_period_id:
+                        if self.current_user_filter != "Both":
+                            user_filter_condition = "AND p.user_name = %s"
+                            params = [
+                                self.current_period_id,
+                                self.current_user_filter,
+                            ]
+                        else:
+                            params = [self.current_period_id]
+
+                        # Get purchases of the selected period
+                        cur.execute(
+                            PERIOD_PURCHASES_SQL.format(
+                                user_filter=user_filter_condition
+                            ),
+                            params,
+                        )
                     else:
-                        params = [self.current_period_id]
+                        if self.current_user_filter != "Both":
+                            user_filter_condition = "AND p.user_name = %s"
+                            params = [self.current_user_filter]
+                        else:
+                            params = []
 
-                    # Get purchases within the selected period's date range
-                    cur.execute(
-                        f"""
-                        SELECT p.id, p.user_name, p.amount, a.name, bc.name, p.description, p.date
-                        FROM purchases p 
-                        LEFT JOIN accounts a ON p.account_id = a.id
-                        LEFT JOIN budget_categories bc ON p.budget_category_id = bc.id
-                        JOIN budget_periods bp ON bp.id = %s
-                        WHERE p.date >= bp.start_date AND p.date <= (bp.end_date + INTERVAL '1 day')
-                        {user_filter_condition}
-                        ORDER BY p.date DESC LIMIT 200
-                    """,
-                        params,
-                    )
-                else:
-                    if self.current_user_filter != "Both":
-                        user_filter_condition = "AND p.user_name = %s"
-                        params = [self.current_user_filter]
-                    else:
-                        params = []
+                        # Fallback to current active period
+                        cur.execute(
+                            f"""
+                            SELECT p.id, p.user_name, p.amount, a.name, bc.name, p.description, p.date
+                            FROM purchases p 
+                            LEFT JOIN accounts a ON p.account_id = a.id
+                            LEFT JOIN budget_categories bc ON p.budget_category_id = bc.id
+                            JOIN budget_periods bp ON bp.id = p.period_id
+                            WHERE bp.is_active = TRUE
+                            {user_filter_condition}
+                            ORDER BY p.date DESC LIMIT 200
+                        """,
+                            params,
+                        )
+                    purchases = cur.fetchall()
+
+                    # Populate purchases table
+                    self.purchases_table.setRowCount(len(purchases))
+                    total_amount = 0
+                    for row, purchase in enumerate(purchases):
+                        formatted_date = (
+                            purchase[6].strftime("%Y-%m-%d %H:%M")
+                            if purchase[6]
+                            else ""
+                        )
+                        self.purchases_table.setItem(
+                            row, 0, QTableWidgetItem(str(purchase[0]))
+                        )
+                        self.purchases_table.setItem(
+                            row, 1, QTableWidgetItem(str(purchase[1]))
+                        )
+                        amount_item = QTableWidgetItem(f"R{purchase[2]:.2f}")
+                        # Make negative amounts red (income)
+                        if purchase[2] < 0:
+                            amount_item.setForeground(Qt.red)
+                        self.purchases_table.setItem(row, 2, amount_item)
+                        self.purchases_table.setItem(
+                            row, 3, QTableWidgetItem(purchase[3] or "N/A")
+                        )
+                        self.purchases_table.setItem(
+                            row, 4, QTableWidgetItem(purchase[4] or "N/A")
+                        )
+                        self.purchases_table.setItem(
+                            row, 5, QTableWidgetItem(purchase[5] or "")
+                        )
+                        self.purchases_table.setItem(
+                            row, 6, QTableWidgetItem(formatted_date)
+                        )
+                        total_amount += purchase[2]
 
-                    # Fallback to current active period
-                    cur.execute(
-                        f"""
-                        SELECT p.id, p.user_name, p.amount, a.name, bc.name, p.description, p.date
-                        FROM purchases p 
-                        LEFT JOIN accounts a ON p.account_id = a.id
-                        LEFT JOIN budget_categories bc ON p.budget_category_id = bc.id
-                        JOIN budget_periods bp ON bp.is_active = TRUE
-                        WHERE p.date >= bp.start_date AND p.date <= (bp.end_date + INTERVAL '1 day')
-                        {user_filter_condition}
-                        ORDER BY p.date DESC LIMIT 200
-                    """,
-                        params,
-                    )
-                purchases = cur.fetchall()
-
-                # Populate purchases table
-                self.purchases_table.setRowCount(len(purchases))
-                total_amount = 0
-                for row, purchase in enumerate(purchases):
-                    formatted_date = (
-                        purchase[6].strftime("%Y-%m-%d %H:%M")
-                        if purchase[6]
-                        else ""
-                    )
+                    # Add total row
+                    total_row = self.purchases_table.rowCount()
+                    self.purchases_table.setRowCount(total_row + 1)
                     self.purchases_table.setItem(
-                        row, 0, QTableWidgetItem(str(purchase[0]))
+                        total_row, 0, QTableWidgetItem("")
                     )
                     self.purchases_table.setItem(
-                        row, 1, QTableWidgetItem(str(purchase[1]))
+                        total_row, 1, QTableWidgetItem("")
                     )
-                    amount_item = QTableWidgetItem(f"R{purchase[2]:.2f}")
-                    # Make negative amounts red (income)
-                    if purchase[2] < 0:
-                        amount_item.setForeground(Qt.red)
-                    self.purchases_table.setItem(row, 2, amount_item)
+                    total_amount_item = QTableWidgetItem(
+                        f"R{total_amount:.2f}"
+                    )
+                    from PySide6.QtGui import QFont
+
+                    bold_font = QFont()
+                    bold_font.setBold(True)
+                    total_amount_item.setFont(bold_font)
+                    if total_amount < 0:
+                        total_amount_item.setForeground(Qt.red)
                     self.purchases_table.setItem(
-                        row, 3, QTableWidgetItem(purchase[3] or "N/A")
+                        total_row, 2, total_amount_item
                     )
                     self.purchases_table.setItem(
-                        row, 4, QTableWidgetItem(purchase[4] or "N/A")
+                        total_row, 3, QTableWidgetItem("")
                     )
                     self.purchases_table.setItem(
-                        row, 5, QTableWidgetItem(purchase[5] or "")
+                        total_row, 4, QTableWidgetItem("")
                     )
                     self.purchases_table.setItem(
-                        row, 6, QTableWidgetItem(formatted_date)
+                        total_row, 5, QTableWidgetItem("")
                     )
-                    total_amount += purchase[2]
-
-                # Add total row
-                total_row = self.purchases_table.rowCount()
-                self.purchases_table.setRowCount(total_row + 1)
-                self.purchases_table.setItem(
-                    total_row, 0, QTableWidgetItem("")
-                )
-                self.purchases_table.setItem(
-                    total_row, 1, QTableWidgetItem("")
-                )
-                total_amount_item = QTableWidgetItem(f"R{total_amount:.2f}")
-                from PySide6.QtGui import QFont
-
-                bold_font = QFont()
-                bold_font.setBold(True)
-                total_amount_item.setFont(bold_font)
-                if total_amount < 0:
-                    total_amount_item.setForeground(Qt.red)
-                self.purchases_table.setItem(total_row, 2, total_amount_item)
-                self.purchases_table.setItem(
-                    total_row, 3, QTableWidgetItem("")
-                )
-                self.purchases_table.setItem(
-                    total_row, 4, QTableWidgetItem("")
-                )
-                self.purchases_table.setItem(
-                    total_row, 5, QTableWidgetItem("")
-                )
-                total_label = QTableWidgetItem("Total")
-                total_label.setFont(bold_font)
-                self.purchases_table.setItem(total_row, 6, total_label)
-            except Exception as e:
-                QMessageBox.warning(
-                    self,
-                    "Data Load Warning",
-                    f"Failed to load purchases: {str(e)}",
-                )
-                self.purchases_table.setRowCount(0)
+                    total_label = QTableWidgetItem("Total")
+                    total_label.setFont(bold_font)
+                    self.purchases_table.setItem(total_row, 6, total_label)
+                except Exception as e:
+                    QMessageBox.warning(
+                        self,
+                        "Data Load Warning",
+                        f"Failed to load purchases: {str(e)}",
+                    )
+                    self.purchases_table.setRowCount(0)
+                    watermark = None  # Reload everything next time
 
             conn.close()
+            self.changes_since = watermark
+            self.loaded_view = view
 
         except Exception as e:
             QMessageBox.critical(
@@ -908,6 +975,7 @@ class BudgetDesktopApp(QMainWindow):
                 )
                 deleted_categories = cur.rowcount
 
+                bump_data_version(cur, ACCOUNTS, BUDGET_CATEGORIES)
                 conn.commit()
                 conn.close()
 
@@ -957,6 +1025,7 @@ class BudgetDesktopApp(QMainWindow):
                     "UPDATE accounts SET balance = %s WHERE id = %s",
                     (new_balance, account_id),
                 )
+                bump_data_version(cur, ACCOUNTS)
                 conn.commit()
                 conn.close()
 
@@ -1031,6 +1100,7 @@ class BudgetDesktopApp(QMainWindow):
                     "UPDATE budget_categories SET budgeted_amount = %s WHERE id = %s",
                     (new_budget, category_id),
                 )
+                bump_data_version(cur, BUDGET_CATEGORIES)
                 conn.commit()
                 conn.close()
 
@@ -1061,6 +1131,7 @@ class BudgetDesktopApp(QMainWindow):
                     "INSERT INTO accounts (name, account_type, balance) VALUES (%s, %s, %s)",
                     (name, account_type, balance),
                 )
+                bump_data_version(cur, ACCOUNTS)
                 conn.commit()
                 conn.close()
                 self.load_data()
@@ -1096,6 +1167,7 @@ class BudgetDesktopApp(QMainWindow):
                     "UPDATE accounts SET name = %s, account_type = %s, balance = %s WHERE id = %s",
                     (name, account_type, balance, account_id),
                 )
+                bump_data_version(cur, ACCOUNTS)
                 conn.commit()
                 conn.close()
                 self.load_data()
@@ -1131,7 +1203,8 @@ class BudgetDesktopApp(QMainWindow):
             try:
                 conn = self.get_db_connection()
                 cur = conn.cursor()
-                # Delete associated purchases first
+                # Delete associated purchases first (refunds their
+                # budget categories)
                 cur.execute(
                     "DELETE FROM purchases WHERE account_id = %s",
                     (account_id,),
@@ -1140,6 +1213,7 @@ class BudgetDesktopApp(QMainWindow):
                 cur.execute(
                     "DELETE FROM accounts WHERE id = %s", (account_id,)
                 )
+                bump_data_version(cur, ACCOUNTS, BUDGET_CATEGORIES)
                 conn.commit()
                 conn.close()
                 self.load_data()
@@ -1205,20 +1279,8 @@ class BudgetDesktopApp(QMainWindow):
                     conn.close()
                     return
 
-                # Perform the transfer
-                # Subtract from source account
-                cur.execute(
-                    "UPDATE accounts SET balance = balance - %s WHERE id = %s",
-                    (data["amount"], data["from_account_id"]),
-                )
-
-                # Add to destination account
-                cur.execute(
-                    "UPDATE accounts SET balance = balance + %s WHERE id = %s",
-                    (data["amount"], data["to_account_id"]),
-                )
-
-                # Record the transfer in the dedicated transfers table
+                # Record the transfer in the dedicated transfers table; the
+                # balance trigger moves the amount between the accounts
                 transfer_date = data["date"]
                 description = (
                     data["description"]
@@ -1243,6 +1305,7 @@ class BudgetDesktopApp(QMainWindow):
                     ),
                 )
 
+                bump_data_version(cur, ACCOUNTS)
                 conn.commit()
                 conn.close()
                 self.load_data()
@@ -1294,21 +1357,17 @@ class BudgetDesktopApp(QMainWindow):
                 conn = self.get_db_connection()
                 cur = conn.cursor()
 
-                # Add income to target account
-                cur.execute(
-                    "UPDATE accounts SET balance = balance + %s WHERE id = %s",
-                    (data["amount"], data["target_account_id"]),
-                )
-
                 # Record the income as a special transaction (income, not purchase)
                 # We'll create a dedicated income table or use purchases with special marking
                 income_description = f"Income: {data['description']} (received by {data['username']})"
 
-                # For now, record as a "purchase" with negative amount (income) and no category
+                # For now, record as a "purchase" with negative amount (income) and no category;
+                # the balance trigger credits the account
+                self.period_calendar.refresh(cur)
                 cur.execute(
                     """
-                    INSERT INTO purchases (user_name, amount, account_id, budget_category_id, description, date)
-                    VALUES (%s, %s, %s, NULL, %s, %s)
+                    INSERT INTO purchases (user_name, amount, account_id, budget_category_id, description, date, period_id)
+                    VALUES (%s, %s, %s, NULL, %s, %s, %s)
                 """,
                     (
                         data["username"],
@@ -1316,9 +1375,11 @@ class BudgetDesktopApp(QMainWindow):
                         data["target_account_id"],
                         income_description,
                         data["date"],
+                        self.period_calendar.period_for(data["date"]),
                     ),
                 )
 
+                bump_data_version(cur, ACCOUNTS)
                 conn.commit()
                 conn.close()
                 self.load_data()
@@ -1356,6 +1417,7 @@ class BudgetDesktopApp(QMainWindow):
                 """,
                     (name, budgeted_amount, self.current_period_id),
                 )
+                bump_data_version(cur, BUDGET_CATEGORIES)
                 conn.commit()
                 conn.close()
                 self.load_data()
@@ -1391,6 +1453,7 @@ class BudgetDesktopApp(QMainWindow):
                     "UPDATE budget_categories SET name = %s, budgeted_amount = %s WHERE id = %s",
                     (name, budgeted_amount, category_id),
                 )
+                bump_data_version(cur, BUDGET_CATEGORIES)
                 conn.commit()
                 conn.close()
                 self.load_data()
@@ -1427,15 +1490,13 @@ class BudgetDesktopApp(QMainWindow):
                 conn = self.get_db_connection()
                 cur = conn.cursor()
                 # Clear category from purchases
-                cur.execute(
-                    "UPDATE purchases SET budget_category_id = NULL WHERE budget_category_id = %s",
-                    (category_id,),
-                )
+                cur.execute(DETACH_CATEGORY_SQL, (category_id,))
                 # Delete category
                 cur.execute(
                     "DELETE FROM budget_categories WHERE id = %s",
                     (category_id,),
                 )
+                bump_data_version(cur, BUDGET_CATEGORIES)
                 conn.commit()
                 conn.close()
                 self.load_data()
@@ -1540,11 +1601,13 @@ class BudgetDesktopApp(QMainWindow):
             conn = self.get_db_connection()
             cur = conn.cursor()
 
-            # Insert purchase
+            # Insert purchase; the balance trigger charges the account and
+            # the budget category
+            self.period_calendar.refresh(cur)
             cur.execute(
                 """
-                INSERT INTO purchases (user_name, amount, account_id, budget_category_id, description, date)
-                VALUES (%s, %s, %s, %s, %s, %s)
+                INSERT INTO purchases (user_name, amount, account_id, budget_category_id, description, date, period_id)
+                VALUES (%s, %s, %s, %s, %s, %s, %s)
             """,
                 (
                     data["user"],
@@ -1553,41 +1616,11 @@ class BudgetDesktopApp(QMainWindow):
                     data["category_id"],
                     data["description"],
                     data["date"],
+                    self.period_calendar.period_for(data["date"]),
                 ),
             )
 
-            # Update account balance
-            if data["account_id"]:
-                cur.execute(
-                    "UPDATE accounts SET balance = balance - %s WHERE id = %s",
-                    (data["amount"], data["account_id"]),
-                )
-
-            # Update budget category balance (with period validation)
-            if data["category_id"]:
-                if self.current_period_id:
-                    # Validate that the category belongs to the current period
-                    cur.execute(
-                        """
-                        UPDATE budget_categories 
-                        SET current_balance = current_balance - %s 
-                        WHERE id = %s AND period_id = %s
-                    """,
-                        (
-                            data["amount"],
-                            data["category_id"],
-                            self.current_period_id,
-                        ),
-                    )
-                else:
-                    # Fallback for backward compatibility
-                    cur.execute(
-                        """
-                        UPDATE budget_categories SET current_balance = current_balance - %s WHERE id = %s
-                    """,
-                        (data["amount"], data["category_id"]),
-                    )
-
+            bump_data_version(cur, ACCOUNTS, BUDGET_CATEGORIES)
             conn.commit()
             conn.close()
             self.load_data()
@@ -1627,39 +1660,15 @@ class BudgetDesktopApp(QMainWindow):
                 self.purchases_table.item(selected_row, 0).text()
             )
             try:
-                # Get purchase details first to reverse balance changes
+                # The balance trigger refunds the account and category
                 conn = self.get_db_connection()
                 cur = conn.cursor()
                 cur.execute(
-                    "SELECT amount, account_id, budget_category_id FROM purchases WHERE id = %s",
-                    (purchase_id,),
+                    "DELETE FROM purchases WHERE id = %s", (purchase_id,)
                 )
-                purchase = cur.fetchone()
-
-                if purchase:
-                    amount, account_id, category_id = purchase
-
-                    # Reverse account balance
-                    if account_id:
-                        cur.execute(
-                            "UPDATE accounts SET balance = balance + %s WHERE id = %s",
-                            (amount, account_id),
-                        )
-
-                    # Reverse budget category balance (with period validation)
-                    if category_id:
-                        # Note: We don't validate period here since we're reversing a historical transaction
-                        # The category might be from a different period than currently selected
-                        cur.execute(
-                            "UPDATE budget_categories SET current_balance = current_balance + %s WHERE id = %s",
-                            (amount, category_id),
-                        )
-
-                    # Delete purchase
-                    cur.execute(
-                        "DELETE FROM purchases WHERE id = %s", (purchase_id,)
-                    )
 
+                if cur.rowcount:
+                    bump_data_version(cur, ACCOUNTS, BUDGET_CATEGORIES)
                     conn.commit()
                     conn.close()
                     self.load_data()
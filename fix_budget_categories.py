@@ -186,16 +186,6 @@ def fix_duplicates():
             f"  Total budgeted: {total_budgeted}, Total current: {total_current}"
         )
 
-        # Update the category we're keeping
-        cur.execute(
-            """
-            UPDATE budget_categories 
-            SET budgeted_amount = %s, current_balance = %s
-            WHERE id = %s
-        """,
-            (total_budgeted, total_current, keep_id),
-        )
-
         # Update any purchases that reference the duplicates
         duplicate_ids = [cat[0] for cat in category_group[1:]]
         for dup_id in duplicate_ids:
@@ -214,6 +204,17 @@ def fix_duplicates():
             )
             print(f"  Deleted duplicate ID {dup_id}")
 
+        # Set the merged totals last: moving the purchases above also moved
+        # their amounts between the balances (balance trigger)
+        cur.execute(
+            """
+            UPDATE budget_categories 
+            SET budgeted_amount = %s, current_balance = %s
+            WHERE id = %s
+        """,
+            (total_budgeted, total_current, keep_id),
+        )
+
     conn.commit()
     conn.close()
     print("Duplicates fixed successfully!")
@@ -0,0 +1,45 @@
+"""
+Gunicorn Settings
+=================
+
+Loaded automatically by gunicorn from the working directory. Each worker
+serves requests on GUNICORN_THREADS threads (default 8); app.py sizes its
+connection pool and /events stream limit from the same variable, so keep
+thread counts out of the command line.
+
+Each worker writes its Prometheus samples to PROMETHEUS_MULTIPROC_DIR so
+/metrics can add up all workers (see metrics.py), and shares the list
+endpoints' read cache through READ_CACHE_DIR (see read_cache.py).
+"""
+
+import os
+import shutil
+import tempfile
+
+worker_class = "gthread"
+threads = int(os.environ.setdefault("GUNICORN_THREADS", "8"))
+
+os.environ.setdefault(
+    "PROMETHEUS_MULTIPROC_DIR",
+    os.path.join(tempfile.gettempdir(), "holm-budget-metrics"),
+)
+os.environ.setdefault(
+    "READ_CACHE_DIR",
+    os.path.join(tempfile.gettempdir(), "holm-budget-cache"),
+)
+
+
+def on_starting(server):
+    # Samples left over from a previous server run would be added in
+    metrics_dir = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+    shutil.rmtree(metrics_dir, ignore_errors=True)
+    os.makedirs(metrics_dir)
+    # Entries cached by a previous server run may predate writes since
+    shutil.rmtree(os.environ["READ_CACHE_DIR"], ignore_errors=True)
+
+
+def child_exit(server, worker):
+    # Drops the live gauges (in-flight requests) of a worker that exited
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,88 @@
+"""
+Hot Queries
+===========
+
+SQL of the queries app.py and desktop_app.py run on every page load or
+sync. They live here so test_query_plans.py checks the exact statements the
+apps send: if one stops using its index, the plan check fails. Queries that
+belong to a module of their own stay there (change_feed.CHANGES_SINCE_SQL,
+ledger.BALANCE_AS_OF_SQL, period_calendar.PERIOD_FOR_PURCHASE_SQL).
+"""
+
+# /get_purchases page, newest first; format with where, then LIMIT %s
+PURCHASE_PAGE_SQL = """
+    SELECT p.id, p.user_name, p.amount, p.description, p.date,
+           a.name as account_name, bc.name as category_name
+    FROM purchases p
+    LEFT JOIN accounts a ON p.account_id = a.id
+    LEFT JOIN budget_categories bc ON p.budget_category_id = bc.id
+    WHERE {where}
+    ORDER BY p.date DESC, p.id DESC
+    LIMIT %s
+"""
+
+# /bootstrap's newest purchases per user (users, limit): one index range
+# scan per user instead of sorting all purchases
+RECENT_PURCHASES_SQL = """
+    SELECT p.id, p.user_name, p.amount, p.description, p.date,
+           a.name as account_name, bc.name as category_name
+    FROM unnest(%s::text[]) AS u(user_name)
+    CROSS JOIN LATERAL (
+        SELECT * FROM purchases
+        WHERE purchases.user_name = u.user_name
+        ORDER BY purchases.date DESC, purchases.id DESC
+        LIMIT %s
+    ) p
+    LEFT JOIN accounts a ON p.account_id = a.id
+    LEFT JOIN budget_categories bc ON p.budget_category_id = bc.id
+    ORDER BY p.user_name, p.date DESC, p.id DESC
+"""
+
+# Categories of one period (period_id), by name
+PERIOD_CATEGORIES_SQL = """
+    SELECT id, name, budgeted_amount, current_balance
+    FROM budget_categories
+    WHERE period_id = %s
+    ORDER BY name
+"""
+
+# Newest category of each name (names), as /sync_purchases files purchases:
+# walking the ids down finds it in the latest period instead of reading
+# every period's row of that name
+CATEGORY_IDS_BY_NAME_SQL = """
+    SELECT n.name, c.id
+    FROM unnest(%s::text[]) AS n(name)
+    CROSS JOIN LATERAL (
+        SELECT id FROM budget_categories
+        WHERE budget_categories.name = n.name
+        ORDER BY id DESC
+        LIMIT 1
+    ) c
+"""
+
+# Rollover: detach purchases from the categories of a period (period_id)
+DETACH_PERIOD_CATEGORIES_SQL = """
+    UPDATE purchases
+    SET budget_category_id = NULL
+    WHERE budget_category_id IN (
+        SELECT id FROM budget_categories WHERE period_id = %s
+    )
+"""
+
+# Desktop purchase list of a period (period_id); format with user_filter,
+# empty or "AND p.user_name = %s"
+PERIOD_PURCHASES_SQL = """
+    SELECT p.id, p.user_name, p.amount, a.name, bc.name, p.description, p.date
+    FROM purchases p
+    LEFT JOIN accounts a ON p.account_id = a.id
+    LEFT JOIN budget_categories bc ON p.budget_category_id = bc.id
+    WHERE p.period_id = %s
+    {user_filter}
+    ORDER BY p.date DESC LIMIT 200
+"""
+
+# Desktop category delete: detach its purchases first (category_id)
+DETACH_CATEGORY_SQL = (
+    "UPDATE purchases SET budget_category_id = NULL "
+    "WHERE budget_category_id = %s"
+)
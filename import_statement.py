@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Bank Statement Import
+=====================
+
+Imports a Bank Zero or Tyme statement export (CSV or OFX) into one
+account's purchases. Lines already recorded for the account, from an
+earlier import or typed in with the bank's description, are skipped; see
+statement_import.py.
+
+Usage:
+    python import_statement.py "Robert - Tyme Cheque" statement.csv
+    python import_statement.py 3 statement.ofx --dry-run
+    python import_statement.py 3 statement.csv --user Peanut
+
+Requirements:
+    - DATABASE_URL environment variable (or .env file)
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+import statement_import
+from data_versions import ACCOUNTS, bump_data_version
+from db_pool import connect
+
+# Load environment variables from .env file
+env_file = Path(__file__).parent / ".env"
+if env_file.exists():
+    with open(env_file) as f:
+        for line in f:
+            if "=" in line and not line.strip().startswith("#"):
+                key, value = line.strip().split("=", 1)
+                os.environ.setdefault(key, value)
+
+
+def resolve_account(cur, account):
+    """Account id from an id or an exact account name"""
+    if account.isdigit():
+        return int(account)
+    cur.execute("SELECT id FROM accounts WHERE name = %s", (account,))
+    row = cur.fetchone()
+    if row is None:
+        raise ValueError(f"unknown account {account!r}")
+    return row[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import a bank statement")
+    parser.add_argument("account", help="account id or name")
+    parser.add_argument("file", help="CSV or OFX statement export")
+    parser.add_argument(
+        "--format",
+        choices=statement_import.FORMATS,
+        help="statement format (detected when omitted)",
+    )
+    parser.add_argument(
+        "--user", help="purchases' user (default: the account's owner)"
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="count new and duplicate lines without importing",
+    )
+    args = parser.parse_args()
+
+    try:
+        conn = connect()
+    except Exception as e:
+        print(f"❌ Could not connect to database: {e}")
+        sys.exit(1)
+
+    started = time.perf_counter()
+    try:
+        cur = conn.cursor()
+        account_id = resolve_account(cur, args.account)
+        with open(args.file, "rb") as f:
+            lines = statement_import.parse_statement(
+                statement_import.open_text(f), args.format
+            )
+            result = statement_import.import_statement(
+                cur,
+                account_id,
+                lines,
+                user_name=args.user,
+                source=os.path.basename(args.file),
+            )
+        if args.dry_run:
+            conn.rollback()
+        else:
+            if result["imported"]:
+                bump_data_version(cur, ACCOUNTS)
+            conn.commit()
+    except Exception as e:
+        conn.rollback()
+        print(f"❌ Import failed: {e}")
+        sys.exit(1)
+    finally:
+        conn.close()
+
+    action = "Would import" if args.dry_run else "Imported"
+    print(
+        f"✅ {action} {result['imported']} of {result['lines']} lines "
+        f"({result['duplicates']} duplicates) in "
+        f"{time.perf_counter() - started:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,284 @@
+"""
+Leader-Elected Job Scheduler
+============================
+
+Every gunicorn worker imports app.py, so a BackgroundScheduler started at
+import time would run each monthly job once per worker. Instead, each
+worker starts a LeaderScheduler: a daemon thread that keeps one connection
+and tries a session-level advisory lock every retry_interval seconds.
+The process that holds the lock runs the one APScheduler instance. The
+other processes run no scheduler and no job store, only a try-lock query
+now and then.
+
+Jobs live in Postgres (PostgresJobStore, table from
+migrations/0011_scheduler_jobs.py). A leader elected after a restart or
+failover therefore picks up the stored next run times and catches up on
+runs that were missed while no process held the lock. Runs missed several
+times over are coalesced into one.
+
+When the leader's connection drops, Postgres releases the lock. The old
+leader notices on its next health check, stops its scheduler and goes
+back to trying the lock.
+"""
+
+import os
+import pickle
+import threading
+import time
+
+from apscheduler.job import Job
+from apscheduler.jobstores.base import (
+    BaseJobStore,
+    ConflictingIdError,
+    JobLookupError,
+)
+from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.util import (
+    datetime_to_utc_timestamp,
+    utc_timestamp_to_datetime,
+)
+
+# Advisory lock key; migrations use 4_811_001
+SCHEDULER_LOCK_ID = 4_811_002
+
+
+class PostgresJobStore(BaseJobStore):
+    """APScheduler job store on a pg8000 connection.
+
+    Same table layout as APScheduler's SQLAlchemyJobStore, without the
+    SQLAlchemy dependency. The connection is shared with the leader's
+    health check, so every use goes through conn_lock.
+    """
+
+    def __init__(
+        self, conn, conn_lock, pickle_protocol=pickle.HIGHEST_PROTOCOL
+    ):
+        super().__init__()
+        self.conn = conn
+        self.conn_lock = conn_lock
+        self.pickle_protocol = pickle_protocol
+
+    def _run(self, sql, params=()):
+        """Execute in its own transaction; (rows, rowcount)"""
+        with self.conn_lock:
+            cur = self.conn.cursor()
+            try:
+                cur.execute(sql, params)
+                rows = cur.fetchall() if cur.description else []
+                rowcount = cur.rowcount
+                self.conn.commit()
+            except Exception:
+                self.conn.rollback()
+                raise
+        return rows, rowcount
+
+    def lookup_job(self, job_id):
+        rows, _ = self._run(
+            "SELECT job_state FROM apscheduler_jobs WHERE id = %s", (job_id,)
+        )
+        return self._reconstitute_job(rows[0][0]) if rows else None
+
+    def get_due_jobs(self, now):
+        return self._get_jobs(
+            "WHERE next_run_time <= %s", (datetime_to_utc_timestamp(now),)
+        )
+
+    def get_next_run_time(self):
+        rows, _ = self._run(
+            """
+            SELECT next_run_time FROM apscheduler_jobs
+            WHERE next_run_time IS NOT NULL
+            ORDER BY next_run_time
+            LIMIT 1
+        """
+        )
+        return utc_timestamp_to_datetime(rows[0][0]) if rows else None
+
+    def get_all_jobs(self):
+        jobs = self._get_jobs()
+        self._fix_paused_jobs_sorting(jobs)
+        return jobs
+
+    def add_job(self, job):
+        rows, _ = self._run(
+            """
+            INSERT INTO apscheduler_jobs (id, next_run_time, job_state)
+            VALUES (%s, %s, %s)
+            ON CONFLICT (id) DO NOTHING
+            RETURNING id
+        """,
+            (
+                job.id,
+                datetime_to_utc_timestamp(job.next_run_time),
+                pickle.dumps(job.__getstate__(), self.pickle_protocol),
+            ),
+        )
+        if not rows:
+            raise ConflictingIdError(job.id)
+
+    def update_job(self, job):
+        _, rowcount = self._run(
+            """
+            UPDATE apscheduler_jobs SET next_run_time = %s, job_state = %s
+            WHERE id = %s
+        """,
+            (
+                datetime_to_utc_timestamp(job.next_run_time),
+                pickle.dumps(job.__getstate__(), self.pickle_protocol),
+                job.id,
+            ),
+        )
+        if rowcount == 0:
+            raise JobLookupError(job.id)
+
+    def remove_job(self, job_id):
+        _, rowcount = self._run(
+            "DELETE FROM apscheduler_jobs WHERE id = %s", (job_id,)
+        )
+        if rowcount == 0:
+            raise JobLookupError(job_id)
+
+    def remove_all_jobs(self):
+        self._run("DELETE FROM apscheduler_jobs")
+
+    def _reconstitute_job(self, job_state):
+        job_state = pickle.loads(job_state)
+        job_state["jobstore"] = self
+        job = Job.__new__(Job)
+        job.__setstate__(job_state)
+        job._scheduler = self._scheduler
+        job._jobstore_alias = self._alias
+        return job
+
+    def _get_jobs(self, where="", params=()):
+        rows, _ = self._run(
+            f"""
+            SELECT id, job_state FROM apscheduler_jobs {where}
+            ORDER BY next_run_time
+        """,
+            params,
+        )
+        jobs = []
+        failed_job_ids = []
+        for job_id, job_state in rows:
+            try:
+                jobs.append(self._reconstitute_job(job_state))
+            except BaseException:
+                self._logger.exception(
+                    'Unable to restore job "%s" -- removing it', job_id
+                )
+                failed_job_ids.append(job_id)
+
+        if failed_job_ids:
+            self._run(
+                "DELETE FROM apscheduler_jobs WHERE id = ANY(%s)",
+                (failed_job_ids,),
+            )
+        return jobs
+
+
+def schedule_job(scheduler, job_id, func, trigger):
+    """Add a job, keeping the stored one (and its pending run) if unchanged.
+
+    add_job(replace_existing=True) would recompute the next run time from
+    now and so drop a run that was missed while no leader was up.
+    """
+    existing = scheduler.get_job(job_id)
+    if (
+        existing is not None
+        and str(existing.trigger) == str(trigger)
+        and existing.func == func
+    ):
+        return existing
+    return scheduler.add_job(func, trigger, id=job_id, replace_existing=True)
+
+
+class LeaderScheduler:
+    def __init__(
+        self,
+        connect_func,
+        add_jobs,
+        retry_interval=60,
+        health_interval=15,
+        lock_id=SCHEDULER_LOCK_ID,
+    ):
+        """
+        connect_func: opens the dedicated lock/job store connection
+        add_jobs: called with the started (paused) scheduler on election
+        retry_interval: seconds between lock attempts while a follower
+        health_interval: seconds between connection checks while leader
+        """
+        self.connect_func = connect_func
+        self.add_jobs = add_jobs
+        self.retry_interval = retry_interval
+        self.health_interval = health_interval
+        self.lock_id = lock_id
+        self.pid = os.getpid()
+        self.scheduler = None
+
+        self._conn_lock = threading.RLock()
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+    @property
+    def is_leader(self):
+        return self.scheduler is not None
+
+    def start(self):
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="scheduler-leader", daemon=True
+                )
+                self._thread.start()
+        return self
+
+    def _try_lock(self, conn):
+        with self._conn_lock:
+            cur = conn.cursor()
+            cur.execute("SELECT pg_try_advisory_lock(%s)", (self.lock_id,))
+            acquired = cur.fetchone()[0]
+            # Session-level: the lock outlives this transaction
+            conn.commit()
+        return acquired
+
+    def _lead(self, conn):
+        """Run the scheduler until the lock connection fails"""
+        scheduler = BackgroundScheduler(
+            jobstores={
+                "default": PostgresJobStore(conn, self._conn_lock),
+            },
+            # Catch up once on runs missed however long ago
+            job_defaults={"coalesce": True, "misfire_grace_time": None},
+        )
+        scheduler.start(paused=True)
+        try:
+            self.add_jobs(scheduler)
+            scheduler.resume()
+            self.scheduler = scheduler
+            print(f"👑 Scheduler leader elected (pid {self.pid})")
+            while True:
+                time.sleep(self.health_interval)
+                with self._conn_lock:
+                    conn.execute_simple("SELECT 1")
+        finally:
+            self.scheduler = None
+            scheduler.shutdown(wait=False)
+
+    def _run(self):
+        conn = None
+        while True:
+            try:
+                if conn is None:
+                    conn = self.connect_func()
+                if self._try_lock(conn):
+                    self._lead(conn)
+            except Exception as e:
+                print(f"❌ Scheduler leader error: {e}")
+                if conn is not None:
+                    try:
+                        conn.close()
+                    except Exception:
+                        pass
+                    conn = None
+            time.sleep(self.retry_interval)
@@ -0,0 +1,77 @@
+"""
+Balance Ledger
+==============
+
+Every balance movement is posted to ledger_entries by database triggers
+(migrations/0010_ledger.py), so an account or budget category balance at
+any past moment can be reconstructed. Replaying the whole ledger gets
+slower as it grows; balance_snapshots checkpoints each balance now and
+then, and a lookup starts from the nearest checkpoint and sums only the
+entries after it.
+
+Checkpoints use the same transaction-id boundary as the change feed: a
+snapshot covers the entries of every transaction below
+txid_snapshot_xmin(), all of which have finished, so an entry that
+commits late still falls in the tail rather than being skipped.
+"""
+
+LEDGERS = ("account", "category")
+
+# Nearest snapshot plus the ledger tail after it (ledger, ledger_id, when,
+# ledger, ledger_id, when)
+BALANCE_AS_OF_SQL = """
+    SELECT COALESCE(s.balance, 0) + COALESCE((
+        SELECT SUM(e.amount) FROM ledger_entries e
+        WHERE e.ledger = %s AND e.ledger_id = %s
+        AND e.txid >= COALESCE(s.txid, 0)
+        AND e.posted_at <= %s
+    ), 0)
+    FROM (SELECT 1) one
+    LEFT JOIN LATERAL (
+        SELECT txid, balance FROM balance_snapshots
+        WHERE ledger = %s AND ledger_id = %s AND taken_at <= %s
+        ORDER BY taken_at DESC
+        LIMIT 1
+    ) s ON TRUE
+"""
+
+
+def balance_as_of(cur, ledger, ledger_id, when):
+    """Balance of an account or category as of a timestamp"""
+    if ledger not in LEDGERS:
+        raise ValueError(f"Unknown ledger: {ledger}")
+    cur.execute(
+        BALANCE_AS_OF_SQL, (ledger, ledger_id, when, ledger, ledger_id, when)
+    )
+    return cur.fetchone()[0]
+
+
+def take_balance_snapshots(cur):
+    """Checkpoint every balance with entries since its last snapshot"""
+    cur.execute(
+        """
+        INSERT INTO balance_snapshots (ledger, ledger_id, taken_at, txid,
+                                       balance)
+        SELECT k.ledger, k.id, statement_timestamp(), c.txid,
+               COALESCE(s.balance, 0) + t.amount
+        FROM (SELECT txid_snapshot_xmin(txid_current_snapshot()) AS txid) c
+        CROSS JOIN (
+            SELECT 'account' AS ledger, id FROM accounts
+            UNION ALL
+            SELECT 'category', id FROM budget_categories
+        ) k
+        LEFT JOIN LATERAL (
+            SELECT txid, balance FROM balance_snapshots
+            WHERE ledger = k.ledger AND ledger_id = k.id
+            ORDER BY taken_at DESC
+            LIMIT 1
+        ) s ON TRUE
+        CROSS JOIN LATERAL (
+            SELECT SUM(e.amount) AS amount FROM ledger_entries e
+            WHERE e.ledger = k.ledger AND e.ledger_id = k.id
+            AND e.txid >= COALESCE(s.txid, 0) AND e.txid < c.txid
+        ) t
+        WHERE t.amount IS NOT NULL
+    """
+    )
+    return cur.rowcount
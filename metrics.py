@@ -0,0 +1,150 @@
+"""
+Request Metrics
+===============
+
+Per-route latency, status, in-flight, database time, connection-acquire
+time and payload size metrics, served at /metrics in the Prometheus text
+format.
+
+Under gunicorn (gunicorn.conf.py) every worker writes its samples to files
+in PROMETHEUS_MULTIPROC_DIR, and a scrape adds up the files of all
+workers, so whichever worker answers /metrics reports the whole server.
+Without that variable (python app.py) the in-process registry is used.
+
+Route labels are URL rules ("/get_purchases"), never raw paths, so the
+number of series stays bounded.
+"""
+
+import os
+import time
+
+from flask import g, request
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Time from request start until the response is returned",
+    ["method", "route"],
+)
+REQUESTS = Counter(
+    "http_requests",
+    "Requests handled, by response status",
+    ["method", "route", "status"],
+)
+IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "Requests currently being handled",
+    multiprocess_mode="livesum",
+)
+REQUEST_DB_TIME = Histogram(
+    "http_request_db_seconds",
+    "Time spent executing SQL statements during one request",
+    ["route"],
+)
+REQUEST_QUERIES = Histogram(
+    "http_request_db_queries",
+    "SQL statements executed during one request",
+    ["route"],
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100),
+)
+READ_CACHE_EVENTS = Counter(
+    "read_cache_events",
+    "Shared read cache hits, misses, coalesced misses, invalidations and "
+    "evictions",
+    ["resource", "event"],
+)
+DB_ACQUIRE_TIME = Histogram(
+    "db_connection_acquire_seconds",
+    "Time to borrow a connection from the worker's pool",
+)
+REQUEST_SIZE = Histogram(
+    "http_request_size_bytes",
+    "Request body size",
+    ["route"],
+    buckets=SIZE_BUCKETS,
+)
+RESPONSE_SIZE = Histogram(
+    "http_response_size_bytes",
+    "Response body size (streamed responses are not counted)",
+    ["route"],
+    buckets=SIZE_BUCKETS,
+)
+
+
+def _route():
+    rule = request.url_rule
+    return rule.rule if rule is not None else "unmatched"
+
+
+def record_acquire(seconds):
+    DB_ACQUIRE_TIME.observe(seconds)
+
+
+def record_cache_event(resource, event):
+    """ReadCache on_event hook"""
+    READ_CACHE_EVENTS.labels(resource, event).inc()
+
+
+def instrument(app):
+    """Register the request hooks that feed the metrics.
+
+    Database time and statement counts come from the request's
+    query_stats capture (g.query_stats).
+    """
+
+    @app.before_request
+    def start_request_metrics():
+        g.metrics_started = time.perf_counter()
+        IN_FLIGHT.inc()
+
+    @app.after_request
+    def capture_response_metrics(response):
+        g.metrics_status = response.status_code
+        if not response.is_streamed:
+            g.metrics_response_size = response.calculate_content_length()
+        return response
+
+    @app.teardown_request
+    def finish_request_metrics(exc):
+        started = g.pop("metrics_started", None)
+        if started is None:
+            return
+        IN_FLIGHT.dec()
+
+        route = _route()
+        # Unhandled exceptions never reach after_request
+        status = g.pop("metrics_status", 500)
+        REQUEST_LATENCY.labels(request.method, route).observe(
+            time.perf_counter() - started
+        )
+        REQUESTS.labels(request.method, route, str(status)).inc()
+        stats = g.get("query_stats")
+        if stats is not None:
+            REQUEST_DB_TIME.labels(route).observe(stats.db_time)
+            REQUEST_QUERIES.labels(route).observe(stats.statements)
+        if request.content_length:
+            REQUEST_SIZE.labels(route).observe(request.content_length)
+        response_size = g.pop("metrics_response_size", None)
+        if response_size is not None:
+            RESPONSE_SIZE.labels(route).observe(response_size)
+
+
+def render():
+    """(body, content type) of every worker's metrics"""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
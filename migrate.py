@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Database Schema Migrations
+==========================
+
+Applies the versioned migrations in migrations/ and seeds accounts and
+budget categories from config/settings.json. The web app upgrades on its
+own when it finds the database behind; run this to migrate ahead of a
+deploy, to inspect state, or to pick up config changes.
+
+Usage:
+    python migrate.py status            # applied and pending versions
+    python migrate.py upgrade [--to N]  # apply pending migrations (and seed)
+    python migrate.py seed              # add missing config accounts/categories
+    python migrate.py backfill-periods  # fill purchases.period_id in batches
+
+Requirements:
+    - DATABASE_URL environment variable (or .env file)
+"""
+
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+import migrations
+from db_pool import connect
+from period_calendar import backfill_purchase_periods
+
+# Load environment variables from .env file
+env_file = Path(__file__).parent / ".env"
+if env_file.exists():
+    with open(env_file) as f:
+        for line in f:
+            if "=" in line and not line.strip().startswith("#"):
+                key, value = line.strip().split("=", 1)
+                os.environ.setdefault(key, value)
+
+
+def load_settings():
+    with open(Path(__file__).parent / "config" / "settings.json") as f:
+        return json.load(f)
+
+
+def status(conn):
+    cur = conn.cursor()
+    applied = migrations.applied_versions(cur)
+    conn.rollback()
+    for version, name, _ in migrations.discover():
+        if version in applied:
+            print(f"  [x] {version:04d}_{name}  (applied {applied[version]})")
+        else:
+            print(f"  [ ] {version:04d}_{name}")
+    pending = [v for v, _, _ in migrations.discover() if v not in applied]
+    print(f"\n{len(applied)} applied, {len(pending)} pending")
+
+
+def seed(conn):
+    cur = conn.cursor()
+    accounts, categories = migrations.seed(cur, load_settings())
+    conn.commit()
+    print(f"✅ Added {accounts} accounts and {categories} budget categories")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Database schema migrations")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("status", help="show applied and pending migrations")
+    upgrade_parser = commands.add_parser(
+        "upgrade", help="apply pending migrations, then seed from config"
+    )
+    upgrade_parser.add_argument(
+        "--to", type=int, help="stop after this version"
+    )
+    commands.add_parser("seed", help="add missing config accounts/categories")
+    commands.add_parser(
+        "backfill-periods", help="fill purchases.period_id in batches"
+    )
+    args = parser.parse_args()
+
+    try:
+        conn = connect()
+    except Exception as e:
+        print(f"❌ Could not connect to database: {e}")
+        sys.exit(1)
+
+    try:
+        if args.command == "status":
+            status(conn)
+        elif args.command == "upgrade":
+            applied = migrations.upgrade(conn, target=args.to)
+            print(f"✅ Applied {len(applied)} migrations")
+            if args.to is None:
+                seed(conn)
+                backfill_purchase_periods(conn)
+        elif args.command == "seed":
+            seed(conn)
+        elif args.command == "backfill-periods":
+            total = backfill_purchase_periods(conn)
+            print(f"✅ Backfilled period_id on {total} purchases")
+    except Exception as e:
+        print(f"❌ Migration failed: {e}")
+        sys.exit(1)
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
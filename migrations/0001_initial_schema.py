@@ -0,0 +1,44 @@
+"""Accounts, budget categories and purchases (formerly init_db)"""
+
+
+def up(cur):
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS accounts (
+            id SERIAL PRIMARY KEY,
+            name VARCHAR(255) NOT NULL UNIQUE,
+            account_type VARCHAR(50) NOT NULL,
+            balance DECIMAL(10,2) NOT NULL DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """
+    )
+
+    # Names become unique per period in 0002
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS budget_categories (
+            id SERIAL PRIMARY KEY,
+            name VARCHAR(255) NOT NULL UNIQUE,
+            budgeted_amount DECIMAL(10,2) NOT NULL DEFAULT 0,
+            current_balance DECIMAL(10,2) NOT NULL DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """
+    )
+
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS purchases (
+            id SERIAL PRIMARY KEY,
+            user_name VARCHAR(255) NOT NULL,
+            amount DECIMAL(10,2) NOT NULL,
+            account_id INTEGER,
+            budget_category_id INTEGER,
+            description TEXT,
+            date TIMESTAMP NOT NULL,
+            FOREIGN KEY (account_id) REFERENCES accounts (id),
+            FOREIGN KEY (budget_category_id) REFERENCES budget_categories (id)
+        )
+    """
+    )
@@ -0,0 +1,93 @@
+"""Budget periods, per-period categories and transfers.
+
+Schema part of the former database_migration_12_months.py and the
+constraint fix in final_fix_august.py. Periods themselves are created by
+the monthly rollover, not here.
+"""
+
+
+def up(cur):
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS budget_periods (
+            id SERIAL PRIMARY KEY,
+            period_name VARCHAR(20) NOT NULL UNIQUE,
+            start_date DATE NOT NULL,
+            end_date DATE NOT NULL,
+            is_active BOOLEAN DEFAULT FALSE,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """
+    )
+
+    cur.execute(
+        """
+        ALTER TABLE budget_categories
+        ADD COLUMN IF NOT EXISTS period_id INTEGER REFERENCES budget_periods(id)
+    """
+    )
+
+    # Every unique constraint on name alone blocks the same category
+    # existing in two periods
+    cur.execute(
+        """
+        SELECT c.conname
+        FROM pg_constraint c
+        JOIN pg_attribute a
+          ON a.attrelid = c.conrelid AND a.attnum = ANY(c.conkey)
+        WHERE c.conrelid = 'budget_categories'::regclass
+          AND c.contype = 'u'
+        GROUP BY c.conname
+        HAVING array_agg(a.attname::text) = ARRAY['name']
+    """
+    )
+    for (constraint_name,) in cur.fetchall():
+        cur.execute(
+            f'ALTER TABLE budget_categories DROP CONSTRAINT "{constraint_name}"'
+        )
+
+    cur.execute(
+        """
+        SELECT 1 FROM pg_constraint
+        WHERE conname = 'budget_categories_name_period_unique'
+    """
+    )
+    if not cur.fetchone():
+        cur.execute(
+            """
+            ALTER TABLE budget_categories
+            ADD CONSTRAINT budget_categories_name_period_unique
+            UNIQUE (name, period_id)
+        """
+        )
+
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS transfers (
+            id SERIAL PRIMARY KEY,
+            from_account_id INTEGER NOT NULL,
+            to_account_id INTEGER NOT NULL,
+            amount DECIMAL(10,2) NOT NULL,
+            description TEXT,
+            originator_user VARCHAR(255) NOT NULL,  -- 'Robert' or 'Peanut'
+            transfer_date TIMESTAMP NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (from_account_id) REFERENCES accounts (id),
+            FOREIGN KEY (to_account_id) REFERENCES accounts (id)
+        )
+    """
+    )
+
+    cur.execute(
+        """
+        CREATE OR REPLACE FUNCTION get_current_period()
+        RETURNS INTEGER AS $$
+        BEGIN
+            RETURN (SELECT id FROM budget_periods
+                    WHERE CURRENT_DATE >= start_date
+                    AND CURRENT_DATE <= end_date
+                    LIMIT 1);
+        END;
+        $$ LANGUAGE plpgsql
+    """
+    )
@@ -0,0 +1,14 @@
+"""Rename 'Bank 0' accounts to 'Bank Zero' (formerly run on every startup).
+
+Purchases reference accounts by id, so renaming in place keeps them linked.
+"""
+
+
+def up(cur):
+    cur.execute(
+        """
+        UPDATE accounts
+        SET name = REPLACE(name, 'Bank 0', 'Bank Zero')
+        WHERE name LIKE '%Bank 0%' AND name NOT LIKE '%Bank Zero%'
+    """
+    )
@@ -0,0 +1,28 @@
+"""Keyset pagination indexes and client ids for idempotent purchase sync"""
+
+
+def up(cur):
+    # /get_purchases pages newest first, optionally per user
+    cur.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_purchases_date_id
+        ON purchases (date DESC, id DESC)
+    """
+    )
+    cur.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_purchases_user_date_id
+        ON purchases (user_name, date DESC, id DESC)
+    """
+    )
+
+    # Client-generated purchase ids make /sync_purchases retries idempotent
+    cur.execute(
+        "ALTER TABLE purchases ADD COLUMN IF NOT EXISTS client_id UUID"
+    )
+    cur.execute(
+        """
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_purchases_client_id
+        ON purchases (client_id)
+    """
+    )
@@ -0,0 +1,19 @@
+"""Version counters behind the ETags of the read endpoints"""
+
+
+def up(cur):
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS data_versions (
+            resource VARCHAR(50) PRIMARY KEY,
+            version BIGINT NOT NULL DEFAULT 0
+        )
+    """
+    )
+    cur.execute(
+        """
+        INSERT INTO data_versions (resource)
+        VALUES ('accounts'), ('budget_categories'), ('budget_periods')
+        ON CONFLICT (resource) DO NOTHING
+    """
+    )
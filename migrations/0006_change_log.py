@@ -0,0 +1,74 @@
+"""Change log feeding /changes and /events.
+
+record_change() appends one entry per written row and wakes /events
+listeners (pg_notify) for account and category writes.
+"""
+
+
+def up(cur):
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS change_log (
+            seq BIGSERIAL PRIMARY KEY,
+            txid BIGINT NOT NULL DEFAULT txid_current(),
+            table_name VARCHAR(50) NOT NULL,
+            row_id INTEGER NOT NULL,
+            op CHAR(1) NOT NULL,  -- 'U' insert/update, 'D' delete
+            changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """
+    )
+    cur.execute(
+        "CREATE INDEX IF NOT EXISTS idx_change_log_txid ON change_log (txid)"
+    )
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS change_log_horizon (
+            id INTEGER PRIMARY KEY DEFAULT 1 CHECK (id = 1),
+            txid BIGINT NOT NULL DEFAULT 0
+        )
+    """
+    )
+    cur.execute(
+        "INSERT INTO change_log_horizon (id, txid) VALUES (1, 0) "
+        "ON CONFLICT (id) DO NOTHING"
+    )
+    cur.execute(
+        """
+        CREATE OR REPLACE FUNCTION record_change() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'DELETE' THEN
+                INSERT INTO change_log (table_name, row_id, op)
+                VALUES (TG_TABLE_NAME, OLD.id, 'D');
+                IF TG_TABLE_NAME IN ('accounts', 'budget_categories') THEN
+                    PERFORM pg_notify('balance_changes', TG_TABLE_NAME);
+                END IF;
+                RETURN OLD;
+            END IF;
+            INSERT INTO change_log (table_name, row_id, op)
+            VALUES (TG_TABLE_NAME, NEW.id, 'U');
+            -- Wakes /events listeners at commit; identical payloads in one
+            -- transaction are delivered once
+            IF TG_TABLE_NAME IN ('accounts', 'budget_categories') THEN
+                PERFORM pg_notify('balance_changes', TG_TABLE_NAME);
+            END IF;
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+    """
+    )
+
+    for table in ("accounts", "budget_categories", "purchases", "transfers"):
+        cur.execute(
+            "SELECT 1 FROM pg_trigger WHERE tgname = %s",
+            (f"{table}_change_log",),
+        )
+        if cur.fetchone():
+            continue
+        cur.execute(
+            f"""
+            CREATE TRIGGER {table}_change_log
+            AFTER INSERT OR UPDATE OR DELETE ON {table}
+            FOR EACH ROW EXECUTE FUNCTION record_change()
+        """
+        )
@@ -0,0 +1,59 @@
+"""Indexes for the hot purchase, category and transfer queries.
+
+Checked by check_query_plans.py. Newest-first (date, id) ordering is
+already served by the 0004 indexes; these add the account and category
+filters/joins, the per-period category list and the change log reads.
+"""
+
+
+def up(cur):
+    # /get_purchases?account_id=, desktop account deletes, FK joins
+    cur.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_purchases_account_date_id
+        ON purchases (account_id, date DESC, id DESC)
+    """
+    )
+
+    # /get_purchases?category_id=, category deletes and the rollover's
+    # "detach purchases from this period's categories" UPDATE
+    cur.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_purchases_category_date_id
+        ON purchases (budget_category_id, date DESC, id DESC)
+    """
+    )
+
+    # One period's categories by name (/bootstrap, /get_budget_categories,
+    # desktop budget tab). Balances are left out on purpose: indexing them
+    # would turn every balance update into a non-HOT update.
+    cur.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_budget_categories_period_name
+        ON budget_categories (period_id, name)
+    """
+    )
+
+    # change_log is append-only, so a covering index lets /changes and the
+    # desktop's changed-tables check read it index-only
+    cur.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_change_log_txid_covering
+        ON change_log (txid) INCLUDE (table_name, row_id, op, seq)
+    """
+    )
+    cur.execute("DROP INDEX IF EXISTS idx_change_log_txid")
+
+    # Foreign keys checked when an account is deleted
+    cur.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_transfers_from_account
+        ON transfers (from_account_id)
+    """
+    )
+    cur.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_transfers_to_account
+        ON transfers (to_account_id)
+    """
+    )
@@ -0,0 +1,21 @@
+"""Denormalized budget period on purchases.
+
+Existing rows are filled afterwards in short batches by
+period_calendar.backfill_purchase_periods (init_db and `migrate.py
+upgrade` run it), so this migration only takes a brief lock.
+"""
+
+
+def up(cur):
+    cur.execute(
+        """
+        ALTER TABLE purchases
+        ADD COLUMN IF NOT EXISTS period_id INTEGER REFERENCES budget_periods(id)
+    """
+    )
+    cur.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_purchases_period_user_date
+        ON purchases (period_id, user_name, date DESC)
+    """
+    )
@@ -0,0 +1,127 @@
+"""Account and category balances maintained by triggers.
+
+A purchase takes its amount off its account and its budget category
+(income is stored with a negative amount); a transfer moves its amount
+from one account to the other. Deleting or editing the row reverses the
+old effect, so writers only INSERT, UPDATE or DELETE the row itself.
+
+Existing balances are left as they are: they already include every
+purchase and transfer written so far.
+"""
+
+
+def up(cur):
+    # Per statement over the transition tables, so a synced batch still
+    # updates each account and category once
+    cur.execute(
+        """
+        CREATE OR REPLACE FUNCTION apply_purchase_balances() RETURNS trigger AS $$
+        DECLARE
+            account_ids INTEGER[];
+            category_ids INTEGER[];
+            deltas NUMERIC[];
+        BEGIN
+            -- Balance change per row: minus the amount of rows that now
+            -- exist, plus the amount of rows that no longer do
+            IF TG_OP = 'INSERT' THEN
+                SELECT array_agg(account_id), array_agg(budget_category_id),
+                       array_agg(-amount)
+                INTO account_ids, category_ids, deltas
+                FROM new_rows;
+            ELSIF TG_OP = 'DELETE' THEN
+                SELECT array_agg(account_id), array_agg(budget_category_id),
+                       array_agg(amount)
+                INTO account_ids, category_ids, deltas
+                FROM old_rows;
+            ELSE
+                SELECT array_agg(account_id), array_agg(budget_category_id),
+                       array_agg(delta)
+                INTO account_ids, category_ids, deltas
+                FROM (
+                    SELECT account_id, budget_category_id, -amount AS delta
+                    FROM new_rows
+                    UNION ALL
+                    SELECT account_id, budget_category_id, amount
+                    FROM old_rows
+                ) changed;
+            END IF;
+
+            -- Updates that leave amount, account and category alone (e.g.
+            -- the period_id backfill) cancel out and touch nothing
+            UPDATE accounts a SET balance = a.balance + d.delta
+            FROM (
+                SELECT id, SUM(delta) AS delta
+                FROM unnest(account_ids, deltas) AS r(id, delta)
+                WHERE id IS NOT NULL
+                GROUP BY id
+                HAVING SUM(delta) <> 0
+            ) d
+            WHERE a.id = d.id;
+
+            UPDATE budget_categories bc
+            SET current_balance = bc.current_balance + d.delta
+            FROM (
+                SELECT id, SUM(delta) AS delta
+                FROM unnest(category_ids, deltas) AS r(id, delta)
+                WHERE id IS NOT NULL
+                GROUP BY id
+                HAVING SUM(delta) <> 0
+            ) d
+            WHERE bc.id = d.id;
+
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """
+    )
+
+    # Transfers are written one at a time
+    cur.execute(
+        """
+        CREATE OR REPLACE FUNCTION apply_transfer_balances() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                UPDATE accounts SET balance = balance + OLD.amount
+                WHERE id = OLD.from_account_id;
+                UPDATE accounts SET balance = balance - OLD.amount
+                WHERE id = OLD.to_account_id;
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                UPDATE accounts SET balance = balance - NEW.amount
+                WHERE id = NEW.from_account_id;
+                UPDATE accounts SET balance = balance + NEW.amount
+                WHERE id = NEW.to_account_id;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """
+    )
+
+    # Transition tables allow one event per trigger and no column list
+    triggers = {
+        "purchases_balance_insert": (
+            "AFTER INSERT ON purchases REFERENCING NEW TABLE AS new_rows "
+            "FOR EACH STATEMENT EXECUTE FUNCTION apply_purchase_balances()"
+        ),
+        "purchases_balance_update": (
+            "AFTER UPDATE ON purchases "
+            "REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows "
+            "FOR EACH STATEMENT EXECUTE FUNCTION apply_purchase_balances()"
+        ),
+        "purchases_balance_delete": (
+            "AFTER DELETE ON purchases REFERENCING OLD TABLE AS old_rows "
+            "FOR EACH STATEMENT EXECUTE FUNCTION apply_purchase_balances()"
+        ),
+        "transfers_balance": (
+            "AFTER INSERT OR DELETE "
+            "OR UPDATE OF amount, from_account_id, to_account_id "
+            "ON transfers "
+            "FOR EACH ROW EXECUTE FUNCTION apply_transfer_balances()"
+        ),
+    }
+    for name, definition in triggers.items():
+        cur.execute("SELECT 1 FROM pg_trigger WHERE tgname = %s", (name,))
+        if cur.fetchone():
+            continue
+        cur.execute(f"CREATE TRIGGER {name} {definition}")
@@ -0,0 +1,252 @@
+"""Append-only ledger of balance movements, with balance snapshots.
+
+Every change to an account balance or budget category balance is posted
+as ledger_entries legs that sum to zero: the account/category leg and its
+counter leg (the other account for transfers, 'external' otherwise).
+
+- purchases, income and salaries: posted by apply_purchase_balances()
+- transfers: posted by apply_transfer_balances()
+- anything else that writes a balance directly (manual adjustments, the
+  monthly category reset, new accounts/categories): posted as an
+  'adjustment' by record_balance_adjustment()
+
+Current balances are posted as 'opening' entries, so summing the ledger
+gives the stored balance. balance_snapshots checkpoints are written by
+ledger.take_balance_snapshots().
+"""
+
+
+def up(cur):
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS ledger_entries (
+            id BIGSERIAL PRIMARY KEY,
+            txid BIGINT NOT NULL DEFAULT txid_current(),
+            posted_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            ledger VARCHAR(10) NOT NULL,  -- account, category, external
+            ledger_id INTEGER,  -- NULL for external
+            amount DECIMAL(12,2) NOT NULL,
+            source VARCHAR(20) NOT NULL,  -- purchase, transfer, adjustment, opening
+            source_id INTEGER
+        )
+    """
+    )
+    # Snapshot tails: one balance's entries from a snapshot's txid onwards
+    cur.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_ledger_entries_ledger_txid
+        ON ledger_entries (ledger, ledger_id, txid)
+        INCLUDE (posted_at, amount)
+    """
+    )
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS balance_snapshots (
+            ledger VARCHAR(10) NOT NULL,
+            ledger_id INTEGER NOT NULL,
+            taken_at TIMESTAMP NOT NULL,
+            txid BIGINT NOT NULL,  -- covers entries with a smaller txid
+            balance DECIMAL(12,2) NOT NULL,
+            PRIMARY KEY (ledger, ledger_id, taken_at)
+        )
+    """
+    )
+
+    cur.execute(
+        """
+        CREATE OR REPLACE FUNCTION apply_purchase_balances() RETURNS trigger AS $$
+        DECLARE
+            purchase_ids INTEGER[];
+            account_ids INTEGER[];
+            category_ids INTEGER[];
+            deltas NUMERIC[];
+        BEGIN
+            -- Balance change per row: minus the amount of rows that now
+            -- exist, plus the amount of rows that no longer do
+            IF TG_OP = 'INSERT' THEN
+                SELECT array_agg(id), array_agg(account_id),
+                       array_agg(budget_category_id), array_agg(-amount)
+                INTO purchase_ids, account_ids, category_ids, deltas
+                FROM new_rows;
+            ELSIF TG_OP = 'DELETE' THEN
+                SELECT array_agg(id), array_agg(account_id),
+                       array_agg(budget_category_id), array_agg(amount)
+                INTO purchase_ids, account_ids, category_ids, deltas
+                FROM old_rows;
+            ELSE
+                -- Only rows whose amount, account or category changed are
+                -- reversed and re-posted (not e.g. the period_id backfill)
+                SELECT array_agg(id), array_agg(account_id),
+                       array_agg(budget_category_id), array_agg(delta)
+                INTO purchase_ids, account_ids, category_ids, deltas
+                FROM (
+                    SELECT o.id, o.account_id, o.budget_category_id,
+                           o.amount AS delta
+                    FROM old_rows o JOIN new_rows n ON n.id = o.id
+                    WHERE (o.amount, o.account_id, o.budget_category_id)
+                          IS DISTINCT FROM
+                          (n.amount, n.account_id, n.budget_category_id)
+                    UNION ALL
+                    SELECT n.id, n.account_id, n.budget_category_id,
+                           -n.amount
+                    FROM old_rows o JOIN new_rows n ON n.id = o.id
+                    WHERE (o.amount, o.account_id, o.budget_category_id)
+                          IS DISTINCT FROM
+                          (n.amount, n.account_id, n.budget_category_id)
+                ) changed;
+            END IF;
+
+            IF purchase_ids IS NULL THEN
+                RETURN NULL;
+            END IF;
+
+            INSERT INTO ledger_entries (ledger, ledger_id, amount, source,
+                                        source_id)
+            SELECT leg.ledger, leg.ledger_id, leg.amount, 'purchase',
+                   r.purchase_id
+            FROM unnest(purchase_ids, account_ids, category_ids, deltas)
+                 AS r(purchase_id, account_id, category_id, delta)
+            CROSS JOIN LATERAL (VALUES
+                ('account', r.account_id, r.delta, r.account_id),
+                ('external', NULL, -r.delta, r.account_id),
+                ('category', r.category_id, r.delta, r.category_id),
+                ('external', NULL, -r.delta, r.category_id)
+            ) AS leg(ledger, ledger_id, amount, posted_to)
+            WHERE leg.posted_to IS NOT NULL;
+
+            UPDATE accounts a SET balance = a.balance + d.delta
+            FROM (
+                SELECT id, SUM(delta) AS delta
+                FROM unnest(account_ids, deltas) AS r(id, delta)
+                WHERE id IS NOT NULL
+                GROUP BY id
+                HAVING SUM(delta) <> 0
+            ) d
+            WHERE a.id = d.id;
+
+            UPDATE budget_categories bc
+            SET current_balance = bc.current_balance + d.delta
+            FROM (
+                SELECT id, SUM(delta) AS delta
+                FROM unnest(category_ids, deltas) AS r(id, delta)
+                WHERE id IS NOT NULL
+                GROUP BY id
+                HAVING SUM(delta) <> 0
+            ) d
+            WHERE bc.id = d.id;
+
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """
+    )
+
+    cur.execute(
+        """
+        CREATE OR REPLACE FUNCTION apply_transfer_balances() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                INSERT INTO ledger_entries (ledger, ledger_id, amount,
+                                            source, source_id)
+                VALUES ('account', OLD.from_account_id, OLD.amount,
+                        'transfer', OLD.id),
+                       ('account', OLD.to_account_id, -OLD.amount,
+                        'transfer', OLD.id);
+                UPDATE accounts SET balance = balance + OLD.amount
+                WHERE id = OLD.from_account_id;
+                UPDATE accounts SET balance = balance - OLD.amount
+                WHERE id = OLD.to_account_id;
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                INSERT INTO ledger_entries (ledger, ledger_id, amount,
+                                            source, source_id)
+                VALUES ('account', NEW.from_account_id, -NEW.amount,
+                        'transfer', NEW.id),
+                       ('account', NEW.to_account_id, NEW.amount,
+                        'transfer', NEW.id);
+                UPDATE accounts SET balance = balance - NEW.amount
+                WHERE id = NEW.from_account_id;
+                UPDATE accounts SET balance = balance + NEW.amount
+                WHERE id = NEW.to_account_id;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """
+    )
+
+    # Balance writes issued by the purchase/transfer triggers above run at
+    # trigger depth 2 and are already posted; only direct writes are
+    # adjustments
+    cur.execute(
+        """
+        CREATE OR REPLACE FUNCTION record_balance_adjustment() RETURNS trigger AS $$
+        DECLARE
+            ledger_name VARCHAR(10);
+            delta NUMERIC;
+        BEGIN
+            IF pg_trigger_depth() > 1 THEN
+                RETURN NULL;
+            END IF;
+            IF TG_TABLE_NAME = 'accounts' THEN
+                ledger_name := 'account';
+                delta := NEW.balance;
+                IF TG_OP = 'UPDATE' THEN
+                    delta := delta - OLD.balance;
+                END IF;
+            ELSE
+                ledger_name := 'category';
+                delta := NEW.current_balance;
+                IF TG_OP = 'UPDATE' THEN
+                    delta := delta - OLD.current_balance;
+                END IF;
+            END IF;
+            IF delta <> 0 THEN
+                INSERT INTO ledger_entries (ledger, ledger_id, amount, source)
+                VALUES (ledger_name, NEW.id, delta, 'adjustment'),
+                       ('external', NULL, -delta, 'adjustment');
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """
+    )
+
+    # Creating these takes a lock that holds off balance writes until
+    # commit, so the opening entries below match the balances exactly
+    adjustment_triggers = {
+        "accounts_ledger_adjustment": (
+            "AFTER INSERT OR UPDATE OF balance ON accounts"
+        ),
+        "budget_categories_ledger_adjustment": (
+            "AFTER INSERT OR UPDATE OF current_balance ON budget_categories"
+        ),
+    }
+    for name, event in adjustment_triggers.items():
+        cur.execute("SELECT 1 FROM pg_trigger WHERE tgname = %s", (name,))
+        if cur.fetchone():
+            continue
+        cur.execute(
+            f"CREATE TRIGGER {name} {event} "
+            "FOR EACH ROW EXECUTE FUNCTION record_balance_adjustment()"
+        )
+
+    cur.execute("SELECT 1 FROM ledger_entries WHERE source = 'opening'")
+    if cur.fetchone():
+        return
+    cur.execute(
+        """
+        INSERT INTO ledger_entries (ledger, ledger_id, amount, source)
+        SELECT leg.ledger, leg.ledger_id, leg.amount, 'opening'
+        FROM (
+            SELECT 'account' AS ledger, id, balance AS amount FROM accounts
+            UNION ALL
+            SELECT 'category', id, current_balance FROM budget_categories
+        ) b
+        CROSS JOIN LATERAL (VALUES
+            (b.ledger, b.id, b.amount),
+            ('external', NULL, -b.amount)
+        ) AS leg(ledger, ledger_id, amount)
+        WHERE b.amount <> 0
+    """
+    )
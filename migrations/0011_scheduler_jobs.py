@@ -0,0 +1,22 @@
+"""APScheduler job store table (job_scheduler.PostgresJobStore).
+
+Same layout as APScheduler's SQLAlchemyJobStore creates.
+"""
+
+
+def up(cur):
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS apscheduler_jobs (
+            id VARCHAR(191) PRIMARY KEY,
+            next_run_time DOUBLE PRECISION,
+            job_state BYTEA NOT NULL
+        )
+    """
+    )
+    cur.execute(
+        """
+        CREATE INDEX IF NOT EXISTS ix_apscheduler_jobs_next_run_time
+        ON apscheduler_jobs (next_run_time)
+    """
+    )
@@ -0,0 +1,17 @@
+"""Audit log of the monthly rollover (formerly created by the job itself)"""
+
+
+def up(cur):
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS budget_automation_log (
+            id SERIAL PRIMARY KEY,
+            execution_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            period_name TEXT NOT NULL,
+            categories_created INTEGER DEFAULT 0,
+            income_added DECIMAL(10,2) DEFAULT 0,
+            success BOOLEAN DEFAULT FALSE,
+            notes TEXT
+        )
+    """
+    )
@@ -0,0 +1,51 @@
+"""Bank statement imports: duplicate-detection hash and an import log.
+
+purchase_import_hash() fingerprints a purchase by account, day, amount and
+description (case and whitespace folded). statement_import.py compares the
+hashes of statement lines with those of existing purchases through the
+expression index, so re-importing an overlapping statement, or one whose
+lines were already typed in with the bank's description, adds nothing.
+"""
+
+
+def up(cur):
+    # Dates as day numbers and amounts rounded to cents keep the text
+    # independent of DateStyle and of how many decimals the value carried
+    cur.execute(
+        """
+        CREATE OR REPLACE FUNCTION purchase_import_hash(
+            account_id INTEGER, day DATE, amount NUMERIC, description TEXT
+        ) RETURNS TEXT AS $$
+            SELECT md5(
+                account_id::text
+                || '|' || (day - DATE '2000-01-01')::text
+                || '|' || round(amount, 2)::text
+                || '|' || lower(regexp_replace(
+                    btrim(coalesce(description, '')), '[[:space:]]+', ' ', 'g'
+                ))
+            )
+        $$ LANGUAGE sql IMMUTABLE
+    """
+    )
+    cur.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_purchases_import_hash
+        ON purchases (
+            purchase_import_hash(account_id, date::date, amount, description)
+        )
+    """
+    )
+
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS statement_imports (
+            id SERIAL PRIMARY KEY,
+            imported_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            account_id INTEGER NOT NULL REFERENCES accounts (id),
+            source TEXT,
+            lines INTEGER NOT NULL DEFAULT 0,
+            imported INTEGER NOT NULL DEFAULT 0,
+            duplicates INTEGER NOT NULL DEFAULT 0
+        )
+    """
+    )
@@ -0,0 +1,94 @@
+"""Post the remaining balance of deleted accounts and categories.
+
+Deleting an account or budget category row (the monthly rollover replaces
+a period's categories, the desktop app deletes them one by one) left its
+ledger entries summing to the balance it had, so the ledger no longer
+added up to the stored balances. record_balance_adjustment() now also
+runs after deletes and posts the reversal as an 'adjustment' in the
+deleting transaction. Rows deleted before this migration get their
+reversal here.
+"""
+
+
+def up(cur):
+    cur.execute(
+        """
+        CREATE OR REPLACE FUNCTION record_balance_adjustment() RETURNS trigger AS $$
+        DECLARE
+            ledger_name VARCHAR(10);
+            balance_id INTEGER;
+            delta NUMERIC;
+        BEGIN
+            IF pg_trigger_depth() > 1 THEN
+                RETURN NULL;
+            END IF;
+            IF TG_OP = 'DELETE' THEN
+                balance_id := OLD.id;
+            ELSE
+                balance_id := NEW.id;
+            END IF;
+            IF TG_TABLE_NAME = 'accounts' THEN
+                ledger_name := 'account';
+                IF TG_OP = 'DELETE' THEN
+                    delta := -OLD.balance;
+                ELSIF TG_OP = 'UPDATE' THEN
+                    delta := NEW.balance - OLD.balance;
+                ELSE
+                    delta := NEW.balance;
+                END IF;
+            ELSE
+                ledger_name := 'category';
+                IF TG_OP = 'DELETE' THEN
+                    delta := -OLD.current_balance;
+                ELSIF TG_OP = 'UPDATE' THEN
+                    delta := NEW.current_balance - OLD.current_balance;
+                ELSE
+                    delta := NEW.current_balance;
+                END IF;
+            END IF;
+            IF delta <> 0 THEN
+                INSERT INTO ledger_entries (ledger, ledger_id, amount, source)
+                VALUES (ledger_name, balance_id, delta, 'adjustment'),
+                       ('external', NULL, -delta, 'adjustment');
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """
+    )
+
+    delete_triggers = {
+        "accounts_ledger_delete": "AFTER DELETE ON accounts",
+        "budget_categories_ledger_delete": "AFTER DELETE ON budget_categories",
+    }
+    for name, event in delete_triggers.items():
+        cur.execute("SELECT 1 FROM pg_trigger WHERE tgname = %s", (name,))
+        if cur.fetchone():
+            continue
+        cur.execute(
+            f"CREATE TRIGGER {name} {event} "
+            "FOR EACH ROW EXECUTE FUNCTION record_balance_adjustment()"
+        )
+
+    # Ledgers of rows that are already gone
+    cur.execute(
+        """
+        INSERT INTO ledger_entries (ledger, ledger_id, amount, source)
+        SELECT leg.ledger, leg.ledger_id, leg.amount, 'adjustment'
+        FROM (
+            SELECT e.ledger, e.ledger_id, -SUM(e.amount) AS amount
+            FROM ledger_entries e
+            WHERE (e.ledger = 'account' AND NOT EXISTS (
+                       SELECT 1 FROM accounts a WHERE a.id = e.ledger_id))
+               OR (e.ledger = 'category' AND NOT EXISTS (
+                       SELECT 1 FROM budget_categories bc
+                       WHERE bc.id = e.ledger_id))
+            GROUP BY e.ledger, e.ledger_id
+            HAVING SUM(e.amount) <> 0
+        ) d
+        CROSS JOIN LATERAL (VALUES
+            (d.ledger, d.ledger_id, d.amount),
+            ('external', NULL, -d.amount)
+        ) AS leg(ledger, ledger_id, amount)
+    """
+    )
@@ -0,0 +1,23 @@
+"""Log budget_periods writes to change_log.
+
+The desktop app rebuilds only the tables with change_log entries since
+its last load, and periods had none: a rollover's new period or
+set_active_period never reached it until a restart. record_change() only
+notifies /events for account and category writes, so period changes do
+not wake the listeners.
+"""
+
+
+def up(cur):
+    cur.execute(
+        "SELECT 1 FROM pg_trigger WHERE tgname = 'budget_periods_change_log'"
+    )
+    if cur.fetchone():
+        return
+    cur.execute(
+        """
+        CREATE TRIGGER budget_periods_change_log
+        AFTER INSERT OR UPDATE OR DELETE ON budget_periods
+        FOR EACH ROW EXECUTE FUNCTION record_change()
+    """
+    )
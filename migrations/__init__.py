@@ -0,0 +1,138 @@
+"""
+Schema Migrations
+=================
+
+Ordered schema changes, one module per version in this package, named
+NNNN_description.py and exposing up(cur). Applied versions are recorded in
+schema_migrations, so startup only has to compare one number with the
+newest module here; DDL runs once per database instead of on every worker.
+
+Each migration runs in its own transaction under an advisory lock, so
+workers starting together apply it exactly once. Run `python migrate.py`
+for status, upgrade and seeding from the command line.
+"""
+
+import importlib
+import re
+from pathlib import Path
+
+from data_versions import ACCOUNTS, BUDGET_CATEGORIES, bump_data_version
+
+# pg_advisory_xact_lock key serializing migration runs
+MIGRATION_LOCK_ID = 4_811_001
+
+_MODULE_NAME = re.compile(r"^(\d{4})_(\w+)\.py$")
+
+
+def discover():
+    """(version, name, module) for every migration, oldest first"""
+    migrations = []
+    for path in sorted(Path(__file__).parent.glob("[0-9]*.py")):
+        match = _MODULE_NAME.match(path.name)
+        if not match:
+            continue
+        module = importlib.import_module(f"{__name__}.{path.stem}")
+        migrations.append((int(match.group(1)), match.group(2), module))
+    return migrations
+
+
+def latest_version():
+    migrations = discover()
+    return migrations[-1][0] if migrations else 0
+
+
+def current_version(cur):
+    """Newest applied version, 0 for a database never migrated"""
+    cur.execute("SELECT to_regclass('schema_migrations') IS NOT NULL")
+    if not cur.fetchone()[0]:
+        return 0
+    cur.execute("SELECT COALESCE(MAX(version), 0) FROM schema_migrations")
+    return cur.fetchone()[0]
+
+
+def applied_versions(cur):
+    cur.execute("SELECT to_regclass('schema_migrations') IS NOT NULL")
+    if not cur.fetchone()[0]:
+        return {}
+    cur.execute("SELECT version, applied_at FROM schema_migrations")
+    return dict(cur.fetchall())
+
+
+def upgrade(conn, target=None, log=print):
+    """Apply pending migrations up to target (default: all); returns them"""
+    applied = []
+    for version, name, module in discover():
+        if target is not None and version > target:
+            break
+
+        cur = conn.cursor()
+        cur.execute("SELECT pg_advisory_xact_lock(%s)", (MIGRATION_LOCK_ID,))
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version INTEGER PRIMARY KEY,
+                name VARCHAR(255) NOT NULL,
+                applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """
+        )
+        cur.execute(
+            "SELECT 1 FROM schema_migrations WHERE version = %s", (version,)
+        )
+        if cur.fetchone():
+            # Already applied (possibly by another worker while we waited)
+            conn.commit()
+            continue
+
+        try:
+            module.up(cur)
+            cur.execute(
+                "INSERT INTO schema_migrations (version, name) VALUES (%s, %s)",
+                (version, name),
+            )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+        log(f"Applied migration {version:04d}_{name}")
+        applied.append((version, name))
+    return applied
+
+
+def seed(cur, settings):
+    """Create the accounts and categories listed in config/settings.json.
+
+    Category names are only unique per period once budget periods exist,
+    so existing names are checked instead of relying on ON CONFLICT.
+    Returns (accounts added, categories added).
+    """
+    accounts_added = 0
+    for user, accounts in settings.get("bank_accounts", {}).items():
+        for account_type in accounts:
+            cur.execute(
+                """
+                INSERT INTO accounts (name, account_type, balance)
+                VALUES (%s, %s, 0) ON CONFLICT (name) DO NOTHING
+            """,
+                (f"{user} - {account_type}", "bank"),
+            )
+            accounts_added += cur.rowcount
+
+    categories_added = 0
+    for user, categories in settings.get("budget_categories", {}).items():
+        for category in categories:
+            category_name = f"{user} - {category}"
+            cur.execute(
+                """
+                INSERT INTO budget_categories (name, budgeted_amount, current_balance)
+                SELECT %s, 0, 0
+                WHERE NOT EXISTS (SELECT 1 FROM budget_categories WHERE name = %s)
+            """,
+                (category_name, category_name),
+            )
+            categories_added += cur.rowcount
+
+    if accounts_added or categories_added:
+        bump_data_version(cur, ACCOUNTS, BUDGET_CATEGORIES)
+    return accounts_added, categories_added
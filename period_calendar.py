@@ -0,0 +1,133 @@
+"""
+Budget Period Calendar
+======================
+
+Maps a purchase date to its budget period so purchases.period_id can be
+filled in when a row is written, and period views become an equality
+lookup instead of a date-range join.
+
+Periods do not tile cleanly (migrated ones run 25th-24th, rollover-created
+ones 24th-end of next month), so one rule decides everywhere, in Python and
+in SQL alike: a date belongs to the period with the latest start_date on or
+before it, provided it is not past that period's end_date.
+
+Shared by app.py and desktop_app.py.
+"""
+
+import bisect
+import threading
+from datetime import date, datetime
+
+from data_versions import BUDGET_PERIODS, get_data_version
+
+# SQL form of the rule, for a purchases row aliased p
+PERIOD_FOR_PURCHASE_SQL = """
+    (SELECT CASE WHEN p.date::date <= bp.end_date THEN bp.id END
+     FROM budget_periods bp
+     WHERE bp.start_date <= p.date::date
+     ORDER BY bp.start_date DESC, bp.id DESC
+     LIMIT 1)
+"""
+
+
+def _as_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    # ISO strings from clients; TIMESTAMP columns keep the clock time as
+    # written, so the calendar uses it unconverted as well
+    return datetime.fromisoformat(str(value)).date()
+
+
+class PeriodCalendar:
+    """Budget periods held in memory, reloaded when budget_periods changes"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._starts = []  # start dates, ascending
+        self._periods = []  # (id, end_date) in the same order
+
+    def refresh(self, cur):
+        """Reload if the periods changed; one primary-key lookup otherwise"""
+        version = get_data_version(cur, BUDGET_PERIODS)
+        if version == self._version:
+            return
+        cur.execute(
+            """
+            SELECT id, start_date, end_date FROM budget_periods
+            ORDER BY start_date, id
+        """
+        )
+        rows = cur.fetchall()
+        with self._lock:
+            self._starts = [row[1] for row in rows]
+            self._periods = [(row[0], row[2]) for row in rows]
+            self._version = version
+
+    def period_for(self, when):
+        """Period id for a date/datetime/ISO string, or None"""
+        day = _as_date(when)
+        with self._lock:
+            i = bisect.bisect_right(self._starts, day) - 1
+            if i < 0:
+                return None
+            period_id, end_date = self._periods[i]
+        return period_id if day <= end_date else None
+
+
+def assign_purchase_periods(cur, start_date, end_date):
+    """Re-derive period_id for purchases dated in a (new) period's range"""
+    cur.execute(
+        f"""
+        UPDATE purchases p SET period_id = {PERIOD_FOR_PURCHASE_SQL}
+        WHERE p.date >= %s AND p.date < %s::date + 1
+    """,
+        (start_date, end_date),
+    )
+    return cur.rowcount
+
+
+def backfill_purchase_periods(conn, batch_size=5000, log=print):
+    """Fill period_id on existing purchases, committing every batch.
+
+    Walks purchases by id so each batch is a short transaction and rows no
+    period covers are not revisited. Those rows are left untouched rather
+    than rewritten to NULL, which would fire the change_log and balance
+    triggers and send every client to re-download them.
+    """
+    cur = conn.cursor()
+    last_id = 0
+    total = 0
+    while True:
+        cur.execute(
+            f"""
+            WITH batch AS (
+                SELECT p.id, {PERIOD_FOR_PURCHASE_SQL} AS period_id
+                FROM purchases p
+                WHERE p.period_id IS NULL AND p.id > %s
+                ORDER BY p.id
+                LIMIT %s
+            ),
+            updated AS (
+                UPDATE purchases SET period_id = batch.period_id
+                FROM batch
+                WHERE purchases.id = batch.id
+                AND batch.period_id IS NOT NULL
+                RETURNING purchases.id
+            )
+            SELECT (SELECT MAX(id) FROM batch),
+                   (SELECT COUNT(*) FROM updated)
+        """,
+            (last_id, batch_size),
+        )
+        scanned_to, updated = cur.fetchone()
+        conn.commit()
+        if scanned_to is None:
+            break
+        last_id = scanned_to
+        if updated:
+            total += updated
+            log(f"Backfilled period_id on {total} purchases")
+    return total
@@ -0,0 +1,160 @@
+"""
+SQL Statement Statistics
+========================
+
+Every statement run through a pooled connection (db_pool.InstrumentedCursor)
+is reported to record(), which adds it to each capture active in the
+current context: one per request (instrument), one per scheduled job
+(track_queries) and any opened by tests or scripts (capture_queries).
+
+    with capture_queries() as stats:
+        client.get("/get_purchases")
+    assert stats.statements <= 3, stats.report()
+
+Statements slower than SLOW_QUERY_MS (default 250) are logged with their
+normalized SQL. In debug mode (app.debug or QUERY_DEBUG=1) a request or job
+that runs one statement shape more than N_PLUS_ONE_THRESHOLD times (default
+5) gets an N+1 warning.
+"""
+
+import contextvars
+import functools
+import os
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from flask import g, request
+
+SLOW_QUERY_MS = float(os.environ.get("SLOW_QUERY_MS", 250))
+N_PLUS_ONE_THRESHOLD = int(os.environ.get("N_PLUS_ONE_THRESHOLD", 5))
+QUERY_DEBUG = os.environ.get("QUERY_DEBUG") == "1"
+
+_captures = contextvars.ContextVar("query_captures", default=())
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_PLACEHOLDER = re.compile(r"%s|\$\d+")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_WHITESPACE = re.compile(r"\s+")
+# IN lists and multi-row VALUES of any length share one shape
+_VALUE_LISTS = re.compile(r"\(\?(?:, \?)*\)(?:, \(\?(?:, \?)*\))*")
+
+
+def normalize_sql(sql):
+    """Statement shape: literals and parameters as ?, whitespace collapsed"""
+    sql = _STRING.sub("?", sql)
+    sql = _PLACEHOLDER.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    sql = _WHITESPACE.sub(" ", sql).strip()
+    return _VALUE_LISTS.sub("(?)", sql)
+
+
+class QueryStats:
+    """Statements, DB time and rows of one request, job or test block"""
+
+    def __init__(self, name=""):
+        self.name = name
+        self.statements = 0
+        self.db_time = 0.0
+        self.rows = 0
+        self.shapes = Counter()
+        self.slow = []  # (seconds, shape)
+
+    def add(self, shape, seconds, rows):
+        self.statements += 1
+        self.db_time += seconds
+        self.rows += rows
+        self.shapes[shape] += 1
+        if seconds * 1000 >= SLOW_QUERY_MS:
+            self.slow.append((seconds, shape))
+
+    def repeated(self, threshold=None):
+        """[(shape, count)] run more than threshold times"""
+        threshold = N_PLUS_ONE_THRESHOLD if threshold is None else threshold
+        return [
+            (shape, count)
+            for shape, count in self.shapes.most_common()
+            if count > threshold
+        ]
+
+    def report(self):
+        lines = [
+            f"{self.name or 'queries'}: {self.statements} statements, "
+            f"{self.db_time * 1000:.1f} ms DB, {self.rows} rows"
+        ]
+        for shape, count in self.shapes.most_common():
+            lines.append(f"  {count:>4}x {shape[:160]}")
+        return "\n".join(lines)
+
+
+def record(sql, seconds, rows):
+    """ConnectionPool on_query hook"""
+    shape = normalize_sql(sql)
+    if seconds * 1000 >= SLOW_QUERY_MS:
+        print(f"🐢 Slow query ({seconds * 1000:.0f} ms): {shape[:500]}")
+    for stats in _captures.get():
+        stats.add(shape, seconds, rows)
+
+
+def start_capture(name=""):
+    """Begin collecting into a new QueryStats; (stats, token for stop)"""
+    stats = QueryStats(name)
+    token = _captures.set(_captures.get() + (stats,))
+    return stats, token
+
+
+def stop_capture(stats, token, debug=False):
+    _captures.reset(token)
+    if debug or QUERY_DEBUG:
+        for shape, count in stats.repeated():
+            print(f"⚠️ Possible N+1 in {stats.name}: {count}x {shape[:200]}")
+    return stats
+
+
+@contextmanager
+def capture_queries(name="", debug=False):
+    """Collect the statements run inside the block (tests, scripts)"""
+    stats, token = start_capture(name)
+    try:
+        yield stats
+    finally:
+        stop_capture(stats, token, debug)
+
+
+def track_queries(func):
+    """Print a statement summary after each run of a scheduled job"""
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        with capture_queries(func.__name__) as stats:
+            try:
+                return func(*args, **kwargs)
+            finally:
+                print(
+                    f"🧮 {func.__name__}: {stats.statements} statements, "
+                    f"{stats.db_time * 1000:.1f} ms DB of "
+                    f"{(time.perf_counter() - started) * 1000:.1f} ms, "
+                    f"{stats.rows} rows"
+                )
+
+    return wrapper
+
+
+def instrument(app):
+    """Capture the statements of every request into g.query_stats"""
+
+    @app.before_request
+    def start_request_queries():
+        route = request.url_rule.rule if request.url_rule else request.path
+        g.query_stats, g.query_stats_token = start_capture(
+            f"{request.method} {route}"
+        )
+
+    @app.teardown_request
+    def stop_request_queries(exc):
+        token = g.pop("query_stats_token", None)
+        if token is not None:
+            # g.query_stats stays readable for the metrics hooks
+            stop_capture(g.query_stats, token, debug=app.debug)
@@ -0,0 +1,221 @@
+"""
+Shared Read Cache
+=================
+
+Serialized JSON bodies of the list endpoints, shared by every gunicorn
+worker through files in one directory, so a worker can answer from what
+another worker already queried.
+
+Each resource (data_versions names) has a generation token file. A write
+replaces the token after it commits (invalidate), which orphans every entry
+of that resource in every worker at once. Entries record the token read
+*before* their query ran, so a read racing a write can only store an entry
+that is already stale, never one that outlives the write.
+
+Writes made outside app.py (the desktop app, manual SQL) do not invalidate;
+the TTL bounds how long they stay unseen. The number of entries and total
+bytes are bounded, evicting the least recently used. Files are replaced
+with os.replace, so readers never see a half-written entry and no locking
+is needed.
+
+Within a process, concurrent misses for the same entry share one load()
+(SingleFlight), keyed by generation too: a request arriving after a write's
+invalidation starts its own load rather than joining one that may predate
+the write.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+from single_flight import SingleFlight
+
+# on_event name -> stats() counter
+EVENTS = {
+    "hit": "hits",
+    "miss": "misses",
+    "coalesced": "coalesced",
+    "invalidation": "invalidations",
+    "eviction": "evictions",
+}
+
+
+class ReadCache:
+    def __init__(
+        self,
+        directory,
+        ttl=30.0,
+        max_entries=256,
+        max_bytes=32 * 1024 * 1024,
+        on_event=None,
+    ):
+        """
+        directory: shared by all processes using the cache
+        ttl: seconds an entry is served without any invalidation
+        max_entries, max_bytes: size bounds, enforced on every store
+        on_event: optional callback(resource, event) for "hit", "miss",
+            "coalesced" (waited on another thread's load), "invalidation"
+            and "eviction"
+        """
+        self.directory = directory
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.on_event = on_event
+        os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._counter = 0
+        self._stats = dict.fromkeys(EVENTS.values(), 0)
+        self._flights = SingleFlight()
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def _entry_name(self, resource, key):
+        digest = hashlib.sha1(key.encode()).hexdigest()
+        return f"entry-{resource}-{digest[:20]}"
+
+    def _write(self, name, data):
+        """Atomically replace a file of the cache directory"""
+        with self._lock:
+            self._counter += 1
+            tmp_name = f"tmp-{os.getpid()}-{self._counter}"
+        tmp_path = self._path(tmp_name)
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, self._path(name))
+
+    def _event(self, resource, event):
+        with self._lock:
+            self._stats[EVENTS[event]] += 1
+        if self.on_event is not None:
+            self.on_event(resource, event)
+
+    def generation(self, resource):
+        try:
+            with open(self._path(f"gen-{resource}"), "rb") as f:
+                return f.read().decode()
+        except FileNotFoundError:
+            return ""
+
+    def invalidate(self, *resources):
+        """Orphan every entry of the resources; call after the commit"""
+        for resource in resources:
+            with self._lock:
+                self._counter += 1
+                token = f"{time.time_ns()}-{os.getpid()}-{self._counter}"
+            self._write(f"gen-{resource}", token.encode())
+            self._event(resource, "invalidation")
+
+    def get(self, resource, key):
+        """(etag, body bytes) if a current entry exists, else None"""
+        path = self._path(self._entry_name(resource, key))
+        try:
+            with open(path, "rb") as f:
+                header = json.loads(f.readline())
+                body = f.read()
+        except (OSError, ValueError):
+            return None
+        if (
+            header["resource"] != resource
+            or header["key"] != key  # Digest collision
+            or header["expires"] <= time.time()
+            or header["generation"] != self.generation(resource)
+        ):
+            return None
+        try:
+            os.utime(path)  # Most recently used
+        except OSError:
+            pass
+        return header["etag"], body
+
+    def put(self, resource, key, generation, etag, body):
+        header = {
+            "resource": resource,
+            "key": key,
+            "generation": generation,
+            "expires": time.time() + self.ttl,
+            "etag": etag,
+        }
+        self._write(
+            self._entry_name(resource, key),
+            json.dumps(header).encode() + b"\n" + body,
+        )
+        self._evict()
+
+    def fetch(self, resource, key, load):
+        """Read-through: cached (etag, body), or load() and store it.
+
+        The cache never fails a request: any filesystem error just means
+        the body comes from load().
+        """
+        try:
+            cached = self.get(resource, key)
+            generation = self.generation(resource)
+        except OSError:
+            cached, generation = None, None
+        if cached is not None:
+            self._event(resource, "hit")
+            return cached
+
+        (etag, body), shared = self._flights.do(
+            (resource, key, generation),
+            lambda: self._load(resource, key, generation, load),
+        )
+        if shared:
+            self._event(resource, "coalesced")
+        return etag, body
+
+    def _load(self, resource, key, generation, load):
+        self._event(resource, "miss")
+        etag, body = load()
+        if generation is not None:
+            try:
+                self.put(resource, key, generation, etag, body)
+            except OSError as e:
+                print(f"⚠️ Read cache store failed: {e}")
+        return etag, body
+
+    def _evict(self):
+        """Drop least recently used entries beyond the size bounds"""
+        entries = []
+        for item in os.scandir(self.directory):
+            if not item.name.startswith("entry-"):
+                continue
+            try:
+                stat = item.stat()
+            except FileNotFoundError:
+                continue  # Evicted by another process
+            entries.append((stat.st_mtime, stat.st_size, item.name))
+
+        total = sum(size for _, size, _ in entries)
+        entries.sort()
+        while entries and (
+            len(entries) > self.max_entries or total > self.max_bytes
+        ):
+            _, size, name = entries.pop(0)
+            total -= size
+            try:
+                os.remove(self._path(name))
+            except FileNotFoundError:
+                continue
+            self._event(name.split("-")[1], "eviction")
+
+    def stats(self):
+        """This process's counters"""
+        with self._lock:
+            stats = dict(self._stats)
+        stats["in_flight"] = self._flights.in_flight()
+        stats["pid"] = os.getpid()
+        stats["directory"] = self.directory
+        return stats
+
+
+def default_directory():
+    return os.environ.get("READ_CACHE_DIR") or os.path.join(
+        tempfile.gettempdir(), "holm-budget-cache"
+    )
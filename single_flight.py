@@ -0,0 +1,56 @@
+"""
+Single-Flight Calls
+===================
+
+Concurrent callers asking for the same key share one in-flight call
+instead of each running it: the first caller runs it, the others wait and
+get its result (or its exception). Nothing is kept once the call returns;
+caching is the caller's business.
+
+Used by ReadCache so a burst of identical requests after a reconnect storm
+costs one database query per worker instead of one per request thread.
+"""
+
+import threading
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, func):
+        """(func() result, shared); shared is True for callers who waited"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = func()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._calls)
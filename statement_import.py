@@ -0,0 +1,355 @@
+"""
+Bank Statement Import
+=====================
+
+Loads a bank's CSV or OFX export (Bank Zero, Tyme, or any bank whose CSV
+has recognizable date/description/amount columns) into purchases for one
+account, in a handful of statements however long the file is:
+
+1. parse_statement() reads the file line by line into
+   (line_no, day, amount, description), amounts signed as the bank shows
+   them (money out negative) and descriptions with whitespace collapsed.
+2. import_statement() writes those lines as CSV to a spooled temporary
+   file, so a malformed line fails the import before anything reaches the
+   database, then COPYs them into a temporary staging table.
+3. One INSERT ... SELECT posts every new line as a purchase (money out
+   positive, money in negative like income); the purchases triggers apply
+   the balances and ledger entries for the whole statement at once.
+
+Duplicates are found with purchase_import_hash() (migrations/0013), a hash
+of account, day, amount and description compared with existing purchases
+through an expression index. Identical lines within a statement are kept:
+the nth identical line is a duplicate only if the account already has n
+such purchases, so two equal coffees on one day both import once and
+re-importing the statement adds neither again.
+
+Imported purchases have no budget category; categorize them afterwards.
+"""
+
+import csv
+import html
+import io
+import itertools
+import re
+import tempfile
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+
+from period_calendar import PERIOD_FOR_PURCHASE_SQL
+
+FORMATS = ("csv", "ofx")
+
+# CSV header names (lowercased) of the columns a statement line needs
+DATE_COLUMNS = ("date", "transaction date", "posting date", "value date")
+DESCRIPTION_COLUMNS = (
+    "description",
+    "transaction description",
+    "details",
+    "narrative",
+    "reference",
+)
+AMOUNT_COLUMNS = ("amount", "transaction amount", "amount (zar)")
+MONEY_IN_COLUMNS = ("money in", "credit", "credit amount")
+MONEY_OUT_COLUMNS = ("money out", "debit", "debit amount")
+FEE_COLUMNS = ("fees", "fee", "bank charges")
+
+DATE_FORMATS = (
+    "%d/%m/%Y",
+    "%Y/%m/%d",
+    "%d-%m-%Y",
+    "%d %b %Y",
+    "%d %B %Y",
+    "%Y%m%d",
+)
+
+# Statement text kept in memory before the spool moves to disk
+SPOOL_MAX_SIZE = 4 * 1024 * 1024
+
+_AMOUNT_NOISE = re.compile(r"[R\s]")
+_DECIMAL_COMMA = re.compile(r"^-?[\d.]*,\d{1,2}$")
+_OFX_TAG = re.compile(r"<(/?)([A-Za-z0-9.]+)>([^<\r\n]*)")
+
+
+def open_text(binary):
+    """Text lines of an uploaded or opened binary statement file"""
+    return io.TextIOWrapper(
+        binary, encoding="utf-8-sig", errors="replace", newline=""
+    )
+
+
+def normalize_description(text):
+    return " ".join(text.split()) or None
+
+
+def parse_amount(text):
+    """Decimal from statement text ("R -1 234.50", "(12.00)", "99.99 DR"),
+    or None when blank"""
+    original = text
+    text = text.strip().upper()
+    negative = False
+    if text.endswith("DR"):
+        negative, text = True, text[:-2]
+    elif text.endswith("CR"):
+        text = text[:-2]
+    text = _AMOUNT_NOISE.sub("", text)
+    if text.startswith("(") and text.endswith(")"):
+        negative, text = True, text[1:-1]
+    if not text:
+        return None
+    if _DECIMAL_COMMA.match(text):
+        text = text.replace(".", "").replace(",", ".")
+    else:
+        text = text.replace(",", "")
+    try:
+        amount = Decimal(text)
+    except InvalidOperation:
+        raise ValueError(f"bad amount {original.strip()!r}")
+    return -amount if negative else amount
+
+
+def parse_day(text):
+    text = text.strip()
+    try:
+        return date.fromisoformat(text[:10])
+    except ValueError:
+        pass
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, date_format).date()
+        except ValueError:
+            continue
+    raise ValueError(f"bad date {text!r}")
+
+
+def _find_column(names, candidates):
+    for candidate in candidates:
+        if candidate in names:
+            return names.index(candidate)
+    return None
+
+
+def _header_columns(row):
+    """Column indexes if row is the statement's header, else None"""
+    names = [cell.strip().lower() for cell in row]
+    columns = {
+        "date": _find_column(names, DATE_COLUMNS),
+        "description": _find_column(names, DESCRIPTION_COLUMNS),
+        "amount": _find_column(names, AMOUNT_COLUMNS),
+        "in": _find_column(names, MONEY_IN_COLUMNS),
+        "out": _find_column(names, MONEY_OUT_COLUMNS),
+        "fee": _find_column(names, FEE_COLUMNS),
+    }
+    if columns["date"] is None:
+        return None
+    if columns["amount"] is None and columns["in"] is None:
+        return None
+    return columns
+
+
+def parse_csv(lines):
+    """Statement lines of a CSV export; rows before the header (account
+    details) and rows without an amount (balances) are skipped"""
+    reader = csv.reader(lines)
+    columns = None
+    for row in reader:
+        if columns is None:
+            columns = _header_columns(row)
+            continue
+        if not any(cell.strip() for cell in row):
+            continue
+
+        def cell(name):
+            index = columns[name]
+            if index is None or index >= len(row):
+                return ""
+            return row[index]
+
+        try:
+            if columns["amount"] is not None:
+                amount = parse_amount(cell("amount"))
+            else:
+                parts = [
+                    parse_amount(cell("in")),
+                    parse_amount(cell("out")),
+                    parse_amount(cell("fee")),
+                ]
+                if all(part is None for part in parts):
+                    amount = None
+                else:
+                    money_in, money_out, fee = (p or 0 for p in parts)
+                    amount = abs(money_in) - abs(money_out) - abs(fee)
+            if amount is None:
+                continue
+            day = parse_day(cell("date"))
+        except ValueError as e:
+            raise ValueError(f"line {reader.line_num}: {e}")
+        yield (
+            reader.line_num,
+            day,
+            amount,
+            normalize_description(cell("description")),
+        )
+
+    if columns is None:
+        raise ValueError("no header row with date and amount columns")
+
+
+def _ofx_line(fields, line_no):
+    try:
+        day = parse_day(fields.get("DTPOSTED", "")[:8])
+        amount = parse_amount(fields.get("TRNAMT", ""))
+    except ValueError as e:
+        raise ValueError(f"line {line_no}: {e}")
+    if amount is None:
+        raise ValueError(f"line {line_no}: transaction without TRNAMT")
+    name = fields.get("NAME", "")
+    memo = fields.get("MEMO", "")
+    description = name if not memo or memo == name else f"{name} {memo}"
+    return (
+        line_no,
+        day,
+        amount,
+        normalize_description(html.unescape(description)),
+    )
+
+
+def parse_ofx(lines):
+    """Statement lines of an OFX export (SGML 1.x or XML 2.x)"""
+    fields = None
+    start = 0
+    for line_no, line in enumerate(lines, 1):
+        for closing, tag, value in _OFX_TAG.findall(line):
+            tag = tag.upper()
+            if tag == "STMTTRN":
+                if closing and fields is not None:
+                    yield _ofx_line(fields, start)
+                    fields = None
+                elif not closing:
+                    fields, start = {}, line_no
+            elif fields is not None and not closing:
+                fields[tag] = value.strip()
+
+
+def parse_statement(lines, statement_format=None):
+    """(line_no, day, amount, description) for each statement line.
+
+    statement_format is "csv" or "ofx"; None detects it from the first line.
+    """
+    lines = iter(lines)
+    first = next(lines, "")
+    lines = itertools.chain([first], lines)
+    if statement_format is None:
+        head = first.lstrip().upper()
+        is_ofx = head.startswith(("OFXHEADER", "<OFX", "<?XML"))
+        statement_format = "ofx" if is_ofx else "csv"
+    if statement_format == "ofx":
+        return parse_ofx(lines)
+    if statement_format == "csv":
+        return parse_csv(lines)
+    raise ValueError(f"unknown statement format {statement_format}")
+
+
+def spool_csv(statement_lines):
+    """Statement lines as COPY CSV in a rewound temporary file; (file, n)"""
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+    text = io.TextIOWrapper(spool, encoding="utf-8", newline="")
+    writer = csv.writer(text, lineterminator="\n")
+    count = 0
+    for line in statement_lines:
+        writer.writerow(line)
+        count += 1
+    text.flush()
+    text.detach()
+    spool.seek(0)
+    return spool, count
+
+
+def import_statement(
+    cur, account_id, statement_lines, user_name=None, source=None
+):
+    """Post a statement's new lines to an account as purchases.
+
+    Runs in the caller's transaction (roll back for a dry run). user_name
+    defaults to the account's owner ("Robert - Tyme Cheque" -> "Robert").
+    Returns {"import_id", "lines", "imported", "duplicates"}.
+    """
+    cur.execute("SELECT name FROM accounts WHERE id = %s", (account_id,))
+    account = cur.fetchone()
+    if account is None:
+        raise ValueError(f"unknown account {account_id}")
+    if not user_name:
+        user_name = account[0].split(" - ", 1)[0]
+
+    # Parse everything first: an error halfway through a COPY would leave
+    # the connection mid-protocol
+    spool, lines = spool_csv(statement_lines)
+    with spool:
+        cur.execute(
+            """
+            CREATE TEMP TABLE statement_import_rows (
+                line_no INTEGER NOT NULL,
+                day DATE NOT NULL,
+                amount NUMERIC(12,2) NOT NULL,
+                description TEXT
+            ) ON COMMIT DROP
+        """
+        )
+        cur.execute(
+            """
+            COPY statement_import_rows (line_no, day, amount, description)
+            FROM STDIN WITH (FORMAT csv)
+        """,
+            stream=spool,
+        )
+
+    cur.execute(
+        f"""
+        WITH staged AS (
+            SELECT line_no, day, -amount AS amount, description,
+                   purchase_import_hash(%s, day, -amount, description) AS hash
+            FROM statement_import_rows
+        ),
+        numbered AS (
+            SELECT staged.*, row_number() OVER (
+                PARTITION BY hash ORDER BY line_no
+            ) AS occurrence
+            FROM staged
+        ),
+        existing AS (
+            SELECT h.hash, COUNT(*) AS n
+            FROM (SELECT DISTINCT hash FROM staged) h
+            JOIN purchases p ON purchase_import_hash(
+                p.account_id, p.date::date, p.amount, p.description
+            ) = h.hash
+            GROUP BY h.hash
+        )
+        INSERT INTO purchases (user_name, amount, account_id, budget_category_id, description, date, period_id)
+        SELECT %s, p.amount, %s, NULL, p.description, p.date,
+               {PERIOD_FOR_PURCHASE_SQL}
+        FROM (
+            SELECT n.line_no, n.amount, n.description,
+                   n.day::timestamp AS date
+            FROM numbered n
+            LEFT JOIN existing e ON e.hash = n.hash
+            WHERE n.occurrence > COALESCE(e.n, 0)
+        ) p
+        ORDER BY p.line_no
+    """,
+        (account_id, user_name, account_id),
+    )
+    imported = cur.rowcount
+
+    cur.execute(
+        """
+        INSERT INTO statement_imports (account_id, source, lines, imported, duplicates)
+        VALUES (%s, %s, %s, %s, %s)
+        RETURNING id
+    """,
+        (account_id, source, lines, imported, lines - imported),
+    )
+    return {
+        "import_id": cur.fetchone()[0],
+        "lines": lines,
+        "imported": imported,
+        "duplicates": lines - imported,
+    }
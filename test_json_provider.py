@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+JSON Provider Wire Format Check
+===============================
+
+Naive TIMESTAMP values must reach clients as the same instant the HTTP
+dates of Flask's default provider named: parsing the JSON string has to
+give back the stored clock time in UTC, not the browser's local time.
+
+Usage:
+    python -m pytest test_json_provider.py
+    python test_json_provider.py
+"""
+
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from email.utils import parsedate_to_datetime
+
+import orjson
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from json_provider import OrjsonProvider, Rows, ndjson_lines
+
+STORED = datetime(2025, 3, 1, 14, 5)  # as pg8000 returns TIMESTAMP
+
+
+def make_app():
+    app = Flask(__name__)
+    app.json = OrjsonProvider(app)
+    return app
+
+
+def test_naive_datetime_round_trips_to_same_instant():
+    app = make_app()
+    sent = orjson.loads(app.json.response({"date": STORED}).get_data())
+    received = datetime.fromisoformat(sent["date"])
+
+    assert received.utcoffset() is not None, sent["date"]
+    assert received == STORED.replace(tzinfo=timezone.utc)
+
+    # What Flask's default provider sent for the same value
+    old = DefaultJSONProvider(Flask(__name__)).dumps({"date": STORED})
+    assert received == parsedate_to_datetime(orjson.loads(old)["date"])
+
+
+def test_rows_and_ndjson_use_the_same_formats():
+    app = make_app()
+    row = (1, Decimal("12.50"), STORED, date(2025, 3, 1))
+    columns = ("id", "amount", "date", "day")
+    expected = {
+        "id": 1,
+        "amount": "12.50",
+        "date": "2025-03-01T14:05:00+00:00",
+        "day": "2025-03-01",
+    }
+
+    body = app.json.response(Rows(columns, [row])).get_data()
+    assert orjson.loads(body) == [expected]
+    assert orjson.loads(ndjson_lines(columns, [row])) == expected
+
+
+if __name__ == "__main__":
+    test_naive_datetime_round_trips_to_same_instant()
+    test_rows_and_ndjson_use_the_same_formats()
+    print("✅ JSON wire formats unchanged for clients")
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Query Plan Regression Tests
+===========================
+
+Every hot query of app.py and desktop_app.py (check_query_plans.HOT_QUERIES)
+must read its main table through an index on a realistically sized
+database. The synthetic rows are loaded once and rolled back afterwards.
+
+Usage:
+    BENCHMARK_DATABASE_URL=postgresql://... \\
+        python -m pytest test_query_plans.py
+"""
+
+import pytest
+
+from check_query_plans import HOT_QUERIES, check_plan, load_synthetic_data
+from db_pool import connect
+
+
+@pytest.fixture(scope="module")
+def planned(scratch_database_url):
+    """(cursor, context) inside the transaction holding the synthetic data"""
+    conn = connect(scratch_database_url)
+    try:
+        cur = conn.cursor()
+        yield cur, load_synthetic_data(cur)
+    finally:
+        conn.rollback()
+        conn.close()
+
+
+@pytest.mark.parametrize(
+    "name, table, sql, params", HOT_QUERIES, ids=[q[0] for q in HOT_QUERIES]
+)
+def test_hot_query_reads_through_index(planned, name, table, sql, params):
+    cur, ctx = planned
+    ok, scans = check_plan(cur, table, sql, params(ctx))
+    if not ok:
+        cur.execute("EXPLAIN " + sql, params(ctx))
+        plan = "\n".join(row[0] for row in cur.fetchall())
+        pytest.fail(f"{name} reads {table} via {', '.join(scans)}:\n{plan}")
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Query Statistics Tests
+======================
+
+Statement counting through db_pool.InstrumentedCursor, normalize_sql shapes
+and N+1 detection run against a fake cursor. The query budget of
+/sync_purchases needs PostgreSQL and is skipped without
+BENCHMARK_DATABASE_URL (see conftest.py).
+
+Usage:
+    python -m pytest test_query_stats.py
+"""
+
+import os
+import uuid
+
+import pytest
+
+import query_stats
+from db_pool import InstrumentedCursor
+from query_stats import capture_queries, normalize_sql
+
+# Statements per /sync_purchases call on a warm worker, whatever the batch
+# size: category lookup, period calendar version check, insert, data
+# version bump
+SYNC_PURCHASES_BUDGET = 4
+
+
+class FakeCursor:
+    """pg8000 cursor stand-in: every SELECT returns rows_per_select rows"""
+
+    def __init__(self, rows_per_select=3):
+        self.rows_per_select = rows_per_select
+        self.description = None
+        self.rowcount = -1
+
+    def execute(self, operation, args=(), stream=None):
+        if operation.lstrip().upper().startswith("SELECT"):
+            self.description = [("id",)]
+            self.rowcount = self.rows_per_select
+        else:
+            self.description = None
+            self.rowcount = 1
+
+    def executemany(self, operation, param_sets):
+        self.execute(operation)
+
+
+def fake_cursor(rows_per_select=3):
+    return InstrumentedCursor(FakeCursor(rows_per_select), query_stats.record)
+
+
+def test_normalize_sql_replaces_literals_and_parameters():
+    assert (
+        normalize_sql(
+            "SELECT *  FROM purchases\n   WHERE user_name = 'O''Brien'"
+            " AND amount > 12.50 AND id = %s LIMIT 10"
+        )
+        == "SELECT * FROM purchases WHERE user_name = ? AND amount > ? "
+        "AND id = ? LIMIT ?"
+    )
+
+
+def test_normalize_sql_collapses_value_lists():
+    one = normalize_sql("SELECT 1 FROM accounts WHERE id IN (%s)")
+    three = normalize_sql("SELECT 1 FROM accounts WHERE id IN (%s, %s, %s)")
+    assert one == three
+
+    rows = normalize_sql(
+        "INSERT INTO accounts (name, balance) VALUES (%s, %s), (%s, %s)"
+    )
+    assert rows == "INSERT INTO accounts (name, balance) VALUES (?)"
+
+
+def test_capture_counts_statements_and_rows():
+    cur = fake_cursor(rows_per_select=3)
+    with capture_queries("outer") as outer:
+        cur.execute("SELECT id FROM accounts")
+        with capture_queries("inner") as inner:
+            cur.execute("UPDATE accounts SET balance = %s", (1,))
+    cur.execute("SELECT id FROM accounts")  # Outside any capture
+
+    assert (outer.statements, outer.rows) == (2, 3)
+    assert (inner.statements, inner.rows) == (1, 0)
+    assert outer.db_time >= inner.db_time
+
+
+def test_repeated_flags_one_shape_run_per_row():
+    cur = fake_cursor()
+    with capture_queries("n+1") as stats:
+        cur.execute("SELECT id, name FROM accounts")
+        for account_id in range(7):
+            cur.execute(
+                "SELECT SUM(amount) FROM purchases WHERE account_id = %s",
+                (account_id,),
+            )
+
+    shape = "SELECT SUM(amount) FROM purchases WHERE account_id = ?"
+    assert stats.repeated(threshold=5) == [(shape, 7)]
+    assert stats.repeated(threshold=7) == []
+    assert f"   7x {shape}" in stats.report()
+
+
+def sync_purchase():
+    return {
+        "client_id": str(uuid.uuid4()),
+        "amount": 10,
+        "category": "query-budget-category",
+        "description": "query-budget-test",
+        "timestamp": "2025-03-01T14:05:00",
+        "user_name": "Robert",
+    }
+
+
+@pytest.fixture(scope="module")
+def client(scratch_database_url):
+    # app.py reads DATABASE_URL when it connects
+    os.environ["DATABASE_URL"] = scratch_database_url
+    import app as budget_app
+
+    assert budget_app.ensure_database()
+    client = budget_app.app.test_client()
+    # The first sync in a worker also loads the period calendar
+    client.post("/sync_purchases", json=[sync_purchase()])
+    yield client
+
+    conn = budget_app.get_db_connection()
+    try:
+        conn.cursor().execute(
+            "DELETE FROM purchases WHERE description = 'query-budget-test'"
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+@pytest.mark.parametrize("batch", [1, 100])
+def test_sync_purchases_query_budget(client, batch):
+    purchases = [sync_purchase() for _ in range(batch)]
+    with capture_queries("POST /sync_purchases") as stats:
+        response = client.post("/sync_purchases", json=purchases)
+
+    assert response.get_json()["synced"] == batch
+    assert stats.statements <= SYNC_PURCHASES_BUDGET, stats.report()
+    assert not stats.repeated(threshold=1), stats.report()